@@ -0,0 +1,228 @@
+import wave
+
+import numpy as np
+
+# Gemini TTS liefert 24 kHz mono 16-bit PCM; alle Segmente werden darauf vereinheitlicht
+SAMPLE_RATE = 24000
+CHANNELS = 1
+
+
+def segment_to_pcm(seg, sample_rate: int = SAMPLE_RATE, channels: int = CHANNELS) -> np.ndarray:
+    """Wandelt ein pydub-AudioSegment in ein int16-Array der Form (frames, channels)."""
+    seg = seg.set_frame_rate(sample_rate).set_channels(channels).set_sample_width(2)
+    return np.frombuffer(seg.raw_data, dtype=np.int16).reshape(-1, channels)
+
+
+def normalize_loudness(pcm: np.ndarray, target_dbfs: float = -14.0, peak_dbfs: float = -1.0) -> np.ndarray:
+    """Gleicht die RMS-Lautheit an ``target_dbfs`` an, ohne ``peak_dbfs`` zu überschreiten."""
+    samples = pcm.astype(np.float32)
+    rms = float(np.sqrt(np.mean(np.square(samples)))) if samples.size else 0.0
+    if rms <= 0:
+        return pcm
+    gain = 10 ** (target_dbfs / 20) * 32768 / rms
+    peak = float(np.max(np.abs(samples)))
+    gain = min(gain, 10 ** (peak_dbfs / 20) * 32768 / peak)
+    return np.clip(np.rint(samples * gain), -32768, 32767).astype(np.int16)
+
+
+def _crossfade(tail: np.ndarray, head: np.ndarray) -> np.ndarray:
+    """Lineares Überblenden wie ``AudioSegment.append(crossfade=...)``, mit Clipping-Schutz."""
+    n = len(tail)
+    ramp = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32).reshape(-1, 1)
+    mixed = tail.astype(np.float32) * (1.0 - ramp) + head.astype(np.float32) * ramp
+    return np.clip(np.rint(mixed), -32768, 32767).astype(np.int16)
+
+
+class PcmAssembler:
+    """Fügt PCM-Segmente mit Crossfade streamend in eine WAV-Datei zusammen.
+
+    Statt den wachsenden Puffer bei jedem ``append`` zu kopieren, wird nur das
+    Überblendfenster des letzten Segments zurückgehalten; alles davor landet
+    direkt in der Datei. Speicherbedarf und Laufzeit wachsen damit linear.
+    """
+
+    def __init__(self, path: str, sample_rate: int = SAMPLE_RATE, channels: int = CHANNELS, crossfade_ms: int = 100):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.crossfade = int(sample_rate * crossfade_ms / 1000)
+        self.frames = 0
+        self._tail: np.ndarray | None = None
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write(self, pcm: np.ndarray) -> None:
+        if len(pcm):
+            self._wav.writeframes(np.ascontiguousarray(pcm, dtype="<i2").tobytes())
+            self.frames += len(pcm)
+
+    def add(self, pcm: np.ndarray) -> None:
+        """Hängt ein Segment an; überblendet mit dem zurückgehaltenen Ende des Vorgängers."""
+        pcm = np.asarray(pcm, dtype=np.int16).reshape(-1, self.channels)
+        if self._tail is None:
+            body = pcm
+        else:
+            cf = min(self.crossfade, len(self._tail), len(pcm))
+            self._write(self._tail[:len(self._tail) - cf])
+            self._write(_crossfade(self._tail[len(self._tail) - cf:], pcm[:cf]))
+            body = pcm[cf:]
+        keep = min(self.crossfade, len(body))
+        self._write(body[:len(body) - keep])
+        self._tail = body[len(body) - keep:]
+
+    def add_segment(self, seg) -> None:
+        """Wie ``add``, aber direkt mit einem pydub-AudioSegment."""
+        self.add(segment_to_pcm(seg, self.sample_rate, self.channels))
+
+    def close(self) -> float:
+        """Schreibt das Restfenster, schließt die Datei und liefert die Dauer in ms."""
+        if self._wav is not None:
+            if self._tail is not None:
+                self._write(self._tail)
+                self._tail = None
+            self._wav.close()
+            self._wav = None
+        return self.frames * 1000 / self.sample_rate
+
+
+def read_wav_pcm(path: str) -> tuple[np.ndarray, int]:
+    """Öffnet eine 16-bit-WAV als speicherabgebildetes Array (frames, channels) ohne Dekodieren."""
+    with open(path, "rb") as f:
+        w = wave.open(f, "rb")
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: nur 16-bit PCM wird unterstützt (sampwidth={w.getsampwidth()})")
+        channels = w.getnchannels()
+        sample_rate = w.getframerate()
+        frames = w.getnframes()
+        # Nach dem Header-Parsing steht der Dateizeiger am Beginn des data-Chunks
+        offset = f.tell()
+    if frames == 0:
+        return np.zeros((0, channels), dtype=np.int16), sample_rate
+    pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(frames * channels,))
+    return pcm.reshape(-1, channels), sample_rate
+
+
+def mix_with_pydub(voice, music, music_gain_db: float = -18.0, voice_offset_ms: int = 200,
+                   tail_ms: int = 2000, fade_out_ms: int = 1500):
+    """Referenz-Mix mit pydub-Operationen (bisheriger Weg, dient als Vergleich)."""
+    if music is None:
+        return voice
+    music = music + music_gain_db
+    target_len = len(voice) + tail_ms  # kleiner Puffer für das Fade-Out
+    reps = max(2, -(-target_len // len(music)) + 1)
+    music = (music * reps)[:target_len]
+    music = music.fade_out(fade_out_ms)
+    return music.overlay(voice, position=voice_offset_ms)
+
+
+class VoiceMusicMixer:
+    """Mischt Sprache und Musik-Loop blockweise auf NumPy-Arrays.
+
+    Pro Ausgabeblock werden Loop (Index modulo Musiklänge), Lautstärke, Fade-Out,
+    Resampling der Stimme (linear) und Overlay in einem vektorisierten Schritt
+    berechnet; nichts wird in voller Länge vervielfältigt. Ohne Musik wird die
+    Stimme unverändert durchgereicht.
+    """
+
+    def __init__(self, voice: np.ndarray, voice_rate: int, music: np.ndarray | None = None,
+                 music_rate: int | None = None, music_gain_db: float = -18.0, voice_offset_ms: int = 200,
+                 tail_ms: int = 2000, fade_out_ms: int = 1500):
+        self.voice = voice.reshape(len(voice), -1)
+        self.voice_rate = voice_rate
+        self.music = None if music is None or len(music) == 0 else music.reshape(len(music), -1)
+        if self.music is None:
+            self.sample_rate = voice_rate
+            self.channels = self.voice.shape[1]
+            self.frames = len(self.voice)
+            return
+        self.sample_rate = music_rate or voice_rate
+        self.channels = max(self.music.shape[1], self.voice.shape[1])
+        self.gain = np.float32(10 ** (music_gain_db / 20))
+        self.voice_start = int(round(voice_offset_ms * self.sample_rate / 1000))
+        self.frames = int(round(len(self.voice) * self.sample_rate / voice_rate)) + int(tail_ms * self.sample_rate / 1000)
+        self.fade_frames = max(1, int(fade_out_ms * self.sample_rate / 1000))
+
+    def _widen(self, block: np.ndarray) -> np.ndarray:
+        if block.shape[1] == self.channels:
+            return block
+        return np.repeat(block, self.channels // block.shape[1], axis=1)
+
+    def _music_block(self, start: int, stop: int) -> np.ndarray:
+        """Schneidet den Loop per Startindex modulo Musiklänge aus (ohne Vervielfältigung)."""
+        out = np.empty((stop - start, self.music.shape[1]), dtype=np.float32)
+        pos, src = 0, start % len(self.music)
+        while pos < len(out):
+            n = min(len(out) - pos, len(self.music) - src)
+            out[pos:pos + n] = self.music[src:src + n]
+            pos += n
+            src = 0
+        out *= self.gain
+        return self._widen(out)
+
+    def _voice_block(self, start: int, stop: int) -> tuple[int, np.ndarray]:
+        """Stimme für die Ausgabe-Samples [start, stop) auf die Ausgaberate interpoliert.
+
+        Liefert (Offset im Block, Werte); der gültige Bereich ist immer zusammenhängend.
+        """
+        ratio = self.voice_rate / self.sample_rate
+        last = self.voice_start + int(np.floor((len(self.voice) - 1) / ratio))
+        a, b = max(start, self.voice_start), min(stop, last + 1)
+        if a >= b:
+            return 0, np.zeros((0, self.channels), dtype=np.float32)
+        if self.voice_rate == self.sample_rate:
+            values = np.asarray(self.voice[a - self.voice_start:b - self.voice_start], dtype=np.float32)
+            return a - start, self._widen(values)
+        pos = (np.arange(a, b, dtype=np.float64) - self.voice_start) * ratio
+        lo = int(pos[0])
+        hi = min(int(pos[-1]) + 2, len(self.voice))
+        window = np.asarray(self.voice[lo:hi], dtype=np.float32)
+        grid = np.arange(lo, hi, dtype=np.float64)
+        values = np.empty((b - a, window.shape[1]), dtype=np.float32)
+        for ch in range(window.shape[1]):
+            values[:, ch] = np.interp(pos, grid, window[:, ch])
+        return a - start, self._widen(values)
+
+    def blocks(self, block_frames: int = SAMPLE_RATE * 10):
+        """Erzeugt den Mix als int16-Blöcke der Form (frames, channels)."""
+        if self.music is None:
+            for start in range(0, self.frames, block_frames):
+                yield np.asarray(self.voice[start:start + block_frames], dtype=np.int16)
+            return
+        fade_start = self.frames - self.fade_frames
+        for start in range(0, self.frames, block_frames):
+            stop = min(start + block_frames, self.frames)
+            out = self._music_block(start, stop)
+            if stop > fade_start:
+                a = max(start, fade_start)
+                fade = 1.0 - (np.arange(a, stop, dtype=np.float32) - fade_start) / self.fade_frames
+                out[a - start:] *= np.clip(fade, 0.0, 1.0).reshape(-1, 1)
+            offset, values = self._voice_block(start, stop)
+            out[offset:offset + len(values)] += values
+            np.clip(out, -32768, 32767, out=out)
+            yield out.astype(np.int16)
+
+    def render(self) -> np.ndarray:
+        """Rendert den kompletten Mix in ein vorab reserviertes Array."""
+        out = np.empty((self.frames, self.channels), dtype=np.int16)
+        pos = 0
+        for block in self.blocks():
+            out[pos:pos + len(block)] = block
+            pos += len(block)
+        return out
+
+    def write_wav(self, path: str) -> None:
+        """Schreibt den Mix blockweise als 16-bit-WAV."""
+        with wave.open(path, "wb") as w:
+            w.setnchannels(self.channels)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            for block in self.blocks():
+                w.writeframes(np.ascontiguousarray(block, dtype="<i2").tobytes())
@@ -0,0 +1,73 @@
+"""Misst die Importzeit von podcast_generator per ``python -X importtime``.
+
+Jeder Lauf startet einen frischen Interpreter; berichtet werden der Median der
+Gesamtzeit und die teuersten direkt importierten Pakete.
+
+Nutzung: python benchmarks/bench_import.py [--module podcast_generator] [--runs 5] [--top 8]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _import_profile(module: str, env: dict[str, str]) -> tuple[float, dict[str, float]]:
+    """Gesamtzeit (ms) und kumulative Zeit (ms) der direkt importierten Module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    total, children, pending = 0.0, {}, {}
+    for match in _LINE.finditer(proc.stderr):
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = len(match.group(3)) // 2
+        name = match.group(4)
+        if depth == 1:
+            # Kinder erscheinen vor ihrem Elternmodul (z.B. site beim Interpreterstart)
+            pending[name] = cumulative_ms
+        elif depth == 0:
+            if name == module:
+                total, children = cumulative_ms, pending
+            pending = {}
+    return total, children
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="podcast_generator")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="podcast_import_") as tmp:
+        env = dict(os.environ)
+        # Platzhalter, damit auch Stände mit Pflichtprüfung beim Import messbar sind
+        for name in ("GEMINI_API_KEY", "FREESOUND_API_KEY", "PODCAST_NAME", "PODCAST_SLOGAN"):
+            env.setdefault(name, "benchmark")
+        env.setdefault("GOOGLE_APPLICATION_CREDENTIALS", os.path.join(tmp, "credentials.json"))
+        for name in ("PODCAST_TEMP_DIR", "PODCAST_OUTPUT_DIR", "PODCAST_ASSETS_DIR"):
+            env.setdefault(name, os.path.join(tmp, name.lower()))
+
+        totals, children = [], {}
+        for _ in range(args.runs):
+            total, kids = _import_profile(args.module, env)
+            totals.append(total)
+            for name, ms in kids.items():
+                children.setdefault(name, []).append(ms)
+
+    print(f"import {args.module}: Median {statistics.median(totals):.0f} ms "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}, {args.runs} Läufe)")
+    ranked = sorted(((statistics.median(v), k) for k, v in children.items()), reverse=True)
+    for ms, name in ranked[:args.top]:
+        print(f"   {ms:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
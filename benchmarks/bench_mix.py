@@ -0,0 +1,64 @@
+"""Vergleicht den pydub-Mix mit dem NumPy-Mixer auf synthetischen Episoden.
+
+Nutzung: python benchmarks/bench_mix.py [--minutes 10 30 60]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pydub import AudioSegment
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from audio_engine import VoiceMusicMixer, mix_with_pydub, segment_to_pcm  # noqa: E402
+
+
+def _synthetic(seconds: float, rate: int, channels: int, freq: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    signal = np.sin(2 * np.pi * freq * t) * 6000 + rng.normal(0, 800, len(t))
+    return np.repeat(signal.astype(np.int16).reshape(-1, 1), channels, axis=1)
+
+
+def _to_segment(pcm: np.ndarray, rate: int) -> AudioSegment:
+    return AudioSegment(data=pcm.tobytes(), sample_width=2, frame_rate=rate, channels=pcm.shape[1])
+
+
+def run(minutes: int) -> dict:
+    voice = _synthetic(minutes * 60, 24000, 1, 180, seed=1)
+    music = _synthetic(120, 44100, 2, 90, seed=2)
+    voice_seg, music_seg = _to_segment(voice, 24000), _to_segment(music, 44100)
+
+    start = time.perf_counter()
+    ref = segment_to_pcm(mix_with_pydub(voice_seg, music_seg), 44100, 2)
+    pydub_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mixed = VoiceMusicMixer(voice, 24000, music, 44100).render()
+    numpy_s = time.perf_counter() - start
+
+    n = min(len(ref), len(mixed))
+    diff = ref[:n].astype(np.int32) - mixed[:n].astype(np.int32)
+    return {
+        "minutes": minutes,
+        "pydub_s": round(pydub_s, 3),
+        "numpy_s": round(numpy_s, 3),
+        "speedup": round(pydub_s / numpy_s, 1) if numpy_s else None,
+        "frames_delta": len(ref) - len(mixed),
+        "rms_diff": round(float(np.sqrt(np.mean(diff.astype(np.float64) ** 2))), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 30, 60])
+    args = parser.parse_args()
+    print(f"{'min':>4} {'pydub s':>9} {'numpy s':>9} {'x':>6} {'Δframes':>8} {'rms diff':>9}")
+    for minutes in args.minutes:
+        r = run(minutes)
+        print(f"{r['minutes']:>4} {r['pydub_s']:>9} {r['numpy_s']:>9} {r['speedup']:>6} {r['frames_delta']:>8} {r['rms_diff']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Misst Stimme, Mixing, Video und den Gesamtdurchsatz offline mit Fake-Backends.
+
+Gemini, Cloud TTS, Freesound und pytrends werden durch deterministische Attrappen
+(benchmarks/fakes.py) ersetzt; es werden weder API-Keys noch Netzwerk gebraucht.
+Optionale PODCAST_*-Variablen aus der Umgebung (z.B. PODCAST_FAST_VIDEO) gelten weiter.
+
+Nutzung: python benchmarks/bench_pipeline.py [--words 300 700] [--repeat 3] [--latency-ms 0]
+                                             [--json bench.json] [--compare alt.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fakes import (  # noqa: E402
+    FakeFreesound, FakeGenaiClient, FakeTextToSpeechClient, FakeTrendReq, env_for, make_cover,
+)
+
+STAGES = ("generate_voice", "fetch_music", "mix_audio", "create_video")
+# Kennzahlen, bei denen ein höherer Wert besser ist (alle übrigen: Sekunden, niedriger ist besser)
+HIGHER_IS_BETTER = {"realtime_factor"}
+
+
+def _load_generator(root: str, latency: float, tts_latency: float):
+    """Importiert podcast_generator mit Benchmark-Umgebung und tauscht alle Backends aus."""
+    os.environ.update(env_for(root))
+    # Drosselung und Messdatei würden nur die Fakes bzw. das Dateisystem messen
+    os.environ.setdefault("PODCAST_GEMINI_RPM", "100000")
+    os.environ.setdefault("PODCAST_GEMINI_TTS_RPM", "100000")
+    os.environ.setdefault("PODCAST_METRICS_FILE", "")
+    # Kein globaler TTS- bzw. Antwort-Cache: jede Wiederholung synthetisiert und generiert kalt
+    os.environ.setdefault("PODCAST_TTS_CACHE_MB", "0")
+    os.environ.setdefault("PODCAST_LLM_CACHE_MB", "0")
+    make_cover(os.path.join(root, "assets", "cover.png"))
+
+    import podcast_generator as pg
+    import pytrends.request
+    from google.cloud import texttospeech
+
+    fake = FakeGenaiClient(latency=latency, tts_latency=tts_latency)
+    pg.client.client = fake
+    pg.freesound = FakeFreesound(latency=latency)
+    pytrends.request.TrendReq = FakeTrendReq
+    texttospeech.TextToSpeechClient = FakeTextToSpeechClient
+    return pg, fake
+
+
+def _audio_seconds(path: str) -> float:
+    with wave.open(path, "rb") as w:
+        return w.getnframes() / w.getframerate()
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_stages(pg, fake, words: int, run: int) -> dict:
+    """Einzelne Stufen nacheinander (ohne Parallelität) auf frischem Episodenordner."""
+    fake.script_words = words
+    bot = pg.PodcastGenerator(f"Stufen {words} #{run}")
+    bot.generate_script()
+    result = {stage: _timed(getattr(bot, stage)) for stage in STAGES}
+    result["audio_s"] = _audio_seconds(bot.audio_voice_path)
+    return result
+
+
+def run_end_to_end(pg, fake, words: int, run: int) -> dict:
+    """Komplette Episode über run_episode (Stufen-DAG wie im Produktivbetrieb)."""
+    fake.script_words = words
+    start = time.perf_counter()
+    report = pg.run_episode(f"Episode {words} #{run}")
+    wall = time.perf_counter() - start
+    if report["status"] != "ok":
+        raise RuntimeError(f"Episode fehlgeschlagen: {report['error']}")
+    return {"end_to_end": wall}
+
+
+def _git_revision() -> dict:
+    def _git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {"commit": _git("rev-parse", "HEAD"), "dirty": bool(_git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def _median_results(runs: list[dict]) -> dict:
+    return {key: round(statistics.median(r[key] for r in runs), 4) for key in runs[0]}
+
+
+def _print_table(results: list[dict]) -> None:
+    cols = ["words", "audio_s", *STAGES, "end_to_end", "realtime_factor"]
+    print(" ".join(f"{c:>15}" for c in cols))
+    for row in results:
+        print(" ".join(f"{row[c]:>15.2f}" if isinstance(row[c], float) else f"{row[c]:>15}" for c in cols))
+
+
+def _print_comparison(results: list[dict], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    old_rows = {row["words"]: row for row in baseline["results"]}
+    print(f"\nVergleich mit {baseline_path} ({baseline.get('commit', '?')[:10]}); negative % = schneller:")
+    for row in results:
+        old = old_rows.get(row["words"])
+        if not old:
+            continue
+        parts = []
+        for key in (*STAGES, "end_to_end", "realtime_factor"):
+            if key in old and old[key]:
+                change = (row[key] - old[key]) / old[key] * 100
+                if key in HIGHER_IS_BETTER:
+                    change = -change
+                parts.append(f"{key} {change:+.1f}%")
+        print(f"   {row['words']} Wörter: " + ", ".join(parts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[300, 700], help="Skriptlängen in Wörtern")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen je Länge (Median wird berichtet)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulierte Latenz je API-Aufruf")
+    parser.add_argument("--tts-latency-ms", type=float, default=None, help="abweichende Latenz je TTS-Aufruf")
+    parser.add_argument("--json", help="Ergebnisse inkl. Commit und Parametern als JSON speichern")
+    parser.add_argument("--compare", help="früheres --json-Ergebnis zum Vergleich")
+    parser.add_argument("--verbose", action="store_true", help="Ausgaben der Pipeline anzeigen")
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    tts_latency = latency if args.tts_latency_ms is None else args.tts_latency_ms / 1000
+    with tempfile.TemporaryDirectory(prefix="podcast_bench_") as root:
+        pg, fake = _load_generator(root, latency, tts_latency)
+        fixed = set(env_for(root))
+        results = []
+        for words in args.words:
+            runs = []
+            for run in range(args.repeat):
+                with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+                    row = run_stages(pg, fake, words, run)
+                    row.update(run_end_to_end(pg, fake, words, run))
+                runs.append(row)
+            row = {"words": words, **_median_results(runs)}
+            row["realtime_factor"] = round(row["audio_s"] / row["end_to_end"], 2)
+            results.append(row)
+
+    summary = {
+        **_git_revision(),
+        "python": platform.python_version(),
+        "params": {
+            "repeat": args.repeat, "latency_ms": args.latency_ms, "tts_latency_ms": args.tts_latency_ms,
+            "settings": {k: v for k, v in sorted(os.environ.items()) if k.startswith("PODCAST_") and k not in fixed},
+        },
+        "results": results,
+    }
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nGespeichert: {args.json}")
+    if args.compare:
+        _print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
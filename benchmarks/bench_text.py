@@ -0,0 +1,93 @@
+"""Vergleicht die bisherige Mehrfach-Pass-Textaufbereitung mit dem TextNormalizer.
+
+Referenz ist die frühere Kette aus vier ``re.sub``-Durchläufen (Markup), einem
+Abkürzungs-Durchlauf mit Neukompilierung und dem mehrstufigen SSML-Aufbau. Vor
+der Messung wird geprüft, dass beide Wege denselben Klartext liefern.
+
+Nutzung: python benchmarks/bench_text.py [--chars 100000 1000000] [--repeat 5]
+"""
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fakes import synthetic_script  # noqa: E402
+from utils import TextNormalizer, _to_ssml  # noqa: E402
+
+
+def legacy_clean(text: str) -> str:
+    text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", text)
+    text = re.sub(r"\[\s*([^\]]+)\s*\]", r"\1", text)
+    text = re.sub(r"\(\s*([^\)]+)\s*\)", r"\1", text)
+    text = re.sub(r"\*(.*?)\*", r"\1", text)
+    pattern = re.compile(r"(?<!#)\b([A-ZÄÖÜ]{2,3})\b")
+    stoplist = {
+        "DER", "DIE", "DAS", "UND", "DEN", "DEM", "DES", "EIN", "EINE",
+        "VON", "MIT", "AUS", "IM", "IN", "AM", "BEI", "AUF", "FÜR", "AN",
+        "IST", "SIND", "ICH", "DU", "ER", "SIE", "ES", "WIR", "IHR",
+    }
+    return pattern.sub(lambda m: m.group(1) if m.group(1) in stoplist else " ".join(m.group(1)), text)
+
+
+def legacy_ssml(text: str) -> str:
+    safe_text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    safe_text = re.sub(r'\*([^\*]+)\*', r'<emphasis level="moderate">\1</emphasis>', safe_text)
+    parts = ["<speak>"]
+    for para in [p.strip() for p in safe_text.split("\n\n") if p.strip()]:
+        parts.append("<p>")
+        parts.extend(f"<s>{s.strip()}</s>" for s in re.split(r"(?<=[\.\?!])\s+", para) if s.strip())
+        parts.append("</p>")
+    parts.append("</speak>")
+    return "".join(parts)
+
+
+def transcript(chars: int, seed: int = 0) -> str:
+    """Skripttext mit Links, Klammern, Abkürzungen und Sonderzeichen, wie ihn Gemini liefert."""
+    rng = random.Random(seed)
+    extras = ["[Quelle](https://example.org/x)", "(siehe oben)", "[Hinweis]", "KI", "NASA", "USA", "#KI", "&", "DER"]
+    words = synthetic_script(chars // 5, seed).replace("\nQUELLEN:", "\n\nQUELLEN:").split(" ")
+    for i in range(0, len(words), 7):
+        words[i] = f"{words[i]} {rng.choice(extras)}"
+    return " ".join(words)[:chars]
+
+
+def _best(fn, text: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chars", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    normalizer = TextNormalizer({"Gemini": "Dschemini"})
+    plain = TextNormalizer()
+    print(f"{'Zeichen':>10} {'alt clean':>10} {'neu clean':>10} {'alt +SSML':>10} {'neu SSML':>10} {'Faktor':>7}")
+    for chars in args.chars:
+        text = transcript(chars)
+        cleaned = legacy_clean(text)
+        if plain.clean(text) != cleaned or _to_ssml(cleaned) != legacy_ssml(cleaned):
+            raise SystemExit("Abweichung zwischen alter Kette und TextNormalizer")
+        old_clean = _best(legacy_clean, text, args.repeat)
+        new_clean = _best(normalizer.clean, text, args.repeat)
+        # Alt: bereinigen und danach SSML bauen; neu: beides in einem Durchlauf
+        old_ssml = _best(lambda t: legacy_ssml(legacy_clean(t)), text, args.repeat)
+        new_ssml = _best(normalizer.to_ssml, text, args.repeat)
+        print(f"{chars:>10} {old_clean * 1000:>8.1f}ms {new_clean * 1000:>8.1f}ms "
+              f"{old_ssml * 1000:>8.1f}ms {new_ssml * 1000:>8.1f}ms {old_ssml / new_ssml:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Misst die Encode-Zeit des Standbild-Videos (Standard vs. Schnellmodus) pro Audio-Minute.
+
+Nutzung: python benchmarks/bench_video.py [--minutes 1 5] [--cover assets/cover.png]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from media import build_video_cmd, prepare_cover  # noqa: E402
+
+
+def _make_audio(path: str, minutes: float) -> None:
+    cmd = [
+        "ffmpeg", "-y", "-f", "lavfi", "-i", f"sine=frequency=220:duration={minutes * 60}",
+        "-c:a", "aac", "-b:a", "192k", path,
+    ]
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+
+
+def _encode(cmd: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--cover", default=str(ROOT / "assets" / "cover.png"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        scaled = prepare_cover(args.cover, tmp)
+        print(f"Cover vorskaliert in {time.perf_counter() - start:.2f}s -> {os.path.basename(scaled)}")
+        print(f"{'min':>5} {'standard s':>11} {'s/min':>7} {'fast s':>8} {'s/min':>7} {'x':>6}")
+        for minutes in args.minutes:
+            audio = os.path.join(tmp, f"audio_{minutes}.m4a")
+            _make_audio(audio, minutes)
+            video = os.path.join(tmp, "out.mp4")
+            standard = _encode(build_video_cmd(args.cover, audio, video, copy_audio=True))
+            fast = _encode(build_video_cmd(scaled, audio, video, copy_audio=True, fast=True))
+            print(f"{minutes:>5} {standard:>11.2f} {standard / minutes:>7.2f} {fast:>8.2f} {fast / minutes:>7.2f} "
+                  f"{standard / fast:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Deterministische Ersatz-Backends für Gemini, Cloud TTS, Freesound und pytrends.
+
+Alle Antworten sind synthetisch und reproduzierbar (fester Seed); Latenzen werden
+per ``time.sleep`` simuliert. Gedacht für Benchmarks ohne API-Keys und Netzwerk.
+"""
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from google.genai import types
+from pydub import AudioSegment
+
+SAMPLE_RATE = 24000
+WORDS_PER_SECOND = 2.5  # ~150 Wörter pro Minute Sprechtempo
+
+_VOCAB = (
+    "der die das und ist nicht ein eine mit auf für von im zu Wissen Fakt Welt Stern Licht Zeit "
+    "Energie Forschung Geschichte Menschen heute wirklich spannend zeigt erklärt einfach klein groß "
+    "schnell neu alt Frage Antwort Beispiel Idee Podcast Folge Thema Zukunft Natur Technik"
+).split()
+
+
+def synthetic_script(words: int, seed: int = 0) -> str:
+    """Deutsch anmutender Sprechtext mit Absätzen, Betonungen und QUELLEN-Zeile."""
+    rng = random.Random(seed)
+    paragraphs, sentences, sentence, total = [], [], [], 0
+    while total < words:
+        word = rng.choice(_VOCAB)
+        if rng.random() < 0.02:
+            word = f"*{word}*"
+        sentence.append(word)
+        total += 1
+        if len(sentence) >= rng.randint(8, 14):
+            sentences.append(" ".join(sentence).capitalize() + ".")
+            sentence = []
+            if len(sentences) >= rng.randint(4, 6):
+                paragraphs.append(" ".join(sentences))
+                sentences = []
+    if sentence:
+        sentences.append(" ".join(sentence).capitalize() + ".")
+    if sentences:
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs) + "\nQUELLEN: https://example.org/a; https://example.org/b"
+
+
+def speech_pcm(text: str, seed: int = 0) -> bytes:
+    """Mono-s16le-PCM (24 kHz), dessen Länge dem Sprechtempo des Texts entspricht."""
+    seconds = max(0.5, len(text.split()) / WORDS_PER_SECOND)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    freq = 180 + (seed % 7) * 15
+    wave = np.sin(2 * np.pi * freq * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    return (wave * 6000).astype("<i2").tobytes()
+
+
+class _Latency:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, seconds: float | None = None):
+        with self._lock:
+            self.calls += 1
+        seconds = self.seconds if seconds is None else seconds
+        if seconds:
+            time.sleep(seconds)
+
+
+class FakeModels:
+    def __init__(self, owner: "FakeGenaiClient"):
+        self._owner = owner
+
+    def list(self, *args, **kwargs):
+        self._owner.latency()
+        return [SimpleNamespace(name=f"models/{name}") for name in self._owner.model_names]
+
+    def generate_content(self, model: str, contents, config=None):
+        if config is not None and getattr(config, "response_modalities", None):
+            return self._owner.audio_response(contents)  # eigene TTS-Latenz
+        self._owner.latency()
+        prompt = contents if isinstance(contents, str) else str(contents)
+        if config is not None and getattr(config, "response_schema", None):
+            return self._owner.batch_metadata_response(prompt)
+        return self._owner.text_response(prompt)
+
+    def generate_content_stream(self, model: str, contents, config=None):
+        # Gleiche Gesamtlatenz wie generate_content, aber auf die Absätze verteilt (ein Aufruf)
+        text = self._owner.text_response(contents if isinstance(contents, str) else str(contents)).text
+        paragraphs = text.split("\n\n")
+        share = self._owner.latency.seconds / len(paragraphs)
+        for i, paragraph in enumerate(paragraphs):
+            if i == 0:
+                self._owner.latency(share)
+            elif share:
+                time.sleep(share)
+            yield SimpleNamespace(text=paragraph + "\n\n")
+
+
+class FakeGenaiClient:
+    """Imitiert ``genai.Client``: Text (Skript, JSON-Metadaten, Übersetzung) und TTS-Audio."""
+
+    model_names = ("gemini-2.5-flash", "gemini-2.0-flash", "gemini-2.5-pro-preview-tts")
+
+    def __init__(self, script_words: int = 700, latency: float = 0.0, tts_latency: float | None = None):
+        self.script_words = script_words
+        self.latency = _Latency(latency)
+        self.tts_latency = _Latency(latency if tts_latency is None else tts_latency)
+        self.models = FakeModels(self)
+
+    def text_response(self, prompt: str):
+        if "JSON" in prompt:
+            text = json.dumps({"title": "Benchmark-Folge", "description": "Eine synthetische Beschreibung."})
+        elif prompt.startswith("Translate"):
+            text = "benchmark topic"
+        else:
+            text = synthetic_script(self.script_words)
+        return SimpleNamespace(text=text, candidates=[])
+
+    def batch_metadata_response(self, prompt: str):
+        """Sammel-Metadaten: ein Objekt je ``Episode N:`` im Prompt."""
+        items = [
+            {"id": int(n), "title": f"Benchmark-Folge {n}", "description": "Eine synthetische Beschreibung."}
+            for n in re.findall(r"^Episode (\d+):", prompt, re.MULTILINE)
+        ]
+        return SimpleNamespace(text=json.dumps(items, ensure_ascii=False), candidates=[])
+
+    def audio_response(self, contents):
+        self.tts_latency()
+        text = " ".join(part.text or "" for content in contents for part in content.parts)
+        blob = types.Blob(data=speech_pcm(text, seed=len(text)), mime_type=f"audio/L16;rate={SAMPLE_RATE}")
+        part = types.Part(inline_data=blob)
+        return SimpleNamespace(candidates=[types.Candidate(content=types.Content(parts=[part]))], text=None)
+
+
+class FakeTextToSpeechClient:
+    """Imitiert ``texttospeech.TextToSpeechClient.synthesize_speech`` (MP3 bzw. LINEAR16)."""
+
+    latency = _Latency(0.0)
+
+    def synthesize_speech(self, input=None, voice=None, audio_config=None, **kwargs):
+        self.latency()
+        text = getattr(input, "ssml", None) or getattr(input, "text", "") or ""
+        pcm = speech_pcm(text, seed=len(text))
+        encoding = getattr(getattr(audio_config, "audio_encoding", None), "name", "")
+        seg = AudioSegment(data=pcm, sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+        buf = io.BytesIO()
+        seg.export(buf, format="wav" if encoding == "LINEAR16" else "mp3")
+        return SimpleNamespace(audio_content=buf.getvalue())
+
+
+class FakeFreesound:
+    """Imitiert ``FreesoundClient``: ein Treffer, Preview-MP3 mit ``seconds`` Länge."""
+
+    def __init__(self, seconds: float = 120.0, latency: float = 0.0):
+        self.seconds = seconds
+        self.latency = _Latency(latency)
+        self._mp3: bytes | None = None
+
+    def search(self, query: str, **kwargs) -> list[dict]:
+        self.latency()
+        return [{"id": 4242, "name": "Synthetic Loop"}]
+
+    def sound(self, track_id) -> dict:
+        self.latency()
+        return {"id": track_id, "tags": ["loop", "calm"], "duration": self.seconds,
+                "previews": {"preview-hq-mp3": f"fake://{track_id}.mp3"}}
+
+    def download(self, url: str, path: str, **kwargs) -> int:
+        self.latency()
+        if self._mp3 is None:
+            t = np.arange(int(self.seconds * 44100)) / 44100
+            wave = (np.sin(2 * np.pi * 110 * t) * 4000).astype("<i2")
+            seg = AudioSegment(data=np.repeat(wave, 2).tobytes(), sample_width=2, frame_rate=44100, channels=2)
+            buf = io.BytesIO()
+            seg.export(buf, format="mp3", bitrate="128k")
+            self._mp3 = buf.getvalue()
+        with open(path, "wb") as f:
+            f.write(self._mp3)
+        return len(self._mp3)
+
+
+class FakeTrendReq:
+    """Imitiert ``pytrends.request.TrendReq`` (verwandte Suchanfragen, Tagestrends)."""
+
+    latency = _Latency(0.0)
+
+    def __init__(self, *args, **kwargs):
+        self._keywords = []
+
+    def build_payload(self, kw_list, **kwargs):
+        self.latency()
+        self._keywords = list(kw_list)
+
+    def related_queries(self):
+        self.latency()
+        # Leere Top-Liste: das Thema bleibt stabil, damit Läufe vergleichbar sind
+        return {kw: {"top": pd.DataFrame(columns=["query", "value"]), "rising": None} for kw in self._keywords}
+
+    def today_searches(self, pn="DE"):
+        self.latency()
+        return pd.Series(["Benchmark Trend"])
+
+    def realtime_trending_searches(self, pn="DE", count=50):
+        self.latency()
+        return pd.DataFrame({"title": ["Benchmark Trend"]})
+
+    def trending_searches(self, pn="germany"):
+        self.latency()
+        return pd.DataFrame([["Benchmark Trend"]])
+
+
+def make_cover(path: str, width: int = 1280, height: int = 720) -> str:
+    """Schreibt ein einfarbiges PNG-Cover (über ein PPM-Zwischenbild und FFmpeg)."""
+    ppm = f"{path}.ppm"
+    with open(ppm, "wb") as f:
+        f.write(f"P6 {width} {height} 255\n".encode() + bytes([40, 60, 90]) * (width * height))
+    subprocess.run(["ffmpeg", "-y", "-i", ppm, path], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+    os.remove(ppm)
+    return path
+
+
+def env_for(root: str) -> dict[str, str]:
+    """Pflicht-Umgebung für ``podcast_generator`` mit Ordnern unter ``root``."""
+    dirs = {name: os.path.join(root, name) for name in ("temp", "output", "assets")}
+    for path in dirs.values():
+        os.makedirs(path, exist_ok=True)
+    return {
+        "GEMINI_API_KEY": "benchmark",
+        "GOOGLE_APPLICATION_CREDENTIALS": os.path.join(root, "credentials.json"),
+        "FREESOUND_API_KEY": "benchmark",
+        "PODCAST_NAME": "Benchmark",
+        "PODCAST_SLOGAN": "Messen statt raten",
+        "PODCAST_TEMP_DIR": dirs["temp"],
+        "PODCAST_OUTPUT_DIR": dirs["output"],
+        "PODCAST_ASSETS_DIR": dirs["assets"],
+    }
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+
+def make_key(*parts) -> str:
+    """Bildet einen stabilen Inhalts-Hash aus beliebigen Schlüsselteilen."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")  # Trenner, damit ("ab", "c") != ("a", "bc")
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def summary(self) -> str:
+        return f"{self.hits} Treffer, {self.misses} Fehlversuche, {self.writes} neu, {self.evictions} verdrängt"
+
+
+class DiskCache:
+    """Datei-Cache für Bytes mit LRU-Verdrängung nach Gesamtgröße und optionalem TTL.
+
+    Jeder Eintrag ist eine Datei ``<key><suffix>``. Die Schreibzeit (mtime) dient
+    dem TTL, die letzte Nutzung (atime, wird bei Treffern explizit gesetzt) der
+    LRU-Reihenfolge. Schreiben erfolgt atomar, damit parallele Threads/Prozesse
+    nie halbe Dateien lesen.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 0, ttl: float | None = None, suffix: str = ".bin"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.suffix = suffix
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def _expired(self, mtime: float) -> bool:
+        return self.ttl is not None and time.time() - mtime > self.ttl
+
+    def _read(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            st = os.stat(path)
+            if self._expired(st.st_mtime):
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+            # atime = letzte Nutzung (LRU), mtime = Schreibzeit (TTL) bleibt erhalten
+            os.utime(path, (time.time(), st.st_mtime))
+        except OSError:
+            return None
+        return data
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+    def get(self, key: str) -> bytes | None:
+        """Liefert die gespeicherten Bytes oder None (fehlend bzw. abgelaufen)."""
+        data = self._read(key)
+        self._count(data is not None)
+        return data
+
+    def get_first(self, keys) -> tuple[str | None, bytes | None]:
+        """Erster vorhandener Eintrag aus ``keys`` (Präferenzreihenfolge) als (Schlüssel, Bytes).
+
+        Zählt als genau ein Treffer bzw. Fehlversuch, egal wie viele Schlüssel geprüft werden.
+        """
+        for key in keys:
+            data = self._read(key)
+            if data is not None:
+                self._count(True)
+                return key, data
+        self._count(False)
+        return None, None
+
+    def set(self, key: str, data: bytes) -> None:
+        """Speichert Bytes unter dem Schlüssel und verdrängt ggf. alte Einträge."""
+        path = self._path(key)
+        # Ordner erst beim ersten Schreiben anlegen: ein Cache-Objekt allein berührt die Platte nicht
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stats.writes += 1
+            if self.max_bytes:
+                self._evict()
+
+    def age(self, key: str) -> float | None:
+        """Alter eines Eintrags in Sekunden (None, wenn nicht vorhanden)."""
+        try:
+            return max(0.0, time.time() - os.stat(self._path(key)).st_mtime)
+        except OSError:
+            return None
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        for path, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def size_bytes(self) -> int:
+        return sum(st.st_size for _, st in self._entries())
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(self.suffix):
+                        try:
+                            yield entry.path, entry.stat()
+                        except OSError:
+                            continue
+        except FileNotFoundError:
+            return
+
+    def _evict(self) -> None:
+        entries = list(self._entries())
+        total = sum(st.st_size for _, st in entries)
+        if total <= self.max_bytes:
+            return
+        # Am längsten nicht genutzte Einträge zuerst entfernen
+        entries.sort(key=lambda item: item[1].st_atime)
+        for path, st in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= st.st_size
+            self.stats.evictions += 1
+
+
+def config_fingerprint(config) -> str:
+    """Stabile Textform einer Generierungs-Config (pydantic-Modell, dict oder None) für Cache-Schlüssel."""
+    if config is None:
+        return ""
+    if hasattr(config, "model_dump_json"):
+        return config.model_dump_json(exclude_none=True)
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+class ResponseCache:
+    """Antworten von Textmodellen auf der Platte, geschlüsselt nach Modell, Prompt und Config.
+
+    TTL und Größengrenze übernimmt ``DiskCache``. Mit ``bypass`` werden
+    vorhandene Einträge ignoriert, frische Antworten aber gespeichert, sodass
+    ein Lauf den Cache gezielt erneuern kann.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 0, ttl: float | None = None, bypass: bool = False):
+        self._cache = DiskCache(directory, max_bytes=max_bytes, ttl=ttl, suffix=".txt")
+        self.bypass = bypass
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+    @staticmethod
+    def key(model: str, contents, config=None) -> str:
+        return make_key("response", model, contents, config_fingerprint(config))
+
+    def get(self, model: str, contents, config=None) -> str | None:
+        if self.bypass:
+            return None
+        data = self._cache.get(self.key(model, contents, config))
+        return data.decode("utf-8") if data is not None else None
+
+    def set(self, model: str, contents, config, text: str) -> None:
+        if text:
+            self._cache.set(self.key(model, contents, config), text.encode("utf-8"))
+
+    def delete(self, model: str, contents, config=None) -> None:
+        """Verwirft eine Antwort, z.B. wenn sie sich als unbrauchbar erwiesen hat."""
+        self._cache.delete(self.key(model, contents, config))
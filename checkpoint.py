@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from cache import make_key
+
+_HASH_BLOCK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class StageState:
+    """Beschreibt, welcher Zustand einer Stufe in den Checkpoint eingeht.
+
+    ``inputs``/``input_files`` sind Attributnamen (Werte bzw. Dateipfade, deren Inhalt
+    zählt), ``settings`` feste Konfigurationswerte; zusammen bilden sie den
+    Eingabeschlüssel. ``outputs`` werden nach dem Lauf gespeichert und beim
+    Fortsetzen wiederhergestellt, ``output_files`` müssen dafür unverändert existieren.
+    """
+
+    inputs: tuple[str, ...] = ()
+    input_files: tuple[str, ...] = ()
+    settings: tuple = ()
+    outputs: tuple[str, ...] = ()
+    output_files: tuple[str, ...] = ()
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 des Dateiinhalts (blockweise gelesen)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """Manifest (JSON) mit den Ergebnissen jeder Stufe einer Episode.
+
+    Pro Stufe werden Eingabeschlüssel, Ausgabewerte und die Inhalts-Hashes der
+    erzeugten Dateien abgelegt. ``lookup`` liefert die Ausgaben nur, wenn der
+    Eingabeschlüssel übereinstimmt und alle Dateien noch unverändert vorliegen.
+    Hashes werden nach (Größe, mtime) gemerkt, damit große Dateien nicht bei
+    jeder Prüfung neu gelesen werden.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data.setdefault("stages", {})
+        data.setdefault("digests", {})
+        return data
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        """Verwirft alle Stufen (Neustart ohne Fortsetzen)."""
+        with self._lock:
+            self._data = {"stages": {}, "digests": {}}
+            self._save()
+
+    def digest(self, path: str) -> str | None:
+        """Inhalts-Hash einer Datei oder None, wenn sie fehlt."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            known = self._data["digests"].get(path)
+        if known and known["stamp"] == stamp:
+            return known["sha256"]
+        sha = file_digest(path)
+        with self._lock:
+            self._data["digests"][path] = {"stamp": stamp, "sha256": sha}
+        return sha
+
+    def inputs_key(self, name: str, state: StageState, owner) -> str:
+        """Eingabeschlüssel einer Stufe aus Attributwerten, Dateiinhalten und Einstellungen."""
+        values = [getattr(owner, attr) for attr in state.inputs]
+        files = [self.digest(getattr(owner, attr)) if getattr(owner, attr) else None for attr in state.input_files]
+        return make_key(name, json.dumps(values, ensure_ascii=False, default=str), *files, *state.settings)
+
+    def lookup(self, name: str, inputs_key: str) -> dict | None:
+        """Gespeicherte Ausgaben der Stufe oder None, wenn sie neu laufen muss."""
+        with self._lock:
+            entry = self._data["stages"].get(name)
+        if not entry or entry["inputs"] != inputs_key:
+            return None
+        for path, sha in entry["files"].items():
+            if self.digest(path) != sha:
+                return None
+        return entry["outputs"]
+
+    def record(self, name: str, inputs_key: str, outputs: dict, files: list[str]) -> bool:
+        """Speichert das Ergebnis einer Stufe; False, wenn eine erwartete Datei fehlt."""
+        hashes = {}
+        for path in files:
+            sha = self.digest(path)
+            if sha is None:
+                return False
+            hashes[path] = sha
+        with self._lock:
+            self._data["stages"][name] = {
+                "inputs": inputs_key,
+                "outputs": outputs,
+                "files": hashes,
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self._save()
+        return True
+
+    def stages(self) -> list[str]:
+        with self._lock:
+            return list(self._data["stages"])
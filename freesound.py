@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+
+from cache import DiskCache, make_key
+
+if TYPE_CHECKING:
+    import requests
+
+FREESOUND_API_URL = "https://freesound.org/apiv2"
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+
+def build_session(retries: int = 3, backoff: float = 0.5, pool_size: int = 8) -> "requests.Session":
+    """Session mit Connection-Pool (Keep-Alive) und automatischen Wiederholungen.
+
+    Wiederholt werden Verbindungsfehler sowie 429/5xx-Antworten mit exponentiellem
+    Backoff; ein ``Retry-After``-Header wird respektiert.
+    """
+    # requests erst hier laden: der Import kostet spürbar Startzeit und wird ohne Freesound nicht gebraucht
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class FreesoundClient:
+    """Schlanker Freesound-Client über eine gemeinsame, gepoolte ``requests.Session``.
+
+    Detail-Abfragen werden mit ETag/Last-Modified im ``cache_dir`` abgelegt und
+    danach bedingt angefragt (``If-None-Match``/``If-Modified-Since``); bei 304
+    kommt die lokale Kopie zurück. Downloads werden in Blöcken direkt auf die
+    Platte gestreamt statt komplett im Speicher gepuffert. Mit ``metrics`` wird
+    jede Anfrage als ``freesound``-Span erfasst.
+    """
+
+    def __init__(self, api_key: str, base_url: str = FREESOUND_API_URL, timeout: tuple[float, float] = (5, 30),
+                 retries: int = 3, backoff: float = 0.5, cache_dir: str | None = None,
+                 session: "requests.Session | None" = None, metrics=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._session = session
+        self.metrics = metrics
+        self._session_lock = threading.Lock()
+        self._details = DiskCache(cache_dir, suffix=".json") if cache_dir else None
+
+    @property
+    def session(self) -> "requests.Session":
+        # Erst bei der ersten Anfrage anlegen, damit Worker-Prozesse keine geerbten Sockets teilen
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = build_session(self._retries, self._backoff)
+        return self._session
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _get(self, url: str, **kwargs) -> "requests.Response":
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def _span(self, name: str):
+        return self.metrics.span("freesound", name) if self.metrics is not None else nullcontext({})
+
+    @staticmethod
+    def _retry_count(resp: "requests.Response") -> int:
+        retries = getattr(resp.raw, "retries", None)
+        return len(getattr(retries, "history", None) or ())
+
+    def search(self, query: str, sort: str = "rating_desc", filter: str | None = None) -> list[dict]:
+        """Textsuche; liefert die Trefferliste (ggf. leer)."""
+        params = {"query": query, "token": self.api_key, "sort": sort}
+        if filter:
+            params["filter"] = filter
+        with self._span("search") as span:
+            resp = self._get(f"{self.base_url}/search/text/", params=params)
+            span.update(bytes=len(resp.content), retries=self._retry_count(resp))
+            resp.raise_for_status()
+            return resp.json().get("results", [])
+
+    def sound(self, track_id) -> dict:
+        """Details eines Sounds, bedingt angefragt, wenn eine lokale Kopie existiert."""
+        key = make_key("freesound-sound", track_id)
+        cached = None
+        if self._details is not None:
+            raw = self._details.get(key)
+            cached = json.loads(raw) if raw else None
+
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        with self._span("sound") as span:
+            resp = self._get(f"{self.base_url}/sounds/{track_id}/", params={"token": self.api_key}, headers=headers)
+            span.update(bytes=len(resp.content), retries=self._retry_count(resp), status=resp.status_code)
+        if resp.status_code == 304 and cached:
+            return cached["body"]
+        resp.raise_for_status()
+        body = resp.json()
+        if self._details is not None and (resp.headers.get("ETag") or resp.headers.get("Last-Modified")):
+            entry = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified"), "body": body}
+            self._details.set(key, json.dumps(entry).encode("utf-8"))
+        return body
+
+    def download(self, url: str, path: str, chunk_size: int = DOWNLOAD_CHUNK_BYTES) -> int:
+        """Streamt ``url`` blockweise nach ``path`` (atomar) und liefert die Anzahl Bytes."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        written = 0
+        try:
+            with self._span("download") as span, self._get(url, stream=True) as resp:
+                resp.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        written += len(chunk)
+                span.update(bytes=written, retries=self._retry_count(resp))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return written
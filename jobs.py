@@ -0,0 +1,148 @@
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+
+# Ablauf eines Auftrags: queued -> running -> ok | error
+STATUSES = ("queued", "running", "ok", "error")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    resume INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT,
+    report TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    topic: str
+    resume: bool
+    status: str
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    report: dict | None = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"], topic=row["topic"], resume=bool(row["resume"]), status=row["status"],
+            created_at=row["created_at"], started_at=row["started_at"], finished_at=row["finished_at"],
+            error=row["error"], report=json.loads(row["report"]) if row["report"] else None,
+        )
+
+
+class JobQueue:
+    """Episoden-Aufträge in einer SQLite-Datei, geteilt zwischen Daemon und CLI-Aufrufen.
+
+    Jeder Aufruf öffnet eine eigene Verbindung (thread- und prozesssicher); ``claim``
+    vergibt Aufträge atomar in Eingangsreihenfolge und überspringt Themen, die gerade
+    laufen, da sie sich den Episodenordner teilen würden.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Autocommit; Schreibtransaktionen werden explizit mit BEGIN IMMEDIATE geöffnet
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._ready = True
+        return conn
+
+    def _run(self, fn):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        finally:
+            conn.close()
+
+    def submit(self, topic: str, resume: bool = False) -> int:
+        """Reiht ein Thema ein und liefert die Auftragsnummer."""
+        return self._run(lambda conn: conn.execute(
+            "INSERT INTO jobs (topic, resume, created_at) VALUES (?, ?, ?)", (topic, int(resume), time.time())
+        ).lastrowid)
+
+    def claim(self) -> Job | None:
+        """Nimmt den ältesten wartenden Auftrag an (Status ``running``) oder liefert None."""
+        def take(conn):
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' "
+                "AND topic NOT IN (SELECT topic FROM jobs WHERE status = 'running') ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (now, row["id"]))
+            job = Job.from_row(row)
+            job.status, job.started_at = "running", now
+            return job
+        return self._run(take)
+
+    def finish(self, job_id: int, report: dict) -> None:
+        """Schließt einen Auftrag mit dem Bericht aus ``run_episode`` ab (Status ok/error)."""
+        status = "ok" if report.get("status") == "ok" else "error"
+        self._run(lambda conn: conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ?, report = ? WHERE id = ?",
+            (status, time.time(), report.get("error"), json.dumps(report, ensure_ascii=False), job_id),
+        ))
+
+    def requeue_running(self) -> int:
+        """Setzt Aufträge eines abgebrochenen Daemons zurück in die Warteschlange."""
+        return self._run(lambda conn: conn.execute(
+            "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+        ).rowcount)
+
+    def get(self, job_id: int) -> Job | None:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return Job.from_row(row) if row else None
+
+    def jobs(self, status: str | None = None, limit: int = 50) -> list[Job]:
+        """Die neuesten Aufträge, optional nur mit einem Status."""
+        query, params = "SELECT * FROM jobs", ()
+        if status:
+            query, params = query + " WHERE status = ?", (status,)
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"{query} ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+        finally:
+            conn.close()
+        return [Job.from_row(row) for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        return {status: 0 for status in STATUSES} | {row[0]: row[1] for row in rows}
@@ -0,0 +1,132 @@
+import os
+import subprocess
+
+import numpy as np
+
+from cache import make_key
+
+MP3_BITRATE = "192k"
+AAC_BITRATE = "192k"
+# Schnellmodus für Standbild-Videos: 1 Bild/s, Keyframe alle 5 Minuten
+FAST_VIDEO_FPS = 1
+FAST_VIDEO_GOP = 300
+
+
+def find_cover(assets_dir: str) -> str | None:
+    """Sucht das Cover-Bild (cover.png vor cover.jpg) im Assets-Ordner."""
+    for name in ("cover.png", "cover.jpg"):
+        path = os.path.join(assets_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def prepare_cover(cover_image: str, cache_dir: str, width: int = 1280) -> str:
+    """Skaliert das Cover einmalig auf ``width`` (gerade Maße für yuv420p) und cached das Ergebnis.
+
+    Kleinere Cover werden nicht hochskaliert. Bei FFmpeg-Fehlern wird das Original genutzt.
+    """
+    st = os.stat(cover_image)
+    key = make_key(os.path.abspath(cover_image), st.st_mtime_ns, st.st_size, width)
+    os.makedirs(cache_dir, exist_ok=True)
+    scaled = os.path.join(cache_dir, f"cover_{key[:16]}.png")
+    if os.path.exists(scaled):
+        return scaled
+    cmd = [
+        "ffmpeg", "-y", "-i", cover_image,
+        "-vf", f"scale=trunc(min({width}\\,iw)/2)*2:-2",
+        "-frames:v", "1", scaled,
+    ]
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return cover_image
+    return scaled
+
+
+def _video_input_args(cover_image: str, fast: bool = False) -> list[str]:
+    rate = ["-framerate", str(FAST_VIDEO_FPS)] if fast else []
+    return ["-loop", "1", *rate, "-i", cover_image]
+
+
+def _video_args(fast: bool = False) -> list[str]:
+    args = ["-c:v", "libx264", "-tune", "stillimage", "-pix_fmt", "yuv420p"]
+    if fast:
+        # Identische Bilder: minimale Bildrate, lange GOPs und schnellstes Preset
+        args += ["-preset", "ultrafast", "-g", str(FAST_VIDEO_GOP)]
+    return args
+
+
+def build_pcm_encode_cmd(sample_rate: int, channels: int, mp3_path: str, aac_path: str | None = None,
+                         video_path: str | None = None, cover_image: str | None = None,
+                         fast_video: bool = False) -> list[str]:
+    """FFmpeg-Aufruf, der rohes s16le-PCM von stdin einmal dekodiert und alle Ziele parallel kodiert.
+
+    Ausgaben: immer MP3, optional eine AAC-Spur (``.m4a``) zur späteren Wiederverwendung
+    und optional direkt das Standbild-MP4 (benötigt ``cover_image``).
+    """
+    cmd = [
+        "ffmpeg", "-y",
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+    ]
+    if video_path and cover_image:
+        cmd += _video_input_args(cover_image, fast_video)
+    cmd += ["-map", "0:a", "-c:a", "libmp3lame", "-b:a", MP3_BITRATE, mp3_path]
+    if aac_path:
+        cmd += ["-map", "0:a", "-c:a", "aac", "-b:a", AAC_BITRATE, aac_path]
+    if video_path and cover_image:
+        cmd += ["-map", "1:v", "-map", "0:a", *_video_args(fast_video), "-c:a", "aac", "-b:a", AAC_BITRATE,
+                "-shortest", video_path]
+    return cmd
+
+
+def build_video_cmd(cover_image: str, audio_path: str, video_path: str, copy_audio: bool = False,
+                    fast: bool = False) -> list[str]:
+    """FFmpeg-Aufruf für das Standbild-Video; ``copy_audio`` übernimmt eine fertige AAC-Spur 1:1."""
+    audio_args = ["-c:a", "copy"] if copy_audio else ["-c:a", "aac", "-b:a", AAC_BITRATE]
+    return [
+        "ffmpeg", "-y",
+        *_video_input_args(cover_image, fast),
+        "-i", audio_path,
+        "-map", "0:v", "-map", "1:a",
+        *_video_args(fast),
+        *audio_args,
+        "-shortest",
+        video_path,
+    ]
+
+
+def decode_audio(path: str, sample_rate: int = 44100, channels: int = 2):
+    """Dekodiert eine Audiodatei per FFmpeg direkt zu int16-PCM (Frames x Kanäle).
+
+    Zielrate und Kanalzahl werden fest vorgegeben, daher ist kein ffprobe nötig.
+    """
+    cmd = [
+        "ffmpeg", "-v", "error", "-i", path,
+        "-f", "s16le", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-ac", str(channels), "pipe:1",
+    ]
+    raw = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+    return np.frombuffer(raw, dtype="<i2").reshape(-1, channels)
+
+
+def encode_pcm(blocks, cmd: list[str]) -> int:
+    """Schreibt int16-PCM-Blöcke in den stdin eines FFmpeg-Prozesses; liefert die Anzahl PCM-Bytes."""
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    written = 0
+    try:
+        for block in blocks:
+            data = block.astype("<i2", copy=False).tobytes()
+            proc.stdin.write(data)
+            written += len(data)
+    except BrokenPipeError:
+        # FFmpeg ist vorzeitig ausgestiegen; der Returncode unten liefert den Fehler
+        pass
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+    return written
@@ -0,0 +1,92 @@
+import json
+import re
+
+from utils import _SENTENCE_SPLIT
+
+TITLE_MAX_CHARS = 200
+DESCRIPTION_MAX_CHARS = 4000
+# Gekürztes Transkript je Episode im Sammel-Prompt
+CONDENSED_MAX_CHARS = 1200
+
+_JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+_QUOTES = "\"'„“”«»"
+
+
+def condense_transcript(text: str, max_chars: int = CONDENSED_MAX_CHARS) -> str:
+    """Erster Satz jedes Absatzes, bis ``max_chars`` erreicht sind (Intro, Fakten, Outro in Kurzform)."""
+    firsts = []
+    size = 0
+    for para in text.split("\n\n"):
+        para = para.strip()
+        if not para:
+            continue
+        sentence = _SENTENCE_SPLIT.split(para, maxsplit=1)[0]
+        if size + len(sentence) > max_chars:
+            room = max_chars - size
+            if room > 40:
+                firsts.append(sentence[:room].rsplit(" ", 1)[0] + " …")
+            break
+        firsts.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(firsts)
+
+
+def build_batch_prompt(podcast: str, slogan: str, episodes: list[tuple[int, str, str]]) -> str:
+    """Sammel-Prompt für (Nummer, Thema, gekürztes Transkript) mehrerer Episoden."""
+    parts = [
+        "Du erstellst Veröffentlichungs-Texte für creators.spotify.com. "
+        f"Podcast: {podcast}; Slogan: {slogan}. "
+        "Erstelle für jede der folgenden Episoden einen Titel und eine Beschreibung. "
+        f"Constraints: title <= {TITLE_MAX_CHARS} Zeichen, deutsch, ohne Anführungszeichen, kein Hashtag. "
+        f"Description <= {DESCRIPTION_MAX_CHARS} Zeichen, deutsch, 2-4 Sätze Zusammenfassung + Call-to-Action "
+        "zum Folgen/Bewerten; keine Listen, keine Quotes. "
+        "Antworte mit einem JSON-Array, genau ein Objekt je Episode: "
+        "{\"id\": <Episoden-Nummer>, \"title\": \"...\", \"description\": \"...\"}."
+    ]
+    for number, topic, transcript in episodes:
+        parts.append(f"Episode {number}: {topic}\nTranskript (gekürzt): {transcript}")
+    return "\n\n".join(parts)
+
+
+def validate_metadata(item) -> tuple[str, str] | None:
+    """Prüft ein Objekt aus der Antwort; liefert (Titel, Beschreibung) oder None, wenn es neu angefragt werden muss."""
+    if not isinstance(item, dict):
+        return None
+    title, desc = item.get("title"), item.get("description")
+    if not (isinstance(title, str) and isinstance(desc, str)):
+        return None
+    title = title.strip().strip(_QUOTES).strip()
+    desc = desc.strip()
+    if not title or not desc or "#" in title:
+        return None
+    return title[:TITLE_MAX_CHARS], desc[:DESCRIPTION_MAX_CHARS]
+
+
+def parse_batch_response(raw: str, ids) -> tuple[dict[int, tuple[str, str]], list[int]]:
+    """Ordnet die Antwort den Episoden-Nummern zu; liefert gültige Einträge und die fehlgeschlagenen Nummern."""
+    data = None
+    match = _JSON_ARRAY.search(raw or "")
+    for candidate in (raw, match.group(0) if match else None):
+        if not candidate:
+            continue
+        try:
+            data = json.loads(candidate)
+            break
+        except ValueError:
+            continue
+    if isinstance(data, dict):
+        # Manche Antworten verpacken das Array in ein Objekt
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+
+    wanted = set(ids)
+    valid: dict[int, tuple[str, str]] = {}
+    for item in data if isinstance(data, list) else []:
+        try:
+            number = int(item.get("id"))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if number in wanted and number not in valid:
+            checked = validate_metadata(item)
+            if checked:
+                valid[number] = checked
+    return valid, [i for i in ids if i not in valid]
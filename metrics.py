@@ -0,0 +1,227 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+try:
+    import resource
+except ImportError:  # Windows: kein getrusage
+    resource = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: Rotation nur innerhalb des Prozesses geschützt
+    fcntl = None
+
+
+def peak_rss_bytes() -> int:
+    """Höchster Speicherverbrauch (RSS) dieses Prozesses bzw. seiner Kindprozesse (z.B. FFmpeg)."""
+    if resource is None:
+        return 0
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux liefert KiB, macOS Bytes
+    scale = 1 if os.uname().sysname == "Darwin" else 1024
+    return max(own, children) * scale
+
+
+# Obergrenzen der Latenz-Buckets in Sekunden (Prometheus-Histogramm; der letzte Bucket ist +Inf)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0, 128.0)
+
+
+@dataclass
+class MetricTotals:
+    count: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes: int = 0
+    retries: int = 0
+    # Anzahl Aufrufe je Latenz-Bucket (nicht kumulativ), Grenzen siehe LATENCY_BUCKETS
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def add(self, event: dict) -> None:
+        self.count += 1
+        self.errors += int(not event["ok"])
+        self.seconds += event["seconds"]
+        self.max_seconds = max(self.max_seconds, event["seconds"])
+        self.bytes += event.get("bytes", 0)
+        self.retries += event.get("retries", 0)
+        self.buckets[bisect_left(LATENCY_BUCKETS, event["seconds"])] += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Schätzt das ``q``-Quantil der Dauer aus dem Histogramm (linear im Bucket), None ohne Daten."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = min(LATENCY_BUCKETS[i], self.max_seconds) if i < len(LATENCY_BUCKETS) else self.max_seconds
+                return lower + (max(upper, lower) - lower) * (rank - seen) / n
+            seen += n
+        return self.max_seconds
+
+
+class Metrics:
+    """Misst Stufen und externe Aufrufe (Dauer, Bytes, Wiederholungen, Spitzen-RSS).
+
+    Jedes Ereignis wird als JSON-Zeile an ``path`` angehängt (falls gesetzt) und
+    in Summen je (Art, Name) aufaddiert; im Speicher bleiben nur die Summen.
+    Überschreitet die Datei ``max_bytes``, wird sie nach ``<path>.1`` rotiert
+    (eine Generation), sodass höchstens etwa das Doppelte auf der Platte liegt.
+    """
+
+    def __init__(self, path: str | None = None, clock=time.perf_counter, max_bytes: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._totals: dict[tuple[str, str], MetricTotals] = {}
+        self._dir_ready = False
+
+    def record(self, kind: str, name: str, seconds: float, ok: bool = True, bytes: int = 0, retries: int = 0,
+               **labels) -> dict:
+        event = {
+            "ts": round(time.time(), 3),
+            "pid": os.getpid(),
+            "kind": kind,
+            "name": name,
+            "seconds": round(seconds, 4),
+            "ok": ok,
+            "bytes": int(bytes),
+            "retries": int(retries),
+            "peak_rss_bytes": peak_rss_bytes(),
+            **labels,
+        }
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._totals.setdefault((kind, name), MetricTotals()).add(event)
+            if self.path:
+                if not self._dir_ready:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    self._dir_ready = True
+                # Eine write()-Operation pro Zeile im Append-Modus: parallele Batch-Prozesse mischen keine Zeilen
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+                    size = f.tell()
+                if self.max_bytes and size > self.max_bytes:
+                    self._rotate()
+        return event
+
+    def _rotate(self) -> None:
+        """Benennt die Datei nach ``<path>.1`` um; andere Prozesse hängen danach an eine neue an.
+
+        Unter Dateisperre und mit erneuter Größenprüfung: haben zwei Batch-Worker die Grenze
+        zugleich überschritten, rotiert nur der erste, statt ``.1`` mit der frischen Datei zu überschreiben.
+        """
+        with open(f"{self.path}.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, f"{self.path}.1")
+            except OSError:
+                pass
+
+    @contextmanager
+    def span(self, kind: str, name: str, **labels):
+        """Misst den Block; über das gelieferte Dict lassen sich ``bytes``/``retries`` nachtragen."""
+        info = {"bytes": 0, "retries": 0}
+        start = self._clock()
+        ok = False
+        try:
+            yield info
+            ok = True
+        finally:
+            extra = {k: v for k, v in info.items() if k not in ("bytes", "retries")}
+            self.record(kind, name, self._clock() - start, ok, info["bytes"], info["retries"], **labels, **extra)
+
+    def timed(self, kind: str, name: str, fn, **labels):
+        """Umhüllt ``fn`` so, dass jeder Aufruf als Span erfasst wird."""
+        def run(*args, **kwargs):
+            with self.span(kind, name, **labels):
+                return fn(*args, **kwargs)
+        return run
+
+    def totals(self) -> dict[tuple[str, str], MetricTotals]:
+        with self._lock:
+            return {key: MetricTotals(**asdict(t)) for key, t in self._totals.items()}
+
+    def quantile(self, kind: str, name: str, q: float) -> tuple[float | None, int]:
+        """``q``-Quantil der Dauer von (Art, Name) und die Anzahl Messungen dahinter."""
+        with self._lock:
+            t = self._totals.get((kind, name))
+            return (t.quantile(q), t.count) if t else (None, 0)
+
+
+def read_events(path: str, since: float | None = None) -> list[dict]:
+    """Liest Ereignisse aus einer JSON-Lines-Datei (optional nur ab Zeitstempel ``since``).
+
+    Eine rotierte Vorgängerdatei ``<path>.1`` wird mitgelesen.
+    """
+    events = []
+    for current in (f"{path}.1", path):
+        try:
+            with open(current, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since is None or event.get("ts", 0) >= since:
+                        events.append(event)
+        except OSError:
+            continue
+    return events
+
+
+def summarize(events) -> dict[tuple[str, str], MetricTotals]:
+    totals: dict[tuple[str, str], MetricTotals] = {}
+    for event in events:
+        totals.setdefault((event["kind"], event["name"]), MetricTotals()).add(event)
+    return totals
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus(totals: dict[tuple[str, str], MetricTotals], path: str, peak_rss: int | None = None) -> str:
+    """Schreibt die Summen im Prometheus-Textformat (z.B. für den node_exporter-Textfile-Collector)."""
+    series = [
+        ("podcast_calls_total", "counter", "Anzahl Aufrufe", lambda t: t.count),
+        ("podcast_call_errors_total", "counter", "Fehlgeschlagene Aufrufe", lambda t: t.errors),
+        ("podcast_call_seconds_total", "counter", "Summierte Dauer in Sekunden", lambda t: round(t.seconds, 4)),
+        ("podcast_call_seconds_max", "gauge", "Längster Einzelaufruf in Sekunden", lambda t: round(t.max_seconds, 4)),
+        ("podcast_call_bytes_total", "counter", "Übertragene bzw. erzeugte Bytes", lambda t: t.bytes),
+        ("podcast_call_retries_total", "counter", "Wiederholungen", lambda t: t.retries),
+    ]
+    lines = []
+    for metric, metric_type, help_text, value in series:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for (kind, name), t in sorted(totals.items()):
+            lines.append(f'{metric}{{kind="{_escape(kind)}",name="{_escape(name)}"}} {value(t)}')
+    metric = "podcast_call_latency_seconds"
+    lines += [f"# HELP {metric} Verteilung der Aufrufdauer", f"# TYPE {metric} histogram"]
+    for (kind, name), t in sorted(totals.items()):
+        labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+        cumulative = 0
+        for bound, n in zip((*LATENCY_BUCKETS, "+Inf"), t.buckets):
+            cumulative += n
+            lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{metric}_sum{{{labels}}} {round(t.seconds, 4)}")
+        lines.append(f"{metric}_count{{{labels}}} {t.count}")
+    rss = peak_rss_bytes() if peak_rss is None else peak_rss
+    lines += ["# HELP podcast_peak_rss_bytes Höchster RSS", "# TYPE podcast_peak_rss_bytes gauge",
+              f"podcast_peak_rss_bytes {rss}"]
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,156 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import wave
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: Sperre nur innerhalb des Prozesses
+    fcntl = None
+
+# Wörter, die in fast jeder Suchanfrage stecken und nichts über die Stimmung aussagen
+_GENERIC_TOKENS = {
+    "background", "music", "loop", "loops", "track", "sound", "sounds", "audio",
+    "the", "and", "for", "with", "der", "die", "das", "und",
+}
+
+
+# Prozessweit: im Daemon hat jede Episode (Thread) ihre eigene MusicLibrary auf denselben Ordner
+_INDEX_LOCK = threading.Lock()
+
+
+def _tmp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _tokens(text: str) -> set[str]:
+    return {t for t in re.findall(r"\w+", text.lower()) if len(t) > 2 and t not in _GENERIC_TOKENS}
+
+
+class MusicLibrary:
+    """Lokaler Index heruntergeladener Freesound-Tracks.
+
+    Jeder Track liegt einmalig als ``<id>.mp3`` im Bibliotheksordner; ``index.json``
+    speichert Name, Tags, Dauer und die Suchanfragen, die ihn gefunden haben.
+    Neue Anfragen werden per Schlagwort-Abgleich gegen den Index aufgelöst,
+    bevor die Freesound-API bemüht wird. Zusätzlich kann je Track eine
+    lautheitsnormalisierte PCM-WAV abgelegt werden, die das Mixing direkt nutzt.
+    Änderungen am Index laufen unter einer Sperre, die Threads und (per ``flock``)
+    parallele Batch-Prozesse einschließt; Dateien werden atomar ersetzt.
+    """
+
+    def __init__(self, directory: str, min_score: float = 0.5):
+        self.directory = directory
+        self.min_score = min_score
+        self.index_path = os.path.join(directory, "index.json")
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _index_lock(self):
+        with _INDEX_LOCK:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.index_path}.lock", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, index: dict) -> None:
+        tmp_path = _tmp_path(self.index_path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def track_path(self, track_id) -> str:
+        return os.path.join(self.directory, f"{track_id}.mp3")
+
+    def pcm_path(self, track_id) -> str:
+        return os.path.join(self.directory, f"{track_id}.norm.wav")
+
+    def entries(self) -> list[dict]:
+        return [e for e in self._load().values() if os.path.exists(self.track_path(e["id"]))]
+
+    def find(self, query: str) -> dict | None:
+        """Bester Index-Treffer für die Anfrage oder None, wenn nichts ausreichend passt."""
+        wanted = _tokens(query)
+        best, best_score = None, 0.0
+        for entry in self.entries():
+            if query in entry.get("queries", []):
+                return entry
+            if not wanted:
+                continue
+            known = _tokens(" ".join([entry.get("name", ""), *entry.get("tags", []), *entry.get("queries", [])]))
+            score = len(wanted & known) / len(wanted)
+            if score > best_score:
+                best, best_score = entry, score
+        if best is not None and best_score >= self.min_score:
+            return best
+        return None
+
+    def add(self, track_id, source_path: str, name: str = "", tags: list[str] | None = None,
+            duration: float | None = None, query: str = "") -> dict:
+        """Übernimmt eine heruntergeladene Datei in die Bibliothek und indexiert sie."""
+        target = self.track_path(track_id)
+        if os.path.abspath(source_path) != os.path.abspath(target):
+            # Erst kopieren, dann umbenennen: Leser sehen nie eine halbe MP3
+            tmp_path = _tmp_path(target)
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, target)
+        with self._index_lock():
+            index = self._load()
+            entry = index.get(str(track_id)) or {
+                "id": track_id,
+                "name": name,
+                "tags": list(tags or []),
+                "duration": duration,
+                "queries": [],
+                "added_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            if query and query not in entry["queries"]:
+                entry["queries"].append(query)
+            index[str(track_id)] = entry
+            self._save(index)
+        return entry
+
+    def record_query(self, track_id, query: str) -> None:
+        """Merkt sich eine weitere Anfrage, die zu diesem Track geführt hat."""
+        with self._index_lock():
+            index = self._load()
+            entry = index.get(str(track_id))
+            if entry is not None and query not in entry["queries"]:
+                entry["queries"].append(query)
+                self._save(index)
+
+    def ensure_pcm(self, entry: dict, decode, normalize) -> str:
+        """Legt die normalisierte PCM-WAV eines Tracks an (einmalig) und liefert ihren Pfad.
+
+        ``decode(path) -> (pcm, sample_rate)`` dekodiert die MP3,
+        ``normalize(pcm) -> pcm`` gleicht die Lautheit an.
+        """
+        path = self.pcm_path(entry["id"])
+        if os.path.exists(path):
+            return path
+        pcm, sample_rate = decode(self.track_path(entry["id"]))
+        pcm = normalize(pcm)
+        tmp_path = _tmp_path(path)
+        with wave.open(tmp_path, "wb") as w:
+            w.setnchannels(pcm.shape[1])
+            w.setsampwidth(2)
+            w.setframerate(sample_rate)
+            w.writeframes(pcm.astype("<i2").tobytes())
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,130 @@
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+_END = object()
+
+
+class Feed:
+    """Reicht Teilergebnisse von einer laufenden Stufe an eine andere weiter (Produzent -> Konsument).
+
+    Der Produzent ruft ``put`` und zum Schluss ``close`` (bei Fehlern ``close(error)``);
+    der Konsument iteriert und blockiert, bis neue Elemente oder das Ende ankommen.
+    Ein über ``close`` gemeldeter Fehler wird beim Konsumenten erneut ausgelöst.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._error: BaseException | None = None
+        self.closed = False
+
+    def put(self, item) -> None:
+        if self.closed:
+            raise RuntimeError("Feed ist bereits geschlossen")
+        self._queue.put(item)
+
+    def close(self, error: BaseException | None = None) -> None:
+        if self.closed:
+            return
+        self._error = error
+        self.closed = True
+        self._queue.put(_END)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                # Weitere Iterationen enden sofort statt zu blockieren
+                self._queue.put(_END)
+                if self._error is not None:
+                    raise RuntimeError("Vorgelagerte Stufe fehlgeschlagen") from self._error
+                return
+            yield item
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[], object]
+    deps: tuple[str, ...] = ()
+    slot: str | None = None  # z.B. "llm"/"tts"/"ffmpeg" für Limits im Batch
+
+
+@dataclass
+class Pipeline:
+    """Führt Stufen als DAG aus: jede Stufe startet, sobald ihre Abhängigkeiten fertig sind.
+
+    Unabhängige Stufen laufen parallel in Threads. Schlägt eine Stufe fehl, werden
+    keine neuen Stufen mehr gestartet; laufende dürfen enden, danach wird der
+    erste Fehler weitergereicht. ``timings`` enthält die Dauer jeder beendeten Stufe.
+    """
+
+    stages: list[Stage]
+    max_workers: int = 4
+    slot_guard: Callable[[str], object] | None = None
+    log: Callable[[str], None] = print
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        names = [stage.name for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Stufennamen müssen eindeutig sein")
+        for stage in self.stages:
+            missing = [dep for dep in stage.deps if dep not in names]
+            if missing:
+                raise ValueError(f"Stufe {stage.name}: unbekannte Abhängigkeit(en) {missing}")
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        deps = {stage.name: set(stage.deps) for stage in self.stages}
+        done: set[str] = set()
+        while len(done) < len(deps):
+            ready = [name for name, d in deps.items() if name not in done and d <= done]
+            if not ready:
+                raise ValueError(f"Zyklische Abhängigkeit zwischen {sorted(set(deps) - done)}")
+            done.update(ready)
+
+    def _run_stage(self, stage: Stage) -> float:
+        guard = self.slot_guard(stage.slot) if (stage.slot and self.slot_guard) else nullcontext()
+        with guard:
+            start = time.perf_counter()
+            stage.fn()
+            return time.perf_counter() - start
+
+    def run(self) -> dict[str, float]:
+        pending = {stage.name: stage for stage in self.stages}
+        done: set[str] = set()
+        running = {}
+        error: BaseException | None = None
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                if error is None:
+                    for name, stage in list(pending.items()):
+                        if set(stage.deps) <= done:
+                            running[pool.submit(self._run_stage, stage)] = name
+                            del pending[name]
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        self.timings[name] = round(future.result(), 2)
+                        done.add(name)
+                        self.log(f"   ⏱️  {name}: {self.timings[name]:.1f}s")
+                    except BaseException as e:
+                        if error is None:
+                            error = e
+                            self.log(f"   ❌ Stufe {name} fehlgeschlagen, starte keine weiteren Stufen.")
+
+        total = time.perf_counter() - started
+        self.log(f"   ⏱️  Gesamt: {total:.1f}s (Summe der Stufen: {sum(self.timings.values()):.1f}s)")
+        if error is not None:
+            raise error
+        return self.timings
@@ -1,16 +1,18 @@
 import os
-import requests
+import sys
+import argparse
+import multiprocessing
 import json
 import subprocess
 import re
 import io
-import math
+import signal
 import mimetypes
+import threading
 import time
-from pytrends.request import TrendReq
-from google import genai
-from google.genai import types
-from google.cloud import texttospeech
+from collections import deque
+from dataclasses import asdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from pydub import AudioSegment
 from dotenv import load_dotenv
 from typing import List
@@ -18,7 +20,29 @@ from typing import List
 # ==============================================================================
 # KONFIGURATION & API KEYS aus .env auslesen
 # ==============================================================================
-from utils import _chunk_text, _spell_out_abbreviations, _strip_formatting
+from audio_engine import (
+    PcmAssembler, VoiceMusicMixer, mix_with_pydub, normalize_loudness, read_wav_pcm,
+)
+from cache import DiskCache, ResponseCache, make_key
+from checkpoint import Checkpoint, StageState
+from freesound import FreesoundClient
+from jobs import JobQueue
+from media import build_pcm_encode_cmd, build_video_cmd, decode_audio, encode_pcm, find_cover, prepare_cover
+from metadata import build_batch_prompt, condense_transcript, parse_batch_response
+from metrics import Metrics, peak_rss_bytes, read_events, summarize, write_prometheus
+from music_library import MusicLibrary
+from pipeline import Feed, Pipeline, Stage
+from rate_limit import Cooldown, RateLimitedClient, is_quota_exhausted, is_rate_limit_error
+from trends import TrendsService
+from utils import (
+    CLOUD_TTS_MAX_SSML_BYTES,
+    GEMINI_TTS_MAX_CHARS,
+    TextNormalizer,
+    _chunk_text,
+    _iter_paragraphs,
+    _to_ssml,
+    load_lexicon,
+)
 load_dotenv()
 
 def _require_env(var_name):
@@ -28,65 +52,255 @@ def _require_env(var_name):
         raise RuntimeError(f"Environment variable {var_name} is required but not set.")
     return value
 
+def _bool_env(var_name: str, default: bool) -> bool:
+    """Liest einen optionalen Schalter (1/true/yes/on)."""
+    raw = os.getenv(var_name)
+    if not raw:
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+def _int_env(var_name: str, default: int) -> int:
+    """Liest eine optionale Ganzzahl-Einstellung; ungültige Werte fallen auf den Default zurück."""
+    raw = os.getenv(var_name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        print(f"   ⚠️ {var_name}={raw!r} ist keine Zahl, nutze {default}.")
+        return default
+
+# Pflicht-Einstellungen: beim Import nur gelesen, geprüft erst in require_config(),
+# damit Tests, Benchmarks und Hilfsaufrufe ohne Credentials importieren können
+_REQUIRED_ENV = (
+    "GEMINI_API_KEY", "GOOGLE_APPLICATION_CREDENTIALS", "FREESOUND_API_KEY",
+    "PODCAST_NAME", "PODCAST_SLOGAN", "PODCAST_TEMP_DIR", "PODCAST_OUTPUT_DIR", "PODCAST_ASSETS_DIR",
+)
+
 # Secrets aus der .env Datei
-GEMINI_API_KEY = _require_env("GEMINI_API_KEY")
-GOOGLE_APPLICATION_CREDENTIALS = _require_env("GOOGLE_APPLICATION_CREDENTIALS")
-FREESOUND_API_KEY = _require_env("FREESOUND_API_KEY")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+FREESOUND_API_KEY = os.getenv("FREESOUND_API_KEY", "")
 
 # Podcast Einstellungen aus .env
-PODCAST_NAME = _require_env("PODCAST_NAME")
-SLOGAN = _require_env("PODCAST_SLOGAN")
-TEMP_DIR = _require_env("PODCAST_TEMP_DIR")
-OUTPUT_DIR = _require_env("PODCAST_OUTPUT_DIR")
-ASSETS_DIR = _require_env("PODCAST_ASSETS_DIR")
-
-# Ordner erstellen
-os.makedirs(TEMP_DIR, exist_ok=True)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-os.makedirs(ASSETS_DIR, exist_ok=True)
-
-# Client-Setup
-client = genai.Client(api_key=GEMINI_API_KEY)
-
-
-def _to_ssml(text: str) -> str:
-    """Baut SSML aus Klarschrift und wandelt *Wort* in <emphasis> um."""
-    def _escape_ssml(value: str) -> str:
-        return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-
-    # 1. Escaping (wichtig, damit & oder < den XML Parser nicht brechen)
-    safe_text = _escape_ssml(text)
-
-    # 2. Markdown-Bold/Italic (*Wort*) in SSML Emphasis umwandeln
-    # Regex sucht nach Sternchen-Paaren und ersetzt sie durch emphasis Tags
-    # Das macht die Google Cloud Stimme deutlich lebendiger.
-    safe_text = re.sub(r'\*([^\*]+)\*', r'<emphasis level="moderate">\1</emphasis>', safe_text)
-
-    paragraphs = [p.strip() for p in safe_text.split("\n\n") if p.strip()]
-
-    ssml_parts = ["<speak>"]
-    for para in paragraphs:
-        # Wir verpacken Paragraphen in <p>, das erzeugt natürliche Pausen
-        ssml_parts.append("<p>")
-        sentences = re.split(r"(?<=[\.\?!])\s+", para)
-        for sent in sentences:
-            if not sent.strip():
-                continue
-            # Sätze in <s> Tags helfen der Intonation
-            ssml_parts.append(f"<s>{sent.strip()}</s>")
-        ssml_parts.append("</p>")
-    ssml_parts.append("</speak>")
-    return "".join(ssml_parts)
+PODCAST_NAME = os.getenv("PODCAST_NAME", "")
+SLOGAN = os.getenv("PODCAST_SLOGAN", "")
+TEMP_DIR = os.getenv("PODCAST_TEMP_DIR", "")
+OUTPUT_DIR = os.getenv("PODCAST_OUTPUT_DIR", "")
+ASSETS_DIR = os.getenv("PODCAST_ASSETS_DIR", "")
+
+# Optionale Performance-Einstellungen
+# Anzahl paralleler TTS-Anfragen pro Episode (1 = streng sequentiell)
+TTS_WORKERS = max(1, _int_env("PODCAST_TTS_WORKERS", 3))
+# Persistente Caches (TTS-Segmente etc.); run.sh lässt den Unterordner "cache" stehen
+CACHE_DIR = os.getenv("PODCAST_CACHE_DIR") or os.path.join(TEMP_DIR, "cache")
+# Höchstlänge eines TTS-Abschnitts in Zeichen (Abschnitte werden an Satzgrenzen gleich groß gepackt)
+TTS_CHUNK_CHARS = max(100, _int_env("PODCAST_TTS_CHUNK_CHARS", GEMINI_TTS_MAX_CHARS))
+# Maximale Größe des TTS-Segment-Caches in MB (0 = Cache aus)
+TTS_CACHE_MB = _int_env("PODCAST_TTS_CACHE_MB", 500)
+# Antwort-Cache für Gemini-Textaufrufe (Skript, Metadaten, Übersetzung): Größe in MB (0 = aus) und Gültigkeit
+LLM_CACHE_MB = _int_env("PODCAST_LLM_CACHE_MB", 50)
+LLM_CACHE_TTL = _int_env("PODCAST_LLM_CACHE_TTL", 7 * 24 * 3600)
+# Vorhandene Antworten ignorieren und neu generieren (die frischen Antworten werden gespeichert)
+LLM_CACHE_BYPASS = _bool_env("PODCAST_LLM_CACHE_BYPASS", False)
+# --batch-metadata: Episoden je Sammel-Anfrage und Runden für fehlgeschlagene Einträge
+METADATA_BATCH_SIZE = max(1, _int_env("PODCAST_METADATA_BATCH_SIZE", 8))
+METADATA_BATCH_ATTEMPTS = max(1, _int_env("PODCAST_METADATA_BATCH_ATTEMPTS", 3))
+# Proaktive Drosselung der Gemini-Aufrufe (Anfragen pro Minute und Modell)
+GEMINI_RPM = _int_env("PODCAST_GEMINI_RPM", 30)
+GEMINI_TTS_RPM = _int_env("PODCAST_GEMINI_TTS_RPM", 10)
+GEMINI_MAX_ATTEMPTS = _int_env("PODCAST_GEMINI_MAX_ATTEMPTS", 3)
+# Sofort erlaubte Anfragen je Modell bei vollem Bucket (0 = so viele wie das RPM-Limit)
+GEMINI_BURST = _int_env("PODCAST_GEMINI_BURST", 0)
+# Nach erschöpftem Gemini-TTS-Tageskontingent so lange (Sekunden) direkt Cloud TTS nutzen
+GEMINI_TTS_COOLDOWN = _int_env("PODCAST_GEMINI_TTS_COOLDOWN", 900)
+# Hedging: dauert ein Gemini-Abschnitt länger als dieses Perzentil bisheriger Gemini-TTS-Aufrufe
+# (bzw. PODCAST_TTS_HEDGE_AFTER Sekunden, solange zu wenige Messungen vorliegen), startet parallel Cloud TTS
+TTS_HEDGE = _bool_env("PODCAST_TTS_HEDGE", False)
+TTS_HEDGE_PERCENTILE = min(99, max(50, _int_env("PODCAST_TTS_HEDGE_PERCENTILE", 95)))
+TTS_HEDGE_AFTER = _int_env("PODCAST_TTS_HEDGE_AFTER", 20)
+# "episode": gewinnt Cloud TTS einmal, sprechen alle danach gestarteten Abschnitte mit dieser Stimme;
+# "chunk": jeder Abschnitt nimmt die schnellere Antwort
+TTS_HEDGE_POLICY = os.getenv("PODCAST_TTS_HEDGE_POLICY", "episode").strip().lower()
+_HEDGE_MIN_SAMPLES = 10
+# Gültigkeit der zwischengespeicherten Modell-Liste in Sekunden
+MODEL_CACHE_TTL = _int_env("PODCAST_MODEL_CACHE_TTL", 6 * 3600)
+# Google Trends: Gültigkeit der Trendlisten auf der Platte (0 = aus) und parallele Proben
+TRENDS_CACHE_TTL = _int_env("PODCAST_TRENDS_CACHE_TTL", 3600)
+TRENDS_WORKERS = _int_env("PODCAST_TRENDS_WORKERS", 3)
+# Mixing-Engine: "numpy" (blockweise, vektorisiert) oder "pydub" (bisheriger Weg)
+MIX_ENGINE = os.getenv("PODCAST_MIX_ENGINE", "numpy").strip().lower()
+# Single-Pass: gemischtes PCM geht einmal in FFmpeg und ergibt MP3 und MP4 zugleich
+SINGLE_PASS = _bool_env("PODCAST_SINGLE_PASS", False)
+# Schnelles Standbild-Video: 1 fps, lange GOPs, ultrafast, einmalig vorskaliertes Cover
+FAST_VIDEO = _bool_env("PODCAST_FAST_VIDEO", False)
+VIDEO_WIDTH = _int_env("PODCAST_VIDEO_WIDTH", 1280)
+# Unabhängige Stufen (Musik, Stimme, Metadaten) parallel ausführen
+PARALLEL_STAGES = _bool_env("PODCAST_PARALLEL_STAGES", True)
+# Skript per Streaming abrufen und fertige Absätze sofort an die TTS geben (braucht parallele Stufen)
+STREAM_SCRIPT = _bool_env("PODCAST_STREAM_SCRIPT", False)
+# Musik wird direkt per FFmpeg (ohne ffprobe/pydub) in dieser Rate als Stereo-PCM dekodiert
+MUSIC_SAMPLE_RATE = 44100
+# Lokale Musik-Bibliothek (einmal geladene Freesound-Tracks + normalisierte PCM-Kopien)
+MUSIC_LIBRARY_DIR = os.getenv("PODCAST_MUSIC_LIBRARY_DIR") or os.path.join(ASSETS_DIR, "music_library")
+# Aussprache-Lexikon (JSON {"Wort": "Aussprache"}), wird beim Aufbereiten des Skripts angewandt
+LEXICON_FILE = os.getenv("PODCAST_LEXICON_FILE") or os.path.join(ASSETS_DIR, "lexicon.json")
+# HTTP (Freesound): Connect-/Read-Timeout in Sekunden und Wiederholungen bei 429/5xx
+HTTP_CONNECT_TIMEOUT = _int_env("PODCAST_HTTP_CONNECT_TIMEOUT", 5)
+HTTP_READ_TIMEOUT = _int_env("PODCAST_HTTP_READ_TIMEOUT", 30)
+HTTP_RETRIES = _int_env("PODCAST_HTTP_RETRIES", 3)
+# Messwerte je Stufe/externem Aufruf als JSON Lines ("" schaltet ab), optional im Prometheus-Textformat
+METRICS_FILE = os.getenv("PODCAST_METRICS_FILE", os.path.join(OUTPUT_DIR, "metrics.jsonl"))
+PROMETHEUS_FILE = os.getenv("PODCAST_PROMETHEUS_FILE", "")
+# Ab dieser Größe wird die JSON-Lines-Datei nach <Datei>.1 rotiert (0 = unbegrenzt)
+METRICS_MAX_MB = _int_env("PODCAST_METRICS_MAX_MB", 50)
+# Auftrags-Warteschlange des Daemons (--serve) als SQLite-Datei
+QUEUE_DB = os.getenv("PODCAST_QUEUE_DB") or os.path.join(OUTPUT_DIR, "jobs.sqlite3")
+
+
+
+def require_config() -> None:
+    """Prüft alle Pflicht-Einstellungen und legt die Arbeitsordner an."""
+    for name in _REQUIRED_ENV:
+        _require_env(name)
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+
+
+metrics = Metrics(METRICS_FILE or None, max_bytes=METRICS_MAX_MB * 1024 * 1024)
+
+# Gemeinsame, gepoolte HTTP-Session für alle Freesound-Aufrufe
+freesound = FreesoundClient(
+    FREESOUND_API_KEY,
+    timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+    retries=HTTP_RETRIES,
+    cache_dir=os.path.join(CACHE_DIR, "freesound"),
+    metrics=metrics,
+)
+
+def _make_genai_client():
+    """Baut den genai.Client erst beim ersten Aufruf (das SDK braucht allein ~0,3s zum Import)."""
+    from google import genai
+
+    return genai.Client(api_key=_require_env("GEMINI_API_KEY"))
+
+
+_normalizer: TextNormalizer | None = None
+
+
+def _text_normalizer() -> TextNormalizer:
+    """Kompiliert Muster und Lexikon einmal pro Prozess, erst beim ersten Skript."""
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = TextNormalizer(load_lexicon(LEXICON_FILE))
+    return _normalizer
+
+
+def _trend_client():
+    """pytrends zieht pandas nach und wird deshalb erst bei Bedarf geladen."""
+    from pytrends.request import TrendReq
+
+    return TrendReq(hl='de', tz=120)
+
+
+# Trendlisten und related_queries mit TTL auf der Platte: Episoden eines Batches
+# (auch in parallelen Prozessen) fragen Google Trends pro Stunde nur einmal.
+trends = TrendsService(
+    _trend_client,
+    cache_dir=os.path.join(CACHE_DIR, "trends") if TRENDS_CACHE_TTL > 0 else None,
+    ttl=TRENDS_CACHE_TTL,
+    max_workers=TRENDS_WORKERS,
+    metrics=metrics,
+)
+
+
+_gcloud_tts = None
+_gcloud_tts_lock = threading.Lock()
+
+
+def _gcloud_tts_client():
+    """Ein TextToSpeechClient pro Prozess: gRPC-Kanal und Auth-Handshake nur einmal, thread-sicher nutzbar."""
+    global _gcloud_tts
+    if _gcloud_tts is None:
+        with _gcloud_tts_lock:
+            if _gcloud_tts is None:
+                from google.cloud import texttospeech
+
+                _gcloud_tts = texttospeech.TextToSpeechClient()
+    return _gcloud_tts
+
+
+# Ist das Gemini-TTS-Tageskontingent erschöpft, gehen alle Abschnitte (auch folgender Episoden) direkt an
+# Cloud TTS; ein Minutenlimit betrifft nur den jeweiligen Abschnitt
+gemini_tts_cooldown = Cooldown(GEMINI_TTS_COOLDOWN)
+
+
+# Client-Setup: alle Gemini-Aufrufe laufen über Token-Bucket + Backoff
+client = RateLimitedClient(
+    factory=_make_genai_client,
+    limits={"tts": GEMINI_TTS_RPM},
+    default_rpm=GEMINI_RPM,
+    max_attempts=GEMINI_MAX_ATTEMPTS,
+    metrics=metrics,
+    burst=GEMINI_BURST or None,
+)
 
 
-def pick_available_model(preferences: List[str]) -> str:
-    """Wählt das bestmögliche Modell anhand der Präferenz-Reihenfolge."""
-    try:
-        available = list(client.models.list())
-    except Exception as e:
-        print(f"   ⚠️ Konnte Modelle nicht listen ({e}). Versuche Standard: gemini-2.0-flash")
-        return "gemini-2.0-flash"
+# Gleiches Modell + Prompt + Config liefert die gespeicherte Antwort: wiederholte Themen und
+# Re-Renders kosten für Skript, Metadaten und Übersetzung keinen Gemini-Aufruf.
+llm_cache = ResponseCache(
+    os.path.join(CACHE_DIR, "llm"), max_bytes=LLM_CACHE_MB * 1024 * 1024, ttl=LLM_CACHE_TTL, bypass=LLM_CACHE_BYPASS,
+) if LLM_CACHE_MB > 0 else None
+
+
+def generate_text(model: str, contents, config=None, validate=None) -> str:
+    """Text-Antwort von Gemini (``generate_content``), bei Treffer aus dem Antwort-Cache.
+
+    Mit ``validate(text) -> bool`` werden nur brauchbare Antworten gespeichert; ein
+    unbrauchbarer Cache-Eintrag wird verworfen und neu angefragt.
+    """
+    if llm_cache is not None:
+        cached = llm_cache.get(model, contents, config)
+        if cached is not None:
+            if validate is None or validate(cached):
+                return cached
+            llm_cache.delete(model, contents, config)
+    text = client.models.generate_content(model=model, contents=contents, config=config).text or ""
+    if llm_cache is not None and (validate is None or validate(text)):
+        llm_cache.set(model, contents, config, text)
+    return text
 
+
+def stream_text(model: str, contents, config=None):
+    """Wie ``generate_text``, aber als Folge von Textstücken; gespeichert wird nur eine vollständige Antwort."""
+    if llm_cache is not None:
+        cached = llm_cache.get(model, contents, config)
+        if cached is not None:
+            yield cached
+            return
+    pieces = []
+    for chunk in client.models.generate_content_stream(model=model, contents=contents, config=config):
+        pieces.append(chunk.text or "")
+        yield pieces[-1]
+    if llm_cache is not None:
+        llm_cache.set(model, contents, config, "".join(pieces))
+
+
+# Modell-Liste: einmal pro Prozess im Speicher, zusätzlich mit TTL auf der Platte,
+# damit ein Batch nicht pro Episode und Stufe erneut models.list() aufruft.
+_model_cache = DiskCache(os.path.join(CACHE_DIR, "models"), ttl=MODEL_CACHE_TTL, suffix=".json")
+# Schlüssel hängt am API-Key, da verschiedene Keys verschiedene Modelle sehen können
+_MODEL_CACHE_KEY = make_key("models", GEMINI_API_KEY)
+_model_memo: tuple[float, list[tuple[str, str]]] | None = None
+_model_memo_lock = threading.Lock()
+# Uhr für das Alter der Modell-Liste im Speicher (in Tests austauschbar)
+_model_clock = time.time
+
+
+def _list_candidate_models() -> list[tuple[str, str]]:
+    """Listet Textmodelle als (Kurzname, voller Name) ohne TTS/Embedding/Bild-Modelle."""
+    available = list(client.models.list())
     blocked_tokens = ["embedding", "tts", "image", "imagen", "veo", "computer-use", "robotics", "aqa", "native-audio"]
 
     candidates = []
@@ -95,6 +309,66 @@ def pick_available_model(preferences: List[str]) -> str:
         if any(tok in short for tok in blocked_tokens):
             continue
         candidates.append((short, model.name))
+    return candidates
+
+
+def get_candidate_models(refresh: bool = False) -> list[tuple[str, str]] | None:
+    """Liefert die gefilterte Modell-Liste aus Speicher-/Platten-Cache oder frisch von der API.
+
+    ``refresh=True`` umgeht beide Caches. Bei API-Fehlern kommt None zurück.
+    """
+    global _model_memo
+    with _model_memo_lock:
+        if not refresh:
+            if _model_memo and _model_clock() - _model_memo[0] <= MODEL_CACHE_TTL:
+                return _model_memo[1]
+            cached = _model_cache.get(_MODEL_CACHE_KEY)
+            if cached is not None:
+                try:
+                    candidates = [tuple(item) for item in json.loads(cached)]
+                    fetched_at = _model_clock() - (_model_cache.age(_MODEL_CACHE_KEY) or 0.0)
+                    _model_memo = (fetched_at, candidates)
+                    return candidates
+                except ValueError:
+                    _model_cache.delete(_MODEL_CACHE_KEY)
+
+        try:
+            candidates = _list_candidate_models()
+        except Exception as e:
+            print(f"   ⚠️ Konnte Modelle nicht listen ({e}).")
+            return None
+        _model_memo = (_model_clock(), candidates)
+        _model_cache.set(_MODEL_CACHE_KEY, json.dumps(candidates).encode("utf-8"))
+        return candidates
+
+
+def refresh_model_cache() -> list[tuple[str, str]] | None:
+    """Erzwingt ein neues models.list() und aktualisiert beide Caches."""
+    return get_candidate_models(refresh=True)
+
+
+def model_cache_age() -> float | None:
+    """Alter der zwischengespeicherten Modell-Liste in Sekunden (None = noch nichts geladen)."""
+    if _model_memo is not None:
+        return _model_clock() - _model_memo[0]
+    return _model_cache.age(_MODEL_CACHE_KEY)
+
+
+def warm_model_cache() -> None:
+    """Lädt die Modell-Liste vorab (z.B. beim Start eines Batches) und meldet ihr Alter."""
+    candidates = get_candidate_models()
+    if candidates is None:
+        return
+    age = model_cache_age() or 0.0
+    print(f"   -> Modell-Liste bereit: {len(candidates)} Kandidaten (Alter {age:.0f}s)")
+
+
+def pick_available_model(preferences: List[str]) -> str:
+    """Wählt das bestmögliche Modell anhand der Präferenz-Reihenfolge."""
+    candidates = get_candidate_models()
+    if candidates is None:
+        print("   ⚠️ Keine Modell-Liste verfügbar. Versuche Standard: gemini-2.0-flash")
+        return "gemini-2.0-flash"
 
     for pref in preferences:
         for short, full in candidates:
@@ -107,19 +381,119 @@ def pick_available_model(preferences: List[str]) -> str:
 
     return "gemini-2.0-flash"
 
+def _decode_music(path: str):
+    """Dekodiert eine Musikdatei zu (int16-PCM, Samplerate) für den PCM-Cache der Bibliothek."""
+    return decode_audio(path, MUSIC_SAMPLE_RATE), MUSIC_SAMPLE_RATE
+
+
+METADATA_MODELS = ["gemini-3-pro-preview", "gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.0-flash", "gemini-pro-latest"]
+
+
+def _parse_metadata_json(raw: str) -> dict | None:
+    """JSON-Objekt aus einer Metadaten-Antwort, auch wenn Text drumherum steht; None, wenn keins lesbar ist."""
+    match = re.search(r"\{.*\}", raw, re.DOTALL)
+    for candidate in (raw, match.group(0) if match else None):
+        if not candidate:
+            continue
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def _fallback_metadata(topic: str, script: str) -> tuple[str, str]:
+    return f"{PODCAST_NAME}: {topic}", f"{SLOGAN}\n\n{script[:300]}..."
+
+
+def _episode_slug(topic: str) -> str:
+    """Dateisystemtauglicher Name für ein Thema (für episodenspezifische Temp-Ordner)."""
+    slug = re.sub(r"[^\w\-]+", "_", topic.strip()).strip("_")[:60]
+    return f"{slug or 'episode'}_{make_key(topic)[:8]}"
+
+
 class PodcastGenerator:
-    def __init__(self, topic):
+    # Was jede Stufe im Episoden-Manifest ablegt; generate_metadata ist billig und läuft immer
+    CHECKPOINTS = {
+        "research_trends": StageState(inputs=("requested_topic",), outputs=("topic",)),
+        "generate_script": StageState(inputs=("topic",), outputs=("script_content", "sources")),
+        "fetch_music": StageState(
+            inputs=("topic",), outputs=("music_path", "music_pcm_path"),
+            output_files=("music_path", "music_pcm_path"),
+        ),
+        "generate_voice": StageState(
+            inputs=("script_content",), outputs=("audio_voice_path",), output_files=("audio_voice_path",),
+        ),
+        "episode_metadata": StageState(inputs=("topic", "script_content"), outputs=("episode_title", "episode_desc")),
+        "mix_audio": StageState(
+            inputs=("topic",), input_files=("audio_voice_path", "music_path", "music_pcm_path"),
+            settings=(MIX_ENGINE, SINGLE_PASS, FAST_VIDEO),
+            outputs=("final_audio_path", "final_aac_path", "final_video_path"),
+            output_files=("final_audio_path", "final_aac_path", "final_video_path"),
+        ),
+        "create_video": StageState(
+            inputs=("topic",), input_files=("final_audio_path", "final_aac_path"), settings=(FAST_VIDEO,),
+            outputs=("final_video_path",), output_files=("final_video_path",),
+        ),
+    }
+
+    def __init__(self, topic, resume: bool = False):
         """Kapselt den End-to-End-Podcast-Flow für ein bestimmtes Thema."""
+        require_config()
         self.topic = topic
+        self.requested_topic = topic
+        self.resume = resume
+        # Eigener Temp-Ordner pro Episode, damit parallele Läufe nicht kollidieren
+        self.temp_dir = os.path.join(TEMP_DIR, "episodes", _episode_slug(topic))
+        os.makedirs(self.temp_dir, exist_ok=True)
+        # Manifest mit den Ergebnissen jeder Stufe; ohne --resume beginnt es leer
+        self.checkpoint = Checkpoint(os.path.join(self.temp_dir, "manifest.json"))
+        if not resume:
+            self.checkpoint.reset()
         self.script_content = ""
         self.audio_voice_path = ""
         self.music_path = ""
+        self.music_pcm_path = ""
         self.final_audio_path = ""
         self.final_video_path = ""
+        self.final_aac_path = ""
+        self.episode_title = ""
+        self.episode_desc = ""
         self.sources = []
+        # Im Streaming-Modus: Absätze von generate_script an generate_voice (siehe run_episode)
+        self.script_feed: Feed | None = None
+        # Titel/Beschreibung kommen gesammelt für den ganzen Batch (run_batch mit batch_metadata)
+        self.defer_metadata = False
         self.transcript_path = ""
+        self.meta_path = ""
         print(f"🚀 Starte Produktion für Thema: '{topic}'")
 
+    def checkpointed(self, name: str, fn):
+        """Umhüllt eine Stufe: beim Fortsetzen werden Stufen mit unveränderten Eingaben übersprungen."""
+        state = self.CHECKPOINTS.get(name)
+        if state is None:
+            return fn
+
+        def run():
+            key = self.checkpoint.inputs_key(name, state, self)
+            if self.resume:
+                outputs = self.checkpoint.lookup(name, key)
+                if outputs is not None:
+                    for attr, value in outputs.items():
+                        setattr(self, attr, value)
+                    print(f"   ⏭️  {name}: unverändert, übernehme Checkpoint.")
+                    return
+            fn()
+            if self.script_feed is not None:
+                # Beim Streaming startet die Stimme, bevor das Skript (ihre Eingabe) feststeht
+                key = self.checkpoint.inputs_key(name, state, self)
+            files = [getattr(self, attr) for attr in state.output_files if getattr(self, attr)]
+            self.checkpoint.record(name, key, {attr: getattr(self, attr) for attr in state.outputs}, files)
+
+        return run
+
     def _translate_topic_to_en(self, topic: str) -> str:
         """Übersetzt das Thema knapp ins Englische, falls Freesound-Suche hilft."""
         prompt = (
@@ -128,11 +502,7 @@ class PodcastGenerator:
             f"{topic}"
         )
         try:
-            resp = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
-            )
-            translated = (resp.text or "").strip().replace("\n", " ")
+            translated = generate_text("gemini-2.0-flash", prompt).strip().replace("\n", " ")
             return translated or topic
         except Exception as exc:
             print(f"   ⚠️ Übersetzung fehlgeschlagen, nutze Original: {exc}")
@@ -140,8 +510,7 @@ class PodcastGenerator:
 
     def _generate_episode_metadata(self) -> tuple[str, str]:
         """Erstellt Titel und Beschreibung basierend auf dem Transkript."""
-        preferences = ["gemini-3-pro-preview", "gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.0-flash", "gemini-pro-latest"]
-        model_name = pick_available_model(preferences)
+        model_name = pick_available_model(METADATA_MODELS)
 
         prompt = (
             "Du erstellst Veröffentlichungs-Texte für creators.spotify.com. "
@@ -154,24 +523,10 @@ class PodcastGenerator:
         )
 
         try:
-            resp = client.models.generate_content(model=model_name, contents=prompt)
-            raw = resp.text or ""
-
-            def _extract_json(candidate: str) -> str | None:
-                import re
-                match = re.search(r"\{.*\}", candidate, re.DOTALL)
-                return match.group(0) if match else None
-
-            data = None
-            for candidate in (raw, _extract_json(raw)):
-                if not candidate:
-                    continue
-                try:
-                    data = json.loads(candidate)
-                    break
-                except Exception:
-                    continue
-
+            # Unparsbare Antworten landen nicht im Cache, sonst bliebe das Thema eine Woche beim Fallback
+            data = _parse_metadata_json(generate_text(
+                model_name, prompt, validate=lambda text: _parse_metadata_json(text) is not None,
+            ))
             if data is None:
                 raise ValueError("json parse failed")
 
@@ -179,8 +534,7 @@ class PodcastGenerator:
             desc = str(data.get("description", "")).strip()
         except Exception:
             print("   ⚠️ Konnte Episode-Metadaten nicht parsen, nutze Fallback.")
-            title = f"{PODCAST_NAME}: {self.topic}"
-            desc = f"{SLOGAN}\n\n{self.script_content[:300]}..."
+            title, desc = _fallback_metadata(self.topic, self.script_content)
 
         title = title[:200]
         desc = desc[:4000]
@@ -193,16 +547,10 @@ class PodcastGenerator:
         """Holt naheliegende Trends für das Thema aus Google Trends (Deutschland)."""
         print("🔍 1. Analysiere Google Trends...")
         try:
-            pytrends = TrendReq(hl='de', tz=120)
-            pytrends.build_payload([self.topic], cat=0, timeframe='today 1-m', geo='DE')
-            related = pytrends.related_queries()
-            
-            if self.topic in related and related[self.topic]['top'] is not None:
-                df = related[self.topic]['top']
-                if not df.empty:
-                    top_query = df.iloc[0]['query']
-                    print(f"   -> Trend gefunden: '{top_query}'")
-                    self.topic = top_query
+            top = trends.related_top(self.topic, geo='DE', timeframe='today 1-m')
+            if top:
+                print(f"   -> Trend gefunden: '{top[0]}'")
+                self.topic = top[0]
             else:
                 print("   -> Keine spezifischen Trends, nutze Ursprungsthema.")
         except Exception as e:
@@ -244,17 +592,31 @@ class PodcastGenerator:
         model_name = pick_available_model(preferred)
         print(f"   -> Verwende Modell: {model_name}")
 
+        feed = self.script_feed
         try:
-            response = client.models.generate_content(model=model_name, contents=prompt)
-            raw_text = response.text
+            if feed is not None:
+                print("   -> Streaming: fertige Absätze gehen direkt an die Sprachsynthese.")
+                pieces = stream_text(model_name, prompt)
+            else:
+                pieces = [generate_text(model_name, prompt)]
 
+            normalizer = _text_normalizer()
             sources_line = ""
-            kept_lines = []
-            for line in raw_text.splitlines():
-                if line.strip().upper().startswith("QUELLEN:"):
-                    sources_line = line
-                else:
-                    kept_lines.append(line)
+            paragraphs = []
+            for para in _iter_paragraphs(pieces):
+                kept_lines = []
+                for line in para.splitlines():
+                    # Die QUELLEN-Zeile kommt meist als letzte; sie wird nie gesprochen
+                    if line.strip().upper().startswith("QUELLEN:"):
+                        sources_line = line
+                    else:
+                        kept_lines.append(line)
+                # Links, Klammern, Betonung, Abkürzungen und Lexikon in einem Durchlauf
+                text = normalizer.clean("\n".join(kept_lines)).strip()
+                if text:
+                    paragraphs.append(text)
+                    if feed is not None:
+                        feed.put(text)
 
             if sources_line:
                 parts = sources_line.split(":", 1)[-1]
@@ -262,11 +624,8 @@ class PodcastGenerator:
             else:
                 self.sources = []
 
-            cleaned_text = "\n".join(kept_lines)
-            cleaned_text = _strip_formatting(cleaned_text)
-            self.script_content = _spell_out_abbreviations(cleaned_text)
-
-            self.transcript_path = f"{TEMP_DIR}/script.txt"
+            self.script_content = "\n\n".join(paragraphs)
+            self.transcript_path = os.path.join(self.temp_dir, "script.txt")
             with open(self.transcript_path, "w", encoding="utf-8") as f:
                 f.write(self.script_content)
 
@@ -290,29 +649,47 @@ class PodcastGenerator:
         if search_topic != self.topic:
             print(f"   -> Übersetztes Suchthema: '{search_topic}'")
 
+        library = MusicLibrary(MUSIC_LIBRARY_DIR)
+
+        def _use_library_entry(entry: dict, query: str) -> None:
+            library.record_query(entry["id"], query)
+            self.music_path = library.track_path(entry["id"])
+            try:
+                # Einmalig dekodieren und normalisieren, damit das Mixing keine MP3 mehr anfasst
+                self.music_pcm_path = library.ensure_pcm(entry, _decode_music, normalize_loudness)
+            except Exception as e:
+                print(f"   ⚠️ PCM-Cache für Track {entry['id']} nicht möglich: {e}")
+                self.music_pcm_path = ""
+
         try:
             def _search_and_download(query: str) -> bool:
-                url = "https://freesound.org/apiv2/search/text/"
-                params = {
-                    "query": query,
-                    "token": FREESOUND_API_KEY,
-                    "sort": "rating_desc",
-                    "filter": "duration:[60 TO 300]"
-                }
-                resp = requests.get(url, params=params)
-                data = resp.json()
-                if data.get("results"):
-                    track = data["results"][0]
+                entry = library.find(query)
+                if entry is not None:
+                    print(f"   -> Aus lokaler Musik-Bibliothek: {entry.get('name') or entry['id']}")
+                    _use_library_entry(entry, query)
+                    return True
+
+                results = freesound.search(query, sort="rating_desc", filter="duration:[60 TO 300]")
+                if results:
+                    track = results[0]
                     track_id = track["id"]
-                    detail_url = f"https://freesound.org/apiv2/sounds/{track_id}/"
-                    d_r = requests.get(detail_url, params={"token": FREESOUND_API_KEY})
-                    track_details = d_r.json()
+                    if os.path.exists(library.track_path(track_id)):
+                        print(f"   -> Track bereits in der Bibliothek: {track['name']}")
+                        _use_library_entry(library.add(track_id, library.track_path(track_id), query=query), query)
+                        return True
+                    track_details = freesound.sound(track_id)
                     preview_url = track_details["previews"]["preview-hq-mp3"]
                     print(f"   -> Lade herunter: {track['name']}")
-                    mp3_r = requests.get(preview_url)
-                    self.music_path = f"{TEMP_DIR}/music_download.mp3"
-                    with open(self.music_path, "wb") as f:
-                        f.write(mp3_r.content)
+                    download_path = os.path.join(self.temp_dir, "music_download.mp3")
+                    freesound.download(preview_url, download_path)
+                    entry = library.add(
+                        track_id, download_path,
+                        name=track.get("name", ""),
+                        tags=track_details.get("tags", []),
+                        duration=track_details.get("duration"),
+                        query=query,
+                    )
+                    _use_library_entry(entry, query)
                     return True
                 return False
 
@@ -326,7 +703,7 @@ class PodcastGenerator:
                 return
 
             print("   -> Nichts gefunden. Nutze Stille.")
-            self.music_path = f"{TEMP_DIR}/silence.mp3"
+            self.music_path = os.path.join(self.temp_dir, "silence.mp3")
             AudioSegment.silent(duration=10000).export(self.music_path, format="mp3")
 
         except Exception as e:
@@ -336,18 +713,21 @@ class PodcastGenerator:
     # --------------------------------------------------------------------------
     # 4. STIMME (Google Cloud TTS mit Fallback & SSML)
     # --------------------------------------------------------------------------
-    def generate_voice(self):
-        """Konvertiert das Skript in Audio: Gemini TTS mit Rate-Limit-Fallback zu Cloud TTS."""
+    def generate_voice(self, max_workers: int | None = None):
+        """Konvertiert das Skript in Audio: Gemini TTS mit Rate-Limit-Fallback zu Cloud TTS.
+
+        Die Chunks werden mit bis zu ``max_workers`` (Default: PODCAST_TTS_WORKERS) parallel
+        synthetisiert und danach in Originalreihenfolge zusammengefügt.
+        """
         print("🗣️  4. Generiere Stimme (Gemini TTS, Fallback Google Cloud TTS + SSML)...")
+        from google.cloud import texttospeech
+        from google.genai import types
 
         model_tts = "gemini-2.5-pro-preview-tts"
         voice_name = "umbriel"
+        gcloud_voice = "de-DE-Polyglot-1"
         print(f"   -> Verwende TTS-Modell: {model_tts} (Stimme: {voice_name})")
 
-        def _is_rate_limit_error(exc: Exception) -> bool:
-            msg = str(exc).lower()
-            return "429" in msg or "rate" in msg or "resource_exhausted" in msg
-
         def _part_to_segment(part: types.Part, chunk_idx: int, cand_idx: int) -> AudioSegment:
             if not part.inline_data or not part.inline_data.data:
                 raise RuntimeError(f"Chunk {chunk_idx}: Leere Audio-Teilantwort")
@@ -418,14 +798,15 @@ class PodcastGenerator:
             raise RuntimeError(f"Keine Audio-Daten im Response (Chunk {chunk_idx}, Modell {model_tts})")
 
         def _generate_chunk_with_gcloud(chunk_idx: int, chunk_text: str) -> AudioSegment:
-            tts_client = texttospeech.TextToSpeechClient()
             # Wir nutzen "de-DE-Polyglot-1" oder "Studio-B". Polyglot ist oft moderner.
             voice_params = texttospeech.VoiceSelectionParams(
                 language_code="de-DE",
-                name="de-DE-Polyglot-1", # Versuche Polyglot, sonst Studio-B
+                name=gcloud_voice, # Versuche Polyglot, sonst Studio-B
             )
+            # LINEAR16 in der Rate der Sprachspur: WAV statt MP3, kein Dekodieren/Resampling vor dem Mixing
             audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
+                audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+                sample_rate_hertz=24000,
                 speaking_rate=1.05, # Leicht schneller für mehr Energie
                 pitch=0.0,
             )
@@ -434,134 +815,382 @@ class PodcastGenerator:
             ssml_text = _to_ssml(chunk_text)
             
             synthesis_input = texttospeech.SynthesisInput(ssml=ssml_text)
-            response = tts_client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice_params,
-                audio_config=audio_config,
-            )
+            with metrics.span("gcloud_tts", "synthesize_speech", voice=gcloud_voice) as span:
+                response = _gcloud_tts_client().synthesize_speech(
+                    input=synthesis_input,
+                    voice=voice_params,
+                    audio_config=audio_config,
+                )
+                span["bytes"] = len(response.audio_content or b"")
             if not response.audio_content:
                 raise RuntimeError(f"Chunk {chunk_idx}: Leere Audio-Antwort von Google Cloud TTS")
-            audio_bytes = io.BytesIO(response.audio_content)
-            return AudioSegment.from_file(audio_bytes, format="mp3")
-
-        # Aufteilen, damit TTS-Grenzen sicher eingehalten werden
-        chunks = _chunk_text(self.script_content)
-        segments: List[AudioSegment] = []
-
-        print(f"   -> Verarbeite {len(chunks)} Text-Abschnitte...")
-
-        for idx, chunk in enumerate(chunks):
-            max_attempts = 3
+            data = response.audio_content
+            if data[:4] == b"RIFF":
+                return AudioSegment.from_wav(io.BytesIO(data))
+            return AudioSegment.from_raw(io.BytesIO(data), sample_width=2, frame_rate=24000, channels=1)
+
+        # Inhaltsadressierter Segment-Cache: unveränderte Chunks kosten beim Re-Render keine TTS-Anfrage.
+        # Ohne globalen Cache landen die Chunks im Episodenordner, damit --resume sie wiederfindet.
+        if TTS_CACHE_MB > 0:
+            tts_cache = DiskCache(os.path.join(CACHE_DIR, "tts"), max_bytes=TTS_CACHE_MB * 1024 * 1024, suffix=".wav")
+        else:
+            tts_cache = DiskCache(os.path.join(self.temp_dir, "chunks"), suffix=".wav")
+
+        def _cache_keys(chunk: str) -> list[str]:
+            # Reihenfolge = Präferenz: Gemini-Aufnahme vor Cloud-TTS-Fallback
+            return [
+                make_key("gemini", model_tts, voice_name, chunk),
+                make_key("gcloud", gcloud_voice, chunk),
+            ]
+
+        def _load_cached(idx: int, chunk: str, keys: list[str] | None = None) -> tuple[str, AudioSegment] | None:
+            """(Backend, Segment) aus dem Cache; ``keys`` schränkt auf eine Stimme ein."""
+            keys = keys or _cache_keys(chunk)
+            # Ein Nachschlagen pro Chunk, damit die Trefferquote nicht durch zwei Schlüssel verfälscht wird
+            key, data = tts_cache.get_first(keys)
+            if data is None:
+                return None
             try:
-                # Versuch 1: Gemini TTS (beste Qualität)
-                for attempt in range(1, max_attempts + 1):
-                    try:
-                        seg = _generate_chunk_with_gemini(idx, chunk)
-                        segments.append(seg)
-                        break
-                    except Exception as e:
-                        # Bei Rate-Limit exponentiell warten
-                        if _is_rate_limit_error(e) and attempt < max_attempts:
-                            delay = 4 ** attempt # Aggressiveres Backoff (4s, 16s...)
-                            print(f"   ⚠️  Rate-Limit bei Chunk {idx} (Versuch {attempt}/{max_attempts}), warte {delay}s...")
-                            time.sleep(delay)
-                            continue
-                        # Wenn alle Versuche fehlschlagen, Fehler weiterreichen
-                        if _is_rate_limit_error(e) and attempt == max_attempts:
-                            print("   ⚠️  Rate-Limit erschöpft, wechsle zu Google Cloud TTS Fallback...")
-                            raise e 
-                        print(f"   ❌ Fehler bei Chunk {idx}: {e}")
-                        raise
-                else:
-                    raise RuntimeError(f"Chunk {idx}: Unbekannter Fehler bei Gemini TTS")
+                seg = AudioSegment.from_file(io.BytesIO(data), format="wav")
+            except Exception as e:
+                print(f"   ⚠️ Cache-Eintrag für Chunk {idx} defekt, verwerfe ihn: {e}")
+                tts_cache.delete(key)
+                return None
+            return ("gemini" if key == _cache_keys(chunk)[0] else "gcloud"), seg
+
+        # Hedging-Pool mit Reserve: verlorene Gemini-Anfragen laufen im Hintergrund zu Ende
+        hedge_pool = None
+        if TTS_HEDGE:
+            hedge_pool = ThreadPoolExecutor(max_workers=4 * max(1, max_workers or TTS_WORKERS),
+                                            thread_name_prefix="tts-hedge")
+        hedge_stats = {"hedged": 0, "gcloud_won": 0}
+        hedge_lock = threading.Lock()
+        # Policy "episode": ab dem kleinsten Chunk-Index mit Cloud-TTS-Stimme spricht die ganze
+        # restliche Episode mit dieser Stimme (höchstens ein Wechsel, egal in welcher Reihenfolge
+        # die Chunks fertig werden)
+        keep_voice = hedge_pool is not None and TTS_HEDGE_POLICY == "episode"
+        switch = {"from": None}
+
+        def _mark_gcloud(idx: int) -> None:
+            if not keep_voice:
+                return
+            with hedge_lock:
+                if switch["from"] is None or idx < switch["from"]:
+                    switch["from"] = idx
+                    print(f"   -> Chunk {idx} kommt von Cloud TTS; ab hier nutzen alle Abschnitte "
+                          "für eine einheitliche Stimme Cloud TTS.")
+
+        def _switched(idx: int) -> bool:
+            with hedge_lock:
+                return switch["from"] is not None and idx >= switch["from"]
+
+        def _hedge_delay() -> float:
+            observed, samples = metrics.quantile("gemini", model_tts, TTS_HEDGE_PERCENTILE / 100)
+            return observed if samples >= _HEDGE_MIN_SAMPLES else TTS_HEDGE_AFTER
+
+        def _gemini_after_bucket(idx: int, chunk: str, sent: threading.Event) -> AudioSegment:
+            with client.on_request(sent.set):
+                return _generate_chunk_with_gemini(idx, chunk)
+
+        def _hedged(idx: int, chunk: str) -> tuple[str, AudioSegment]:
+            """Gemini zuerst; überschreitet es die Hedge-Schwelle, läuft Cloud TTS parallel, die erste Antwort gewinnt.
+
+            Die Frist beginnt erst, wenn die Anfrage den Token-Bucket passiert hat: Wartezeit
+            auf das eigene RPM-Limit ist keine langsame Gemini-Antwort.
+            """
+            delay = _hedge_delay()
+            sent = threading.Event()
+            gemini = hedge_pool.submit(_gemini_after_bucket, idx, chunk, sent)
+            gemini.add_done_callback(lambda _: sent.set())
+            sent.wait()
+            wait([gemini], timeout=delay)
+            if gemini.done():
+                return "gemini", gemini.result()
+
+            print(f"   ⏱️  Chunk {idx}: Gemini braucht länger als {delay:.1f}s, starte Cloud TTS parallel...")
+            gcloud = hedge_pool.submit(_generate_chunk_with_gcloud, idx, chunk)
+            with hedge_lock:
+                hedge_stats["hedged"] += 1
+            pending = {gemini, gcloud}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                # Kommen beide gleichzeitig, bleibt es bei Gemini
+                for future in sorted(done, key=lambda f: f is gcloud):
+                    if future.exception() is not None:
+                        continue
+                    if future is gemini:
+                        return "gemini", future.result()
+                    with hedge_lock:
+                        hedge_stats["gcloud_won"] += 1
+                    return "gcloud", future.result()
+            # Beide fehlgeschlagen: der Gemini-Fehler entscheidet über den regulären Fallback
+            raise gemini.exception()
+
+        def _store_cached(idx: int, chunk: str, backend: str, seg: AudioSegment) -> tuple[str, AudioSegment]:
+            buf = io.BytesIO()
+            with metrics.span("pydub", "export_wav") as span:
+                seg.export(buf, format="wav")
+                span["bytes"] = buf.tell()
+            gemini_key, gcloud_key = _cache_keys(chunk)
+            tts_cache.set(gemini_key if backend == "gemini" else gcloud_key, buf.getvalue())
+            if backend == "gcloud":
+                _mark_gcloud(idx)
+            return backend, seg
+
+        def _with_gcloud(idx: int, chunk: str) -> tuple[str, AudioSegment]:
+            return _store_cached(idx, chunk, "gcloud", _generate_chunk_with_gcloud(idx, chunk))
+
+        def _synthesize_chunk(idx: int, chunk: str) -> tuple[str, AudioSegment]:
+            cached = _load_cached(idx, chunk)
+            if cached is not None:
+                if cached[0] == "gcloud":
+                    _mark_gcloud(idx)
+                return cached
+
+            if gcloud_only or gemini_tts_cooldown.active or _switched(idx):
+                return _with_gcloud(idx, chunk)
+            try:
+                if hedge_pool is not None:
+                    return _store_cached(idx, chunk, *_hedged(idx, chunk))
+                # Versuch 1: Gemini TTS (beste Qualität); Wiederholungen mit Backoff übernimmt der Client
+                return _store_cached(idx, chunk, "gemini", _generate_chunk_with_gemini(idx, chunk))
             except Exception as gem_err:
                 # Fallback: Google Cloud TTS (solide Qualität mit SSML-Boost)
-                if _is_rate_limit_error(gem_err):
+                if is_rate_limit_error(gem_err):
+                    if is_quota_exhausted(gem_err):
+                        blocked = gemini_tts_cooldown.trip(gem_err)
+                        print(f"   ⚠️  Gemini-TTS-Tageskontingent bei Chunk {idx} erschöpft, wechsle für "
+                              f"{blocked:.0f}s zu Google Cloud TTS Fallback...")
+                    else:
+                        print(f"   ⚠️  Rate-Limit bei Chunk {idx} trotz Wiederholungen, "
+                              "nutze für diesen Abschnitt Google Cloud TTS...")
                     try:
                         print(f"      -> Nutze Cloud TTS mit SSML für Chunk {idx}...")
-                        seg = _generate_chunk_with_gcloud(idx, chunk)
-                        segments.append(seg)
-                        continue
+                        return _with_gcloud(idx, chunk)
                     except Exception as gc_err:
                         print(f"   ❌ Google Cloud TTS Fehler (Fallback) bei Chunk {idx}: {gc_err}")
                         raise
+                print(f"   ❌ Fehler bei Chunk {idx}: {gem_err}")
                 raise
 
-        if not segments:
-            raise RuntimeError("TTS lieferte keine Segmente.")
+        def _final_segment(idx: int, chunk: str, result: tuple[str, AudioSegment]) -> AudioSegment:
+            """Wird in Chunk-Reihenfolge aufgerufen; Gemini-Aufnahmen hinter dem Stimmwechsel werden ersetzt."""
+            backend, seg = result
+            if backend == "gemini" and _switched(idx):
+                print(f"   -> Chunk {idx} lag schon mit Gemini-Stimme vor, synthetisiere ihn mit Cloud TTS neu...")
+                _, seg = _load_cached(idx, chunk, _cache_keys(chunk)[1:]) or _with_gcloud(idx, chunk)
+            return seg
+
+        # Ist Gemini gesperrt, ist Cloud TTS der Hauptweg: dann zählt nur dessen SSML-Bytelimit,
+        # und das Skript geht in etwa dreimal weniger Anfragen durch. Einmal je Episode entschieden:
+        # läuft die Sperre mitten in der Episode ab, wären die großen Abschnitte zu lang für Gemini
+        gcloud_only = gemini_tts_cooldown.active
+        chunk_chars = TTS_CHUNK_CHARS
+        if gcloud_only:
+            chunk_chars = CLOUD_TTS_MAX_SSML_BYTES
+            print(f"   -> Gemini TTS noch {gemini_tts_cooldown.remaining():.0f}s gesperrt, "
+                  "nutze direkt Google Cloud TTS mit großen Abschnitten.")
+
+        feed = self.script_feed
+        if feed is not None:
+            chunks = self._streamed_chunks(feed, chunk_chars)
+            workers = max(1, max_workers or TTS_WORKERS)
+            print(f"   -> Verarbeite Text-Abschnitte, sobald das Skript sie liefert ({workers} parallel)...")
+        else:
+            # Aufteilen, damit beide Backends passen: Gemini-Zeichenlimit und Cloud-TTS-Bytelimit des SSML
+            chunks = _chunk_text(self.script_content, max_chars=chunk_chars,
+                                 max_ssml_bytes=CLOUD_TTS_MAX_SSML_BYTES)
+            workers = max(1, min(max_workers or TTS_WORKERS, len(chunks) or 1))
+            print(f"   -> Verarbeite {len(chunks)} Text-Abschnitte ({workers} parallel)...")
+            if not chunks:
+                raise RuntimeError("TTS lieferte keine Segmente.")
+
+        # Segmente werden in Reihenfolge direkt als PCM in die WAV gestreamt:
+        # nur das 100ms-Überblendfenster bleibt im Speicher, kein MP3-Zwischenschritt.
+        self.audio_voice_path = os.path.join(self.temp_dir, "voice_raw.wav")
+        count = 0
+        try:
+            with PcmAssembler(self.audio_voice_path, crossfade_ms=100) as assembler:
+                if workers == 1:
+                    for idx, chunk in enumerate(chunks):
+                        assembler.add_segment(_final_segment(idx, chunk, _synthesize_chunk(idx, chunk)))
+                        count += 1
+                else:
+                    # Neue Chunks gehen in den Pool, sobald sie vorliegen; eingefügt wird in
+                    # Eingabereihenfolge, egal welcher Chunk zuerst fertig ist
+                    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+                    pending = deque()
+
+                    def _add_next() -> None:
+                        next_idx, next_chunk, future = pending.popleft()
+                        assembler.add_segment(_final_segment(next_idx, next_chunk, future.result()))
+
+                    def _raise_failed() -> None:
+                        # Ein fehlgeschlagener Chunk beendet die Stufe sofort, nicht erst, wenn er an der Reihe ist
+                        for _, _, future in pending:
+                            if future.done() and future.exception() is not None:
+                                raise future.exception()
 
-        final_voice = segments[0]
-        for seg in segments[1:]:
-            final_voice = final_voice.append(seg, crossfade=100)
+                    try:
+                        for idx, chunk in enumerate(chunks):
+                            pending.append((idx, chunk, pool.submit(_synthesize_chunk, idx, chunk)))
+                            count += 1
+                            _raise_failed()
+                            while pending and pending[0][2].done():
+                                _add_next()
+                        while pending:
+                            wait([f for _, _, f in pending], return_when=FIRST_COMPLETED)
+                            _raise_failed()
+                            while pending and pending[0][2].done():
+                                _add_next()
+                    except BaseException:
+                        # Wartende Chunks verwerfen statt weiter Kontingent zu verbrauchen
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        raise
+                    pool.shutdown()
+        finally:
+            if hedge_pool is not None:
+                # Nicht auf verlorene Anfragen warten, sonst wäre der Zeitgewinn dahin
+                hedge_pool.shutdown(wait=False, cancel_futures=True)
+        if hedge_pool is not None:
+            print(f"   -> Hedging: {hedge_stats['hedged']} Abschnitte doppelt angefragt, "
+                  f"{hedge_stats['gcloud_won']}× war Cloud TTS schneller.")
+        if not count:
+            raise RuntimeError("TTS lieferte keine Segmente.")
+        if feed is not None:
+            print(f"   -> {count} Text-Abschnitte aus dem Stream synthetisiert.")
 
-        self.audio_voice_path = f"{TEMP_DIR}/voice_raw.mp3"
-        final_voice.export(self.audio_voice_path, format="mp3")
+        print(f"   -> TTS-Cache: {tts_cache.stats.summary()}")
         print("   -> Sprachdatei erstellt.")
 
+    def _streamed_chunks(self, feed: Feed, chunk_chars: int = TTS_CHUNK_CHARS):
+        """Bildet TTS-Abschnitte aus gestreamten Absätzen, sobald Text für zwei volle Abschnitte vorliegt.
+
+        Der jeweils letzte Abschnitt wird zurückgehalten, weil folgende Absätze ihn
+        noch auffüllen können; so bleiben die Abschnitte fast so groß wie ohne
+        Streaming (wenige TTS-Anfragen trotz RPM-Limit). Kommt nichts über den Stream (Skript aus dem
+        Checkpoint), wird wie gewohnt das fertige Skript aufgeteilt.
+        """
+        limits = {"max_chars": chunk_chars, "max_ssml_bytes": CLOUD_TTS_MAX_SSML_BYTES}
+        pending: list[str] = []
+        size = 0
+        received = False
+        for para in feed:
+            received = True
+            pending.append(para)
+            size += len(para) + 2
+            if size <= 2 * chunk_chars:
+                continue
+            *ready, rest = _chunk_text("\n\n".join(pending), **limits)
+            yield from ready
+            pending, size = [rest], len(rest)
+        if not received:
+            pending = [self.script_content]
+        yield from _chunk_text("\n\n".join(pending), **limits)
+
     # --------------------------------------------------------------------------
     # 5. MIXING
     # --------------------------------------------------------------------------
+    def _music_pcm(self):
+        """Musik-Loop als lautheitsnormalisiertes PCM (Samples, Samplerate); ``(None, None)`` ohne Musik."""
+        if self.music_pcm_path and os.path.exists(self.music_pcm_path):
+            # Vorab dekodierte, normalisierte Kopie aus der Musik-Bibliothek
+            return read_wav_pcm(self.music_pcm_path)
+        if self.music_path and os.path.exists(self.music_path):
+            # Lokaler Loop (assets/background_loop.mp3) oder Track ohne PCM-Cache: gleiche Lautheit
+            # wie die Bibliothekstracks, damit die Musik unter der Stimme nicht je nach Quelle springt
+            pcm, sample_rate = _decode_music(self.music_path)
+            return normalize_loudness(pcm), sample_rate
+        return None, None
+
     def mix_audio(self):
         """Mischt Stimme mit Musik-Loop und exportiert die finale MP3."""
         print("🎛️  5. Mixing...")
-        voice = AudioSegment.from_mp3(self.audio_voice_path)
-
-        if self.music_path and os.path.exists(self.music_path):
-            music = AudioSegment.from_mp3(self.music_path)
-            music = music - 18 
-
-            def _loop_music_fast(track: AudioSegment, target_ms: int) -> AudioSegment:
-                """Loop per Vorverdopplung und Schnitt (spart Kopien in der Schleife)."""
-                reps = max(2, math.ceil(target_ms / len(track)) + 1)
-                combined = track * reps
-                return combined[:target_ms]
-
-            target_len = len(voice) + 2000  # kleiner Puffer für das Fade-Out
-            music = _loop_music_fast(music, target_len)
-            music = music.fade_out(1500)
-            final = music.overlay(voice, position=200)
-        else:
-            final = voice
-
         filename = f"{self.topic.replace(' ', '_')}.mp3"
         self.final_audio_path = os.path.join(OUTPUT_DIR, filename)
-        final.export(self.final_audio_path, format="mp3", bitrate="192k")
+        has_music = bool(self.music_path and os.path.exists(self.music_path))
+
+        if MIX_ENGINE == "pydub":
+            # Sprachspur liegt als unkomprimierte WAV vor, kein MP3-Dekodieren nötig
+            voice = AudioSegment.from_wav(self.audio_voice_path)
+            music = AudioSegment.from_mp3(self.music_path) if has_music else None
+            final = mix_with_pydub(voice, music)
+            with metrics.span("pydub", "export_mp3") as span:
+                final.export(self.final_audio_path, format="mp3", bitrate="192k")
+                span["bytes"] = os.path.getsize(self.final_audio_path)
+        else:
+            voice_pcm, voice_rate = read_wav_pcm(self.audio_voice_path)
+            music_pcm, music_rate = self._music_pcm()
+            mixer = VoiceMusicMixer(voice_pcm, voice_rate, music_pcm, music_rate)
+
+            # Das PCM wird direkt per stdin an FFmpeg gereicht (keine Zwischen-WAV/MP3).
+            # Single-Pass erzeugt das Video gleich mit, sonst entsteht eine AAC-Spur,
+            # die create_video ohne erneutes Kodieren übernimmt.
+            cover_image = self._video_cover() if SINGLE_PASS else None
+            video_path = None
+            if cover_image:
+                video_path = os.path.join(OUTPUT_DIR, f"{self.topic.replace(' ', '_')}_video.mp4")
+                cmd = build_pcm_encode_cmd(
+                    mixer.sample_rate, mixer.channels, self.final_audio_path,
+                    video_path=video_path, cover_image=cover_image, fast_video=FAST_VIDEO,
+                )
+            else:
+                self.final_aac_path = os.path.join(self.temp_dir, "final_audio.m4a")
+                cmd = build_pcm_encode_cmd(
+                    mixer.sample_rate, mixer.channels, self.final_audio_path, aac_path=self.final_aac_path,
+                )
+            try:
+                with metrics.span("ffmpeg", "encode_pcm", video=bool(video_path)) as span:
+                    span["bytes"] = encode_pcm(mixer.blocks(), cmd)
+                if video_path:
+                    self.final_video_path = video_path
+                    print(f"   -> Video fertig (Single-Pass): {self.final_video_path}")
+            except subprocess.CalledProcessError as e:
+                if not video_path:
+                    raise
+                # Video ist optional: Audio notfalls ohne Video kodieren
+                print(f"   ❌ FFmpeg Fehler im Single-Pass ({e}), kodiere nur Audio...")
+                self.final_aac_path = ""
+                with metrics.span("ffmpeg", "encode_pcm", video=False) as span:
+                    span["bytes"] = encode_pcm(
+                        mixer.blocks(), build_pcm_encode_cmd(mixer.sample_rate, mixer.channels, self.final_audio_path)
+                    )
         print(f"   -> Audio fertig: {self.final_audio_path}")
 
     # --------------------------------------------------------------------------
     # 6. VIDEO (FFmpeg)
     # --------------------------------------------------------------------------
+    def _video_cover(self) -> str | None:
+        """Cover für das Video; im Schnellmodus einmalig auf VIDEO_WIDTH vorskaliert."""
+        cover_image = find_cover(ASSETS_DIR)
+        if cover_image and FAST_VIDEO:
+            cover_image = prepare_cover(cover_image, os.path.join(CACHE_DIR, "covers"), VIDEO_WIDTH)
+        return cover_image
+
     def create_video(self):
         """Erstellt ein Standbild-Video mit Cover und finalem Audio via FFmpeg."""
         print("🎬 6. Erstelle YouTube-Video...")
-        cover_png = os.path.join(ASSETS_DIR, "cover.png")
-        cover_jpg = os.path.join(ASSETS_DIR, "cover.jpg")
-        
-        if os.path.exists(cover_png):
-            cover_image = cover_png
-        elif os.path.exists(cover_jpg):
-            cover_image = cover_jpg
-        else:
+        if self.final_video_path and os.path.exists(self.final_video_path):
+            print("   -> Video wurde bereits im Single-Pass erstellt.")
+            return
+
+        cover_image = self._video_cover()
+        if not cover_image:
             print(f"   ⚠️ Kein Cover gefunden (weder .png noch .jpg in {ASSETS_DIR}).")
             return
 
         video_filename = f"{self.topic.replace(' ', '_')}_video.mp4"
         self.final_video_path = os.path.join(OUTPUT_DIR, video_filename)
 
-        cmd = [
-            "ffmpeg", "-y",
-            "-loop", "1",
-            "-i", cover_image,
-            "-i", self.final_audio_path,
-            "-c:v", "libx264", "-tune", "stillimage",
-            "-c:a", "aac", "-b:a", "192k",
-            "-pix_fmt", "yuv420p",
-            "-shortest",
-            self.final_video_path
-        ]
+        # Fertige AAC-Spur aus dem Mixing übernehmen statt die MP3 erneut zu kodieren
+        reuse_aac = bool(self.final_aac_path and os.path.exists(self.final_aac_path))
+        audio_source = self.final_aac_path if reuse_aac else self.final_audio_path
+        cmd = build_video_cmd(cover_image, audio_source, self.final_video_path, copy_audio=reuse_aac, fast=FAST_VIDEO)
         
         try:
-            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+            with metrics.span("ffmpeg", "video", copy_audio=reuse_aac) as span:
+                subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+                span["bytes"] = os.path.getsize(self.final_video_path)
             print(f"   -> Video fertig: {self.final_video_path}")
         except Exception as e:
             print(f"   ❌ FFmpeg Fehler: {e}")
@@ -569,6 +1198,11 @@ class PodcastGenerator:
     # --------------------------------------------------------------------------
     # 7. METADATEN
     # --------------------------------------------------------------------------
+    def prepare_episode_metadata(self):
+        """Erzeugt Titel/Beschreibung vorab; braucht nur das Skript und kann parallel zur Stimme laufen."""
+        print("📝 Erzeuge Titel und Beschreibung...")
+        self.episode_title, self.episode_desc = self._generate_episode_metadata()
+
     def generate_metadata(self, include_media: bool = True):
         """Speichert Transkript, Titel/Beschreibung und Pfade zu Audio/Video."""
         print("📄 7. Metadaten...")
@@ -579,7 +1213,9 @@ class PodcastGenerator:
         with open(transcription_output_path, "w", encoding="utf-8") as f:
             f.write(self.script_content)
 
-        episode_title, episode_desc = self._generate_episode_metadata()
+        if not (self.episode_title or self.episode_desc or self.defer_metadata):
+            self.prepare_episode_metadata()
+        episode_title, episode_desc = self.episode_title, self.episode_desc
 
         meta = {
             "title": episode_title or f"{PODCAST_NAME}: {self.topic}",
@@ -595,103 +1231,459 @@ class PodcastGenerator:
             "transcript_file": transcription_output_path,
         }
         # ensure_ascii=False, damit Umlaute in title/description lesbar bleiben
-        with open(f"{OUTPUT_DIR}/{self.topic.replace(' ', '_')}_meta.json", "w", encoding="utf-8") as f:
+        self.meta_path = f"{OUTPUT_DIR}/{self.topic.replace(' ', '_')}_meta.json"
+        with open(self.meta_path, "w", encoding="utf-8") as f:
             json.dump(meta, f, ensure_ascii=False, indent=4)
         print("   -> Fertig.")
 
 # ==============================================================================
 # HAUPTPROGRAMM
 # ==============================================================================
-if __name__ == "__main__":
-    print(f"--- {PODCAST_NAME.upper()} AUTOMATISIERUNG ---")
-    topic = input("Thema (Lass leer für aktuellen Top-Trend): ").strip()
+def discover_trending_topic() -> str:
+    """Ermittelt den aktuellen Top-Trend (DE, dann AT, dann CH) mit statischem Fallback."""
+    print("🔍 Keine Eingabe. Suche nach aktuellen Trends in Deutschland...")
+    try:
+        trend_topic = trends.top_trend(('DE', 'AT', 'CH'))
+        if trend_topic:
+            topic = trend_topic
+            print(f"📈 Top-Trend gefunden: '{topic}'")
+        else:
+            print("   ⚠️ Keine Trends gefunden. Nutze Fallback.")
+            for code, dbg in trends.debug.items():
+                print(f"   🔎 today_searches {code}: {dbg}")
+            topic = "Künstliche Intelligenz"
+    except Exception as e:
+        print(f"   ⚠️ Fehler bei Trend-Suche: {e}. Nutze Fallback.")
+        topic = "Künstliche Intelligenz"
+    return topic
 
-    if not topic:
-        print("🔍 Keine Eingabe. Suche nach aktuellen Trends in Deutschland...")
-        try:
-            pytrends = TrendReq(hl='de', tz=120)
-            debug_today = {}
-
-            def _try_today(country_code: str):
-                # Versuche dailytrends, dann realtime, dann legacy trending_searches
-                def _pick_realtime(df_rt):
-                    if df_rt is None or df_rt.empty:
-                        return None
-                    row0 = df_rt.iloc[0]
-                    title = None
-                    if "title" in df_rt.columns:
-                        t = row0.get("title")
-                        if isinstance(t, list) and t:
-                            title = t[0]
-                        elif isinstance(t, str) and t.strip():
-                            title = t.strip()
-                    if not title and "entityNames" in df_rt.columns:
-                        names = row0.get("entityNames")
-                        if isinstance(names, list) and names:
-                            title = names[0]
-                    return title
 
-                try:
-                    df = pytrends.today_searches(pn=country_code)
-                    if df is not None:
-                        debug_today[country_code] = df.head().to_string(index=False)
-                    if df is not None and not df.empty:
-                        return df.iloc[0]
-                except Exception as err:
-                    debug_today[country_code] = f"dailytrends Fehler: {err}"
+# Stufen-Limits für Batch-Läufe; im Worker-Prozess via _init_batch_worker gesetzt
+_stage_limits: dict = {}
 
-                try:
-                    df_rt = pytrends.realtime_trending_searches(pn=country_code, count=50)
-                    if df_rt is not None:
-                        debug_today[f"{country_code}-realtime"] = df_rt.head().to_string(index=False)
-                    pick = _pick_realtime(df_rt)
-                    if pick:
-                        return pick
-                except Exception as err:
-                    debug_today[f"{country_code}-realtime"] = f"realtime Fehler: {err}"
 
+class _stage_slot:
+    """Belegt einen Slot der Stufe (llm/tts/ffmpeg), falls für diesen Prozess Limits gesetzt sind."""
+
+    def __init__(self, name: str):
+        self._sem = _stage_limits.get(name)
+
+    def __enter__(self):
+        if self._sem is not None:
+            self._sem.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._sem is not None:
+            self._sem.release()
+
+
+def _init_stage_limits(limits: dict) -> None:
+    """Übernimmt die Semaphoren der Stufen-Slots (prozessübergreifend oder für Threads im Daemon)."""
+    global _stage_limits
+    _stage_limits = limits
+
+
+def _init_batch_worker(limits: dict) -> None:
+    """Initializer für Pool-Worker: übernimmt prozessübergreifende Semaphoren.
+
+    Geforkte Worker erben Clients, die der Elternprozess schon aufgebaut hat (z.B. den
+    genai-Client aus ``warm_model_cache``); deren Keep-Alive-Verbindungen dürfen nicht
+    von mehreren Prozessen genutzt werden, also baut jeder Worker eigene auf.
+    """
+    global _gcloud_tts
+    _init_stage_limits(limits)
+    client.client = None
+    _gcloud_tts = None
+    freesound.close()
+
+
+def _closing_feed(feed: Feed, fn):
+    """Schließt ``feed`` nach ``fn``, auch bei Fehlern, damit der Konsument nicht ewig wartet."""
+    def run():
+        try:
+            fn()
+        except BaseException as e:
+            feed.close(e)
+            raise
+        feed.close()
+    return run
+
+
+def run_episode(topic: str, resume: bool = False, defer_metadata: bool = False) -> dict:
+    """Produziert eine komplette Episode und liefert einen Bericht (Status, Dauer, Stufen, Dateien).
+
+    Mit ``resume`` werden Stufen übersprungen, deren Eingaben sich seit dem letzten
+    Lauf nicht geändert haben und deren Dateien noch unverändert vorliegen.
+    """
+    report = {"topic": topic, "status": "ok", "error": None, "stages": {}}
+    started = time.perf_counter()
+    bot = PodcastGenerator(topic, resume=resume)
+    # Streaming braucht parallele Stufen; beim Fortsetzen kommt das Skript meist aus dem Checkpoint
+    if STREAM_SCRIPT and PARALLEL_STAGES and not resume:
+        bot.script_feed = Feed()
+
+    # Abhängigkeiten der Stufen: Musik braucht nur das (evtl. per Trend geänderte) Thema,
+    # Titel/Beschreibung nur das Skript; Mixing wartet auf Stimme und Musik.
+    stages = [
+        Stage("research_trends", bot.research_trends),
+        Stage("generate_script", bot.generate_script, deps=("research_trends",), slot="llm"),
+        Stage("fetch_music", bot.fetch_music, deps=("research_trends",)),
+        Stage("generate_voice", bot.generate_voice,
+              deps=("research_trends",) if bot.script_feed else ("generate_script",), slot="tts"),
+        Stage("episode_metadata", bot.prepare_episode_metadata, deps=("generate_script",), slot="llm"),
+        Stage("mix_audio", bot.mix_audio, deps=("generate_voice", "fetch_music"), slot="ffmpeg"),
+        Stage("create_video", bot.create_video, deps=("mix_audio",), slot="ffmpeg"),
+        Stage("generate_metadata", bot.generate_metadata, deps=("create_video", "episode_metadata")),
+    ]
+    if defer_metadata:
+        bot.defer_metadata = True
+        stages = [stage for stage in stages if stage.name != "episode_metadata"]
+        stages[-1].deps = ("create_video",)
+    for stage in stages:
+        fn = bot.checkpointed(stage.name, stage.fn)
+        if stage.name == "generate_script" and bot.script_feed is not None:
+            fn = _closing_feed(bot.script_feed, fn)
+        stage.fn = metrics.timed("stage", stage.name, fn, episode=bot.requested_topic)
+    pipeline = Pipeline(stages, max_workers=4 if PARALLEL_STAGES else 1, slot_guard=_stage_slot)
+    report["stages"] = pipeline.timings
+
+    try:
+        pipeline.run()
+    except Exception as e:
+        report["status"] = "error"
+        report["error"] = f"{type(e).__name__}: {e}"
+        print(f"   ❌ Episode '{topic}' fehlgeschlagen: {report['error']}")
+
+    report["final_topic"] = bot.topic
+    report["duration_s"] = round(time.perf_counter() - started, 2)
+    report["files"] = {
+        "audio": bot.final_audio_path or None, "video": bot.final_video_path or None, "meta": bot.meta_path or None,
+    }
+    report["gemini"] = client.stats_summary()
+    report["llm_cache"] = llm_cache.stats.summary() if llm_cache is not None else "aus"
+    report["peak_rss_mb"] = round(peak_rss_bytes() / 2**20, 1)
+    return report
+
+
+def _read_topics(source: str) -> List[str]:
+    """Liest Themen zeilenweise aus Datei oder stdin ("-"); leere Zeilen und #-Kommentare entfallen."""
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    topics = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#") and line not in topics:
+            topics.append(line)
+    return topics
+
+
+def run_batch(topics: List[str], workers: int, llm_slots: int, tts_slots: int, ffmpeg_slots: int,
+              resume: bool = False, batch_metadata: bool = False) -> List[dict]:
+    """Produziert mehrere Episoden parallel in einem Prozess-Pool mit Limits pro Stufe.
+
+    Mit ``batch_metadata`` entstehen Titel/Beschreibungen erst am Ende gesammelt
+    für alle erfolgreichen Episoden (siehe ``generate_metadata_batch``).
+    """
+    with multiprocessing.Manager() as manager:
+        limits = {
+            "llm": manager.BoundedSemaphore(llm_slots),
+            "tts": manager.BoundedSemaphore(tts_slots),
+            "ffmpeg": manager.BoundedSemaphore(ffmpeg_slots),
+        }
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(limits,)) as pool:
+            futures = {pool.submit(run_episode, topic, resume, batch_metadata): topic for topic in topics}
+            reports = []
+            for future in as_completed(futures):
                 try:
-                    pn_map = {
-                        'DE': 'germany',
-                        'AT': 'austria',
-                        'CH': 'switzerland',
-                    }
-                    pn_val = pn_map.get(country_code, 'germany')
-                    df_legacy = pytrends.trending_searches(pn=pn_val)
-                    if df_legacy is not None:
-                        debug_today[f"{country_code}-legacy"] = df_legacy.head().to_string(index=False)
-                    if df_legacy is not None and not df_legacy.empty:
-                        return df_legacy.iloc[0, 0]
-                except Exception as err:
-                    debug_today[f"{country_code}-legacy"] = f"legacy Fehler: {err}"
+                    reports.append(future.result())
+                except Exception as e:
+                    # z.B. abgestürzter Worker-Prozess
+                    reports.append({"topic": futures[future], "status": "error", "error": f"{type(e).__name__}: {e}"})
+    order = {topic: idx for idx, topic in enumerate(topics)}
+    reports = sorted(reports, key=lambda r: order[r["topic"]])
+    if batch_metadata:
+        _apply_batch_metadata(reports)
+    return reports
+
+
+def generate_metadata_batch(episodes: List[tuple[str, str]], batch_size: int = METADATA_BATCH_SIZE,
+                            attempts: int = METADATA_BATCH_ATTEMPTS) -> List[tuple[str, str]]:
+    """Titel/Beschreibung für viele (Thema, Skript)-Paare mit wenigen Anfragen.
+
+    Je Anfrage gehen bis zu ``batch_size`` gekürzte Transkripte mit Antwort-Schema
+    (JSON-Array aus id/title/description) raus. Jeder Eintrag wird einzeln geprüft;
+    nur fehlende oder ungültige Episoden werden in der nächsten Runde erneut
+    angefragt, was nach ``attempts`` Runden noch fehlt, bekommt den Fallback-Text.
+    """
+    from google.genai import types
+
+    text = types.Schema(type=types.Type.STRING)
+    config = types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                properties={"id": types.Schema(type=types.Type.INTEGER), "title": text, "description": text},
+                required=["id", "title", "description"],
+            ),
+        ),
+    )
+    model_name = pick_available_model(METADATA_MODELS)
+    condensed = [condense_transcript(script) for _, script in episodes]
+    results: dict[int, tuple[str, str]] = {}
+    pending = list(range(1, len(episodes) + 1))
+    for attempt in range(1, attempts + 1):
+        failed = []
+        for start in range(0, len(pending), batch_size):
+            ids = pending[start:start + batch_size]
+            prompt = build_batch_prompt(PODCAST_NAME, SLOGAN, [(i, episodes[i - 1][0], condensed[i - 1]) for i in ids])
+            try:
+                raw = generate_text(model_name, prompt, config)
+            except Exception as e:
+                print(f"   ⚠️ Sammel-Anfrage für {len(ids)} Episoden fehlgeschlagen: {e}")
+                failed += ids
+                continue
+            valid, bad = parse_batch_response(raw, ids)
+            if bad and llm_cache is not None:
+                # Unvollständige Antwort nicht wiederverwenden
+                llm_cache.delete(model_name, prompt, config)
+            results.update(valid)
+            failed += bad
+        pending = failed
+        if not pending:
+            break
+        if attempt < attempts:
+            print(f"   ⚠️ {len(pending)} Episoden ohne gültige Metadaten, frage nur diese erneut an...")
+    for i in pending:
+        print(f"   ⚠️ Keine gültigen Metadaten für '{episodes[i - 1][0]}', nutze Fallback.")
+        results[i] = _fallback_metadata(*episodes[i - 1])
+    return [results[i] for i in range(1, len(episodes) + 1)]
+
+
+def _apply_batch_metadata(reports: List[dict]) -> None:
+    """Trägt gesammelt erzeugte Titel/Beschreibungen in die Metadaten-Dateien der Episoden ein."""
+    items = []
+    for r in reports:
+        path = (r.get("files") or {}).get("meta")
+        if r["status"] == "ok" and path:
+            with open(path, encoding="utf-8") as f:
+                items.append((r, path, json.load(f)))
+    if not items:
+        return
+    requests_needed = -(-len(items) // METADATA_BATCH_SIZE)
+    print(f"📝 Erzeuge Titel und Beschreibungen für {len(items)} Episoden ({requests_needed} Sammel-Anfragen)...")
+    try:
+        generated = generate_metadata_batch([(r["final_topic"], meta["transcript"]) for r, _, meta in items])
+    except Exception as e:
+        # Die Episoden selbst sind fertig; ihre Dateien behalten den Fallback-Text
+        print(f"   ⚠️ Sammel-Metadaten fehlgeschlagen, Episoden behalten den Fallback: {e}")
+        return
+    for (_, path, meta), (title, desc) in zip(items, generated):
+        meta.update(title=title, description=desc, episode_title=title, episode_description=desc)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, path)
 
-                return None
 
-            trend_topic = (
-                _try_today('DE')
-                or _try_today('AT')
-                or _try_today('CH')
-            )
+def _finish_job(queue: JobQueue, job, report: dict, attempts: int = 3) -> None:
+    """Trägt das Ergebnis ein, damit kein Auftrag dauerhaft auf ``running`` hängen bleibt.
 
-            if trend_topic:
-                topic = trend_topic
-                print(f"📈 Top-Trend gefunden: '{topic}'")
-            else:
-                print("   ⚠️ Keine Trends gefunden. Nutze Fallback.")
-                for code, dbg in debug_today.items():
-                    print(f"   🔎 today_searches {code}: {dbg}")
-                topic = "Künstliche Intelligenz"
+    Scheitert das Speichern (z.B. gesperrte Datenbank), wird mit einem schlanken Bericht
+    wiederholt; gelingt auch das nicht, reiht der nächste Daemon-Start den Auftrag neu ein.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            queue.finish(job.id, report)
+            return
         except Exception as e:
-            print(f"   ⚠️ Fehler bei Trend-Suche: {e}. Nutze Fallback.")
-            topic = "Künstliche Intelligenz"
-    bot = PodcastGenerator(topic)
-    
-    bot.research_trends()
-    bot.generate_script()
-    bot.fetch_music()
-    bot.generate_voice()
-    bot.mix_audio()
-    bot.create_video()
-    bot.generate_metadata()
-    
-    print("\n✅ ALLES ERLEDIGT!")
\ No newline at end of file
+            print(f"   ⚠️  Auftrag {job.id}: Status nicht gespeichert (Versuch {attempt}/{attempts}): "
+                  f"{type(e).__name__}: {e}")
+            report = {key: report.get(key) for key in ("topic", "status", "error", "duration_s")}
+            if attempt < attempts:
+                time.sleep(0.5 * attempt)
+    print(f"   ❌ Auftrag {job.id} bleibt bis zum nächsten Start auf 'running'.")
+
+
+def _run_job(queue: JobQueue, job) -> dict:
+    try:
+        report = run_episode(job.topic, resume=job.resume)
+    except Exception as e:
+        report = {"topic": job.topic, "status": "error", "error": f"{type(e).__name__}: {e}"}
+    _finish_job(queue, job, report)
+    mark = "✅" if report["status"] == "ok" else "❌"
+    print(f"   {mark} Auftrag {job.id} '{job.topic}': {report.get('duration_s', '-')}s {report.get('error') or ''}".rstrip())
+    return report
+
+
+def serve(queue: JobQueue, workers: int, llm_slots: int, tts_slots: int, ffmpeg_slots: int,
+          poll: float = 2.0, stop: threading.Event | None = None, drain: bool = False) -> None:
+    """Daemon: arbeitet Aufträge aus ``queue`` mit höchstens ``workers`` Episoden gleichzeitig ab.
+
+    Anders als ``run_batch`` laufen die Episoden als Threads in diesem Prozess, damit
+    Gemini-Client, Modell-Liste, Normalizer, Trend- und HTTP-Sitzungen warm bleiben.
+    Endet mit ``stop`` (laufende Episoden werden noch fertig) bzw. mit ``drain``,
+    sobald die Warteschlange leer ist.
+    """
+    stop = stop or threading.Event()
+    _init_stage_limits({
+        "llm": threading.BoundedSemaphore(llm_slots),
+        "tts": threading.BoundedSemaphore(tts_slots),
+        "ffmpeg": threading.BoundedSemaphore(ffmpeg_slots),
+    })
+    recovered = queue.requeue_running()
+    if recovered:
+        print(f"   ↩️ {recovered} abgebrochene Aufträge wieder eingereiht.")
+    started_at = time.time()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="episode") as pool:
+        running = set()
+        while not stop.is_set():
+            while len(running) < workers:
+                job = queue.claim()
+                if job is None:
+                    break
+                print(f"📥 Auftrag {job.id}: '{job.topic}'")
+                running.add(pool.submit(_run_job, queue, job))
+            if not running:
+                if drain:
+                    break
+                stop.wait(poll)
+                continue
+            done, running = wait(running, timeout=poll, return_when=FIRST_COMPLETED)
+            if done:
+                _export_prometheus(started_at, in_process=True)
+        if running:
+            print(f"   ⏳ Warte auf {len(running)} laufende Episoden...")
+
+
+def _print_jobs(queue: JobQueue, job_id: int | None) -> None:
+    if job_id is not None:
+        job = queue.get(job_id)
+        if job is None:
+            raise SystemExit(f"Auftrag {job_id} nicht gefunden.")
+        print(json.dumps(asdict(job), ensure_ascii=False, indent=4))
+        return
+    print("📋 " + ", ".join(f"{status} {n}" for status, n in queue.counts().items()))
+    for job in queue.jobs():
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(job.created_at))
+        duration = f"{job.finished_at - job.started_at:.0f}s" if job.finished_at and job.started_at else "-"
+        print(f"   {job.id:>5} {job.status:<8} {when} {duration:>6}  {job.topic}")
+
+
+def _export_prometheus(started_at: float, in_process: bool = False) -> None:
+    """Schreibt die Messwerte seit ``started_at`` als Prometheus-Textdatei (falls konfiguriert).
+
+    Im Batch-Modus messen die Worker-Prozesse; deshalb wird aus der JSON-Lines-Datei aggregiert.
+    Mit ``in_process`` (Daemon: alle Episoden laufen hier) genügen die laufenden Summen im Speicher.
+    """
+    if not PROMETHEUS_FILE:
+        return
+    if in_process or not METRICS_FILE:
+        totals = metrics.totals()
+    else:
+        totals = summarize(read_events(METRICS_FILE, since=started_at))
+    print(f"📈 Prometheus-Metriken: {write_prometheus(totals, PROMETHEUS_FILE)}")
+
+
+def _write_batch_report(reports: List[dict], started_at: float) -> str:
+    ok = sum(1 for r in reports if r["status"] == "ok")
+    summary = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started_at)),
+        "duration_s": round(time.time() - started_at, 2),
+        "episodes": len(reports),
+        "succeeded": ok,
+        "failed": len(reports) - ok,
+        "reports": reports,
+    }
+    path = os.path.join(OUTPUT_DIR, f"batch_report_{time.strftime('%Y%m%d_%H%M%S', time.localtime(started_at))}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=4)
+    return path
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=f"{PODCAST_NAME} Podcast-Generator")
+    parser.add_argument("--batch", metavar="DATEI",
+                        help="Themenliste (eine pro Zeile, '-' = stdin) ohne Rückfrage produzieren")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="parallele Episoden im Batch (Prozesse) bzw. im Daemon (Threads)")
+    parser.add_argument("--llm-slots", type=int, default=2, help="gleichzeitige Skript-/Metadaten-Stufen")
+    parser.add_argument("--tts-slots", type=int, default=1, help="gleichzeitige Sprachsynthese-Stufen")
+    parser.add_argument("--ffmpeg-slots", type=int, default=1, help="gleichzeitige Mixing-/Video-Stufen")
+    parser.add_argument("--batch-metadata", action="store_true",
+                        help="Titel/Beschreibungen im Batch gesammelt in wenigen Anfragen erzeugen")
+    parser.add_argument("--resume", action="store_true",
+                        help="unveränderte Stufen aus dem letzten Lauf übernehmen (Checkpoint je Episode)")
+    parser.add_argument("--serve", action="store_true",
+                        help="als Daemon Aufträge aus der Warteschlange abarbeiten (Clients bleiben warm)")
+    parser.add_argument("--enqueue", metavar="DATEI",
+                        help="Themenliste (eine pro Zeile, '-' = stdin) in die Warteschlange stellen")
+    parser.add_argument("--status", nargs="?", type=int, const=-1, metavar="ID",
+                        help="Aufträge der Warteschlange anzeigen (mit ID: Bericht dieses Auftrags)")
+    parser.add_argument("--queue-db", default=QUEUE_DB, help="SQLite-Datei der Warteschlange")
+    args = parser.parse_args(argv)
+
+    # Warteschlange befüllen/abfragen geht ohne Credentials und ohne warme Clients
+    if args.enqueue or args.status is not None:
+        queue = JobQueue(args.queue_db)
+        for topic in _read_topics(args.enqueue) if args.enqueue else []:
+            print(f"📥 Auftrag {queue.submit(topic, resume=args.resume)}: '{topic}'")
+        if args.status is not None:
+            _print_jobs(queue, None if args.status < 0 else args.status)
+        return
+
+    require_config()
+    print(f"--- {PODCAST_NAME.upper()} AUTOMATISIERUNG ---")
+    warm_model_cache()
+
+    if args.serve:
+        stop = threading.Event()
+        # SIGTERM (systemd, docker stop) wie Strg+C: keine neuen Aufträge, laufende fertig produzieren
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        print(f"🛰️ Daemon: {args.queue_db}, {args.workers} Episoden parallel "
+              f"(LLM {args.llm_slots}, TTS {args.tts_slots}, FFmpeg {args.ffmpeg_slots})")
+        try:
+            serve(JobQueue(args.queue_db), max(1, args.workers), max(1, args.llm_slots),
+                  max(1, args.tts_slots), max(1, args.ffmpeg_slots), stop=stop)
+        except KeyboardInterrupt:
+            stop.set()
+        return
+
+    if args.batch:
+        topics = _read_topics(args.batch)
+        if not topics:
+            print("   ⚠️ Keine Themen in der Batch-Liste.")
+            return
+        started_at = time.time()
+        print(f"📦 Batch: {len(topics)} Episoden, {args.workers} Worker "
+              f"(LLM {args.llm_slots}, TTS {args.tts_slots}, FFmpeg {args.ffmpeg_slots})")
+        reports = run_batch(topics, max(1, args.workers), max(1, args.llm_slots),
+                            max(1, args.tts_slots), max(1, args.ffmpeg_slots), resume=args.resume,
+                            batch_metadata=args.batch_metadata)
+        for r in reports:
+            mark = "✅" if r["status"] == "ok" else "❌"
+            print(f"   {mark} {r['topic']}: {r.get('duration_s', '-')}s {r.get('error') or ''}".rstrip())
+        print(f"📊 Bericht: {_write_batch_report(reports, started_at)}")
+        _export_prometheus(started_at)
+        return
+
+    topic = input("Thema (Lass leer für aktuellen Top-Trend): ").strip()
+    if not topic:
+        topic = discover_trending_topic()
+
+    started_at = time.time()
+    report = run_episode(topic, resume=args.resume)
+    _export_prometheus(started_at)
+    if report["status"] != "ok":
+        raise SystemExit(1)
+    print(f"   -> Gemini-Drosselung: {report['gemini']}")
+    print("\n✅ ALLES ERLEDIGT!")
+
+
+if __name__ == "__main__":
+    main()
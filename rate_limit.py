@@ -0,0 +1,342 @@
+import itertools
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+_RETRY_HINT_PATTERNS = [
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+    re.compile(r"retry[_ ]?delay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE),
+]
+# Nur eindeutige Hinweise; ein bloßes "rate" träfe auch "generate", "accurate" usw.
+_RATE_LIMIT_TEXT = re.compile(r"\b429\b|rate[ _-]?limit|resource_exhausted|too many requests", re.IGNORECASE)
+# Tageskontingent (z.B. quotaId "GenerateRequestsPerDayPerProjectPerModel"), nicht das Minutenlimit
+_DAILY_QUOTA_TEXT = re.compile(r"per[ _-]?day|daily", re.IGNORECASE)
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """Erkennt Quota-/Rate-Limit-Fehler (HTTP 429 bzw. RESOURCE_EXHAUSTED)."""
+    if getattr(exc, "code", None) == 429:
+        return True
+    return _RATE_LIMIT_TEXT.search(str(exc)) is not None
+
+
+def is_quota_exhausted(exc: Exception) -> bool:
+    """429 wegen erschöpftem Tageskontingent; ein Minutenlimit ist nach kurzer Zeit wieder frei."""
+    return is_rate_limit_error(exc) and _DAILY_QUOTA_TEXT.search(str(exc)) is not None
+
+
+def is_transient_error(exc: Exception) -> bool:
+    """Vorübergehende Serverfehler, bei denen sich ein erneuter Versuch lohnt."""
+    if getattr(exc, "code", None) in (500, 502, 503, 504):
+        return True
+    msg = str(exc).lower()
+    return "503" in msg or "unavailable" in msg or "deadline" in msg
+
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    """Liest einen Wartehinweis des Servers (Retry-After Header oder retryDelay) aus."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        header = headers.get("retry-after") or headers.get("Retry-After")
+    except AttributeError:
+        header = None
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            pass
+    msg = str(exc)
+    for pattern in _RETRY_HINT_PATTERNS:
+        match = pattern.search(msg)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt: int, base: float = 2.0, cap: float = 60.0, hint: float | None = None,
+                  rng: random.Random | None = None) -> float:
+    """Exponentielles Backoff mit Jitter; ein Server-Hinweis gilt als Untergrenze."""
+    rng = rng or random
+    ceiling = min(cap, base * (2 ** (attempt - 1)))
+    delay = ceiling / 2 + rng.uniform(0, ceiling / 2)
+    if hint is not None:
+        # Etwas Jitter obendrauf, damit parallele Threads nicht gleichzeitig wieder anklopfen
+        delay = max(delay, hint + rng.uniform(0, 1))
+    return delay
+
+
+class TokenBucket:
+    """Thread-sicherer Token-Bucket; acquire() blockiert, bis eine Anfrage erlaubt ist.
+
+    Ohne ``burst`` entspricht die Kapazität dem Minutenkontingent des Anbieters: ein
+    voller Bucket erlaubt so viele Anfragen auf einmal, wie die API pro Minute annimmt.
+    """
+
+    def __init__(self, rate_per_min: float, burst: float | None = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_min / 60.0
+        self.capacity = burst if burst is not None else max(1.0, rate_per_min)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> float:
+        """Reserviert ein Token und wartet ggf.; liefert die Wartezeit in Sekunden."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            # Negative Tokens sind Reservierungen späterer Aufrufer
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Sperrt den Bucket für alle Aufrufer (z.B. nach einem 429 mit Retry-Hinweis)."""
+        with self._lock:
+            self._refill()
+            # Der nächste acquire() wartet damit genau ``seconds``
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+
+class Cooldown:
+    """Sperrt ein Backend prozessweit, nachdem sein Kontingent erschöpft ist (siehe ``is_quota_exhausted``).
+
+    Solange die Sperre gilt, können Aufrufer direkt zum Fallback wechseln, statt
+    jede Anfrage erst durch alle Backoff-Runden zu schicken.
+    """
+
+    def __init__(self, seconds: float, clock=time.monotonic):
+        self.seconds = seconds
+        self._clock = clock
+        self._until = 0.0
+        self._lock = threading.Lock()
+
+    def trip(self, exc: Exception | None = None) -> float:
+        """Startet (bzw. verlängert) die Sperre; ein Retry-Hinweis des Servers gilt als Untergrenze."""
+        hint = retry_after_seconds(exc) if exc is not None else None
+        with self._lock:
+            self._until = max(self._until, self._clock() + max(self.seconds, hint or 0.0))
+            return self._until - self._clock()
+
+    def remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._until - self._clock())
+
+    @property
+    def active(self) -> bool:
+        return self.remaining() > 0
+
+
+@dataclass
+class ThrottleStats:
+    calls: int = 0
+    retries: int = 0
+    rate_limit_errors: int = 0
+    throttled_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+
+
+def response_bytes(resp) -> int:
+    """Grobe Nutzlastgröße einer generate_content-Antwort (Text plus Inline-Daten wie Audio)."""
+    total = 0
+    try:
+        for cand in resp.candidates or []:
+            for part in cand.content.parts or []:
+                if getattr(part, "inline_data", None) is not None and part.inline_data.data:
+                    total += len(part.inline_data.data)
+                elif getattr(part, "text", None):
+                    total += len(part.text.encode("utf-8"))
+    except (AttributeError, TypeError):
+        return 0
+    return total
+
+
+class _RateLimitedModels:
+    def __init__(self, owner: "RateLimitedClient"):
+        self._owner = owner
+
+    def generate_content(self, *, model: str, **kwargs):
+        return self._owner.call(model, lambda: self._owner.client.models.generate_content(model=model, **kwargs))
+
+    def generate_content_stream(self, *, model: str, **kwargs):
+        # Das SDK liefert einen Generator, die Anfrage startet erst beim ersten next(). Deshalb
+        # holt call() das erste Stück selbst: 429/503 beim Start laufen durch Backoff und Messung.
+        # Fehler mitten im Stream reicht der Aufrufer weiter.
+        def start():
+            stream = iter(self._owner.client.models.generate_content_stream(model=model, **kwargs))
+            try:
+                first = next(stream)
+            except StopIteration:
+                return iter(())
+            return itertools.chain([first], stream)
+
+        return self._owner.call(model, start)
+
+    def list(self, *args, **kwargs):
+        return self._owner.call("models.list", lambda: list(self._owner.client.models.list(*args, **kwargs)))
+
+    def __getattr__(self, name):
+        return getattr(self._owner.client.models, name)
+
+
+class RateLimitedClient:
+    """Hülle um ``genai.Client`` mit proaktivem Limit pro Modell und Backoff bei 429/5xx.
+
+    ``limits`` bildet Teilstrings von Modellnamen auf Anfragen pro Minute ab
+    (erster Treffer gewinnt), alle übrigen Modelle nutzen ``default_rpm``.
+    Aufrufe über ``client.models.generate_content(...)`` bleiben unverändert.
+    ``burst`` begrenzt die Anfragen, die ein voller Bucket sofort durchlässt (Default: das RPM-Limit).
+    Mit ``metrics`` wird jeder Aufruf (inkl. Wiederholungen) als ``gemini``-Span erfasst; dessen
+    Dauer umfasst nur die Anfragen selbst, Wartezeit im Bucket steht in ``throttled_seconds``.
+    Statt eines fertigen Clients kann ``factory`` übergeben werden; er wird dann erst
+    beim ersten Zugriff gebaut.
+    """
+
+    def __init__(self, client=None, limits: dict[str, float] | None = None, default_rpm: float = 60,
+                 max_attempts: int = 3, base_delay: float = 2.0, max_delay: float = 60.0,
+                 sleep=time.sleep, clock=time.monotonic, rng: random.Random | None = None, metrics=None,
+                 factory=None, burst: float | None = None):
+        if client is None and factory is None:
+            raise ValueError("client oder factory wird benötigt")
+        self._client = client
+        self._factory = factory
+        self.metrics = metrics
+        self.limits = dict(limits or {})
+        self.default_rpm = default_rpm
+        self.burst = burst
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng
+        self._buckets: dict[str, TokenBucket] = {}
+        self._stats: dict[str, ThrottleStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.models = _RateLimitedModels(self)
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def _rpm_for(self, model: str) -> float:
+        for token, rpm in self.limits.items():
+            if token in model:
+                return rpm
+        return self.default_rpm
+
+    def _bucket(self, model: str) -> tuple[TokenBucket, ThrottleStats]:
+        with self._lock:
+            if model not in self._buckets:
+                self._buckets[model] = TokenBucket(self._rpm_for(model), burst=self.burst,
+                                                   clock=self._clock, sleep=self._sleep)
+                self._stats[model] = ThrottleStats()
+            return self._buckets[model], self._stats[model]
+
+    @contextmanager
+    def on_request(self, callback):
+        """Ruft ``callback()`` in diesem Thread auf, sobald eine Anfrage den Bucket passiert hat.
+
+        So können Aufrufer (z.B. Hedging) Fristen ab dem tatsächlichen Senden messen
+        statt ab dem Warten auf ein Token.
+        """
+        previous = getattr(self._local, "on_request", None)
+        self._local.on_request = callback
+        try:
+            yield
+        finally:
+            self._local.on_request = previous
+
+    def call(self, model: str, fn):
+        """Führt ``fn`` gedrosselt aus und wiederholt bei Rate-Limit oder Serverfehlern."""
+        bucket, stats = self._bucket(model)
+        elapsed = 0.0
+        throttled = 0.0
+        for attempt in range(1, self.max_attempts + 1):
+            waited = bucket.acquire()
+            throttled += waited
+            with self._lock:
+                stats.calls += 1
+                stats.throttled_seconds += waited
+            callback = getattr(self._local, "on_request", None)
+            if callback is not None:
+                callback()
+            # Gemessen wird erst ab hier: die Latenz der API, nicht die des eigenen Buckets
+            started = time.perf_counter()
+            try:
+                result = fn()
+                elapsed += time.perf_counter() - started
+                self._observe(model, elapsed, True, attempt - 1, throttled, result)
+                return result
+            except Exception as exc:
+                elapsed += time.perf_counter() - started
+                rate_limited = is_rate_limit_error(exc)
+                if not (rate_limited or is_transient_error(exc)) or attempt == self.max_attempts:
+                    if rate_limited:
+                        with self._lock:
+                            stats.rate_limit_errors += 1
+                    self._observe(model, elapsed, False, attempt - 1, throttled)
+                    raise
+                hint = retry_after_seconds(exc)
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay, hint, self._rng)
+                with self._lock:
+                    stats.retries += 1
+                    stats.rate_limit_errors += int(rate_limited)
+                    if not rate_limited:
+                        stats.backoff_seconds += delay
+                print(f"   ⚠️  {'Rate-Limit' if rate_limited else 'Serverfehler'} bei {model} "
+                      f"(Versuch {attempt}/{self.max_attempts}), warte {delay:.1f}s...")
+                if rate_limited:
+                    # Bucket sperren: der nächste acquire() wartet, und parallele Aufrufer
+                    # für dasselbe Modell bremsen ebenfalls ab
+                    bucket.pause(delay)
+                else:
+                    self._sleep(delay)
+
+    def _observe(self, model: str, elapsed: float, ok: bool, retries: int, throttled: float, result=None) -> None:
+        if self.metrics is None:
+            return
+        self.metrics.record(
+            "gemini", model, elapsed, ok,
+            bytes=response_bytes(result) if result is not None else 0,
+            retries=retries, throttled_seconds=round(throttled, 3),
+        )
+
+    def stats(self) -> dict[str, ThrottleStats]:
+        with self._lock:
+            return {model: ThrottleStats(**vars(s)) for model, s in self._stats.items()}
+
+    def stats_summary(self) -> str:
+        parts = []
+        for model, s in sorted(self.stats().items()):
+            parts.append(
+                f"{model}: {s.calls} Aufrufe, {s.retries} Wiederholungen, "
+                f"{s.throttled_seconds + s.backoff_seconds:.1f}s gedrosselt"
+            )
+        return "; ".join(parts) or "keine Aufrufe"
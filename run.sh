@@ -9,12 +9,23 @@ NC='\033[0m'
 
 # 1. PARAMETER (Thema optional; wenn leer -> Trends) und Hilfe
 if [ "$1" = "--help" ] || [ "$1" = "-h" ]; then
-    echo "Nutzung: ./run.sh [Thema]"
+    echo "Nutzung: ./run.sh [--resume] [Thema]"
+    echo "         ./run.sh [--resume] --batch themen.txt [--workers N]"
+    echo "         ./run.sh --serve [--workers N]   (Daemon, Aufträge per podcast_generator.py --enqueue)"
     echo "Beispiel: ./run.sh \"Schwarze Löcher\""
     echo "Ohne Thema wird der aktuelle Top-Trend aus Google Trends (Deutschland) genutzt."
+    echo "Im Batch-Modus wird eine Themenliste (eine Zeile pro Thema) ohne Rückfrage abgearbeitet."
+    echo "--resume übernimmt unveränderte Stufen aus dem letzten Lauf (Temp-Ordner bleibt erhalten)."
     exit 0
 fi
 
+# --resume: Checkpoints im Temp-Ordner behalten und an Python durchreichen
+RESUME_ARGS=()
+if [ "$1" = "--resume" ]; then
+    RESUME_ARGS=(--resume)
+    shift
+fi
+
 TOPIC="$1"
 SCRIPT_FILE="podcast_generator.py"
 ENV_FILE=".env"
@@ -67,10 +78,12 @@ then
     echo -e "${YELLOW}Hinweis: 'audioop' fehlt in ${PYTHON_BIN}. Wir installieren 'audioop-lts' über requirements.txt.${NC}"
 fi
 
-# 3c. Ordner sicherstellen; Temp leeren, Output behalten
+# 3c. Ordner sicherstellen; Temp leeren (Cache-Ordner behalten), Output behalten
 mkdir -p "$PODCAST_TEMP_DIR" "$PODCAST_OUTPUT_DIR"
-echo -e "${YELLOW}Leere $PODCAST_TEMP_DIR...${NC}"
-find "$PODCAST_TEMP_DIR" -mindepth 1 -delete
+if [ ${#RESUME_ARGS[@]} -eq 0 ]; then
+    echo -e "${YELLOW}Leere $PODCAST_TEMP_DIR...${NC}"
+    find "$PODCAST_TEMP_DIR" -mindepth 1 -not -path "$PODCAST_TEMP_DIR/cache" -not -path "$PODCAST_TEMP_DIR/cache/*" -delete
+fi
 
 # 4. VIRTUAL ENVIRONMENT (.venv) SETUP
 if [ ! -d ".venv" ]; then
@@ -99,11 +112,22 @@ else
 fi
 
 # 6. PROGRAMM STARTEN
-echo -e "\n${GREEN}🚀 Starte $PODCAST_NAME Generator mit Thema: '$TOPIC'${NC}"
-echo "------------------------------------------------"
+if [ "$1" = "--batch" ]; then
+    echo -e "\n${GREEN}🚀 Starte $PODCAST_NAME Generator im Batch-Modus (${2:-?})${NC}"
+    echo "------------------------------------------------"
+    python3 "$SCRIPT_FILE" "${RESUME_ARGS[@]}" "$@"
+elif [ "$1" = "--serve" ]; then
+    echo -e "\n${GREEN}🚀 Starte $PODCAST_NAME Generator als Daemon${NC}"
+    echo "------------------------------------------------"
+    # exec: SIGTERM (z.B. von systemd) erreicht direkt den Python-Prozess
+    exec python3 "$SCRIPT_FILE" "$@"
+else
+    echo -e "\n${GREEN}🚀 Starte $PODCAST_NAME Generator mit Thema: '$TOPIC'${NC}"
+    echo "------------------------------------------------"
 
-# Wir pipen das Thema direkt in das Python-Skript, da dieses 'input()' verwendet.
-echo "$TOPIC" | python3 "$SCRIPT_FILE"
+    # Wir pipen das Thema direkt in das Python-Skript, da dieses 'input()' verwendet.
+    echo "$TOPIC" | python3 "$SCRIPT_FILE" "${RESUME_ARGS[@]}"
+fi
 
 # Deaktivieren (optional, da Skript hier endet)
 deactivate
\ No newline at end of file
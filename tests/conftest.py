@@ -1,7 +1,105 @@
+import json
+import re
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
+import pytest
+
 # Stellt sicher, dass das Projekt-Root für lokale Module importierbar ist
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+class FakeFreesound:
+    """Lokaler Ersatz für die Freesound-API (Suche, Details mit ETag, MP3-Previews)."""
+
+    def __init__(self):
+        self.requests = []  # (Pfad, Header-Dict) je Anfrage
+        self.connections = set()  # Client-Ports = genutzte TCP-Verbindungen
+        self.fail_next = 0  # so viele Anfragen mit 503 beantworten
+        self.sounds = {
+            42: {"id": 42, "name": "Calm Loop", "tags": ["calm", "loop"], "duration": 120.0},
+        }
+        self.preview = bytes(range(256)) * 1024  # 256 KiB Pseudo-MP3
+        self.server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/apiv2"
+
+    def count(self, prefix: str) -> int:
+        return sum(1 for path, _ in self.requests if path.startswith(prefix))
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-Alive, damit Verbindungswiederverwendung messbar ist
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                fake.requests.append((path, dict(self.headers)))
+                fake.connections.add(self.client_address[1])
+                if fake.fail_next:
+                    fake.fail_next -= 1
+                    return self._send(503)
+                if path == "/apiv2/search/text/":
+                    results = [{"id": s["id"], "name": s["name"]} for s in fake.sounds.values()]
+                    return self._send(200, json.dumps({"results": results}).encode())
+                match = re.fullmatch(r"/apiv2/sounds/(\d+)/", path)
+                if match and int(match.group(1)) in fake.sounds:
+                    etag = f'"sound-{match.group(1)}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        return self._send(304, headers={"ETag": etag})
+                    body = dict(fake.sounds[int(match.group(1))])
+                    host, port = self.server.server_address[:2]
+                    body["previews"] = {"preview-hq-mp3": f"http://{host}:{port}/previews/{match.group(1)}.mp3"}
+                    return self._send(200, json.dumps(body).encode(), {"ETag": etag})
+                if path.startswith("/previews/"):
+                    return self._send(200, fake.preview, {"Content-Type": "audio/mpeg"})
+                return self._send(404)
+
+        return Handler
+
+
+@pytest.fixture(scope="session")
+def pg(tmp_path_factory):
+    """podcast_generator mit Benchmark-Umgebung; ohne Caches und Messdatei. Backends tauschen die Tests selbst aus."""
+    sys.path.insert(0, str(ROOT / "benchmarks"))
+    from fakes import env_for
+
+    env = env_for(str(tmp_path_factory.mktemp("generator"))) | {
+        "PODCAST_METRICS_FILE": "", "PODCAST_TTS_CACHE_MB": "0", "PODCAST_LLM_CACHE_MB": "0",
+    }
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in env.items():
+            mp.setenv(name, value)
+        import podcast_generator
+
+        yield podcast_generator
+
+
+@pytest.fixture
+def freesound_server():
+    fake = FakeFreesound()
+    fake.server = ThreadingHTTPServer(("127.0.0.1", 0), fake.handler())
+    thread = threading.Thread(target=fake.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield fake
+    fake.server.shutdown()
+    fake.server.server_close()
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from audio_engine import PcmAssembler, VoiceMusicMixer, mix_with_pydub, read_wav_pcm, segment_to_pcm
+
+pydub = pytest.importorskip("pydub")
+
+
+def _tone(ms: int, freq: float, rate: int = 24000) -> np.ndarray:
+    t = np.arange(int(rate * ms / 1000)) / rate
+    return (np.sin(2 * np.pi * freq * t) * 8000).astype(np.int16).reshape(-1, 1)
+
+
+def _segment(pcm: np.ndarray, rate: int = 24000):
+    return pydub.AudioSegment(data=pcm.tobytes(), sample_width=2, frame_rate=rate, channels=1)
+
+
+def test_assembler_matches_pydub_crossfade(tmp_path):
+    parts = [_tone(400, 220), _tone(300, 330), _tone(500, 440)]
+    expected = _segment(parts[0])
+    for part in parts[1:]:
+        expected = expected.append(_segment(part), crossfade=100)
+
+    path = str(tmp_path / "voice.wav")
+    with PcmAssembler(path, crossfade_ms=100) as asm:
+        for part in parts:
+            asm.add(part)
+
+    pcm, rate = read_wav_pcm(path)
+    ref = segment_to_pcm(expected)
+    assert rate == 24000
+    assert pcm.shape == ref.shape
+    # pydub blendet in Millisekunden-Stufen, wir pro Sample: kleine Abweichung erlaubt
+    assert np.max(np.abs(pcm.astype(np.int32) - ref.astype(np.int32))) < 200
+
+
+def test_assembler_handles_segments_shorter_than_crossfade(tmp_path):
+    path = str(tmp_path / "voice.wav")
+    asm = PcmAssembler(path, crossfade_ms=100)
+    asm.add(_tone(50, 220))
+    asm.add(_tone(30, 330))
+    asm.add(_tone(200, 440))
+    duration_ms = asm.close()
+    pcm, _ = read_wav_pcm(path)
+    assert len(pcm) == asm.frames
+    assert duration_ms == pytest.approx(len(pcm) / 24)
+
+
+def test_segment_to_pcm_resamples_to_target_format():
+    seg = _segment(_tone(100, 220, rate=48000), rate=48000)
+    pcm = segment_to_pcm(seg)
+    assert pcm.dtype == np.int16
+    assert pcm.shape[1] == 1
+    assert abs(len(pcm) - 2400) <= 1
+
+
+def test_numpy_mixer_matches_pydub_mix():
+    voice = _tone(3000, 300)
+    music = _tone(700, 110)
+    expected = mix_with_pydub(_segment(voice), _segment(music))
+
+    mixer = VoiceMusicMixer(voice, 24000, music, 24000)
+    mixed = mixer.render()
+    ref = segment_to_pcm(expected)
+    assert mixed.shape == ref.shape
+    # pydub rechnet Gain und Fade stufenweise, daher kleine Toleranz
+    assert np.max(np.abs(mixed.astype(np.int32) - ref.astype(np.int32))) < 300
+
+
+def test_numpy_mixer_resamples_voice_to_stereo_music_rate():
+    voice = _tone(1000, 300)
+    music = np.repeat(_tone(500, 110, rate=48000), 2, axis=1)
+    mixer = VoiceMusicMixer(voice, 24000, music, 48000)
+    mixed = mixer.render()
+    assert mixer.sample_rate == 48000
+    assert mixed.shape == (48000 + 96000, 2)
+    assert np.array_equal(mixed[:, 0], mixed[:, 1])
+    # Ende ist komplett ausgeblendet
+    assert np.abs(mixed[-10:]).max() <= 1
+
+
+def test_numpy_mixer_without_music_passes_voice_through(tmp_path):
+    voice = _tone(500, 300)
+    mixer = VoiceMusicMixer(voice, 24000)
+    path = str(tmp_path / "mix.wav")
+    mixer.write_wav(path)
+    pcm, rate = read_wav_pcm(path)
+    assert rate == 24000
+    assert np.array_equal(pcm, voice)
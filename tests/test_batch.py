@@ -0,0 +1,53 @@
+import io
+import json
+import os
+import sys
+
+
+def fake_episode(topic: str, resume: bool = False, defer_metadata: bool = False) -> dict:
+    """Ersatz für ``run_episode`` im Pool-Worker: legt nur den Episodenordner an."""
+    import podcast_generator  # im Worker schon geladen (geforkt aus dem Test mit ``pg``)
+
+    if "kaputt" in topic:
+        raise RuntimeError(f"{topic} abgestürzt")
+    bot = podcast_generator.PodcastGenerator(topic)
+    with open(os.path.join(bot.temp_dir, "owner.txt"), "w", encoding="utf-8") as f:
+        f.write(topic)
+    return {
+        "topic": topic, "status": "ok", "error": None, "temp_dir": bot.temp_dir, "pid": os.getpid(),
+        # Der vom Elternprozess geerbte genai-Client muss im Worker verworfen sein
+        "inherited_client": podcast_generator.client._client is not None,
+    }
+
+
+def test_read_topics_skips_comments_blanks_and_duplicates(pg, tmp_path, monkeypatch):
+    source = tmp_path / "themen.txt"
+    source.write_text("# Woche 12\nKI im Alltag\n\n  Quantencomputer  \nKI im Alltag\n", encoding="utf-8")
+    assert pg._read_topics(str(source)) == ["KI im Alltag", "Quantencomputer"]
+    monkeypatch.setattr(sys, "stdin", io.StringIO("Mars\n#aus\nMars\nVenus\n"))
+    assert pg._read_topics("-") == ["Mars", "Venus"]
+
+
+def test_run_batch_isolates_failures_and_episode_dirs(pg, tmp_path, monkeypatch):
+    monkeypatch.setattr(pg, "run_episode", fake_episode)
+    # Wie nach warm_model_cache: der Elternprozess hält schon einen Client
+    monkeypatch.setattr(pg.client, "client", object())
+    topics = ["Mars", "Venus kaputt", "Jupiter", "Saturn"]
+    reports = pg.run_batch(topics, workers=2, llm_slots=1, tts_slots=1, ffmpeg_slots=1)
+
+    assert [r["topic"] for r in reports] == topics
+    assert [r["status"] for r in reports] == ["ok", "error", "ok", "ok"]
+    assert reports[1]["error"] == "RuntimeError: Venus kaputt abgestürzt"
+    ok = [r for r in reports if r["status"] == "ok"]
+    assert all(r["pid"] != os.getpid() for r in ok)
+    assert not any(r["inherited_client"] for r in ok)
+    assert len({r["temp_dir"] for r in ok}) == 3
+    for r in ok:
+        with open(os.path.join(r["temp_dir"], "owner.txt"), encoding="utf-8") as f:
+            assert f.read() == r["topic"]
+
+    monkeypatch.setattr(pg, "OUTPUT_DIR", str(tmp_path))
+    with open(pg._write_batch_report(reports, started_at=0), encoding="utf-8") as f:
+        summary = json.load(f)
+    assert (summary["episodes"], summary["succeeded"], summary["failed"]) == (4, 3, 1)
+    assert summary["reports"] == reports
@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from cache import DiskCache, ResponseCache, config_fingerprint, make_key
+
+
+def test_make_key_is_stable_and_separates_parts():
+    assert make_key("a", "b") == make_key("a", "b")
+    assert make_key("ab", "c") != make_key("a", "bc")
+
+
+def test_disk_cache_roundtrip_and_stats(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = make_key("text", "voice")
+    assert cache.get(key) is None
+    cache.set(key, b"pcm")
+    assert cache.get(key) == b"pcm"
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.writes) == (1, 1, 1)
+
+
+def test_disk_cache_get_first_counts_one_lookup(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    assert cache.get_first(["gemini", "gcloud"]) == (None, None)
+    cache.set("gcloud", b"pcm")
+    assert cache.get_first(["gemini", "gcloud"]) == ("gcloud", b"pcm")
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=20)
+    cache.set("old", b"x" * 8)
+    cache.set("used", b"y" * 8)
+    past = time.time() - 100
+    os.utime(cache._path("old"), (past, past))
+    os.utime(cache._path("used"), (past - 50, past - 50))
+    cache.get("used")  # macht "used" zum zuletzt genutzten Eintrag
+    cache.set("new", b"z" * 8)
+    assert cache.get("old") is None
+    assert cache.get("used") == b"y" * 8
+    assert cache.stats.evictions == 1
+
+
+def test_disk_cache_ttl_expires_entries(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=60)
+    cache.set("k", b"v")
+    past = time.time() - 120
+    os.utime(cache._path("k"), (past, past))
+    assert cache.get("k") is None
+    assert cache.age("k") is None
+
+
+def test_response_cache_keys_on_model_prompt_and_config(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.set("gemini-2.5-flash", "Prompt", None, "Antwort")
+    assert cache.get("gemini-2.5-flash", "Prompt") == "Antwort"
+    assert cache.get("gemini-2.0-flash", "Prompt") is None
+    assert cache.get("gemini-2.5-flash", "Prompt!") is None
+    assert cache.get("gemini-2.5-flash", "Prompt", {"temperature": 0}) is None
+    cache.set("gemini-2.5-flash", "Prompt", {"temperature": 0, "top_p": 1}, "kühl")
+    assert cache.get("gemini-2.5-flash", "Prompt", {"top_p": 1, "temperature": 0}) == "kühl"
+    cache.set("gemini-2.5-flash", "Leer", None, "")
+    assert cache.get("gemini-2.5-flash", "Leer") is None  # leere Antworten werden nicht gespeichert
+
+
+def test_response_cache_bypass_refreshes_entries(tmp_path):
+    ResponseCache(str(tmp_path)).set("m", "p", None, "alt")
+    bypass = ResponseCache(str(tmp_path), bypass=True)
+    assert bypass.get("m", "p") is None
+    bypass.set("m", "p", None, "neu")
+    assert ResponseCache(str(tmp_path)).get("m", "p") == "neu"
+
+
+def test_config_fingerprint_uses_pydantic_dump():
+    class Config:
+        def model_dump_json(self, exclude_none):
+            return '{"temperature":0.2}'
+
+    assert config_fingerprint(None) == ""
+    assert config_fingerprint(Config()) == '{"temperature":0.2}'
+
+
+def test_malformed_metadata_is_not_cached_and_retried(pg, tmp_path, monkeypatch):
+    answers = ["Leider kein JSON", json.dumps({"title": "Mondnacht", "description": "Alles über den Mond."})]
+    calls = []
+
+    def generate_content(model, contents, config=None):
+        calls.append(model)
+        return SimpleNamespace(text=answers[min(len(calls), len(answers)) - 1])
+
+    monkeypatch.setattr(pg, "llm_cache", ResponseCache(str(tmp_path / "llm")))
+    monkeypatch.setattr(pg.client, "client", SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    monkeypatch.setattr(pg, "pick_available_model", lambda preferences: "gemini-2.5-flash")
+    bot = pg.PodcastGenerator("Mond")
+    bot.script_content = "Der Mond ist schön."
+
+    assert bot._generate_episode_metadata() == pg._fallback_metadata("Mond", bot.script_content)
+    assert bot._generate_episode_metadata() == ("Mondnacht", "Alles über den Mond.")
+    assert bot._generate_episode_metadata() == ("Mondnacht", "Alles über den Mond.")
+    assert len(calls) == 2  # der dritte Aufruf kommt aus dem Cache
@@ -0,0 +1,86 @@
+import os
+from types import SimpleNamespace
+
+from checkpoint import Checkpoint, StageState, file_digest
+
+
+def test_lookup_requires_same_inputs_and_unchanged_files(tmp_path):
+    out = tmp_path / "voice.wav"
+    out.write_bytes(b"audio")
+    manifest = str(tmp_path / "manifest.json")
+    state = StageState(inputs=("script",), outputs=("voice",), output_files=("voice",))
+    owner = SimpleNamespace(script="Hallo", voice=str(out))
+
+    cp = Checkpoint(manifest)
+    key = cp.inputs_key("voice", state, owner)
+    assert cp.lookup("voice", key) is None
+    assert cp.record("voice", key, {"voice": owner.voice}, [owner.voice])
+
+    # Neue Instanz liest das Manifest von der Platte
+    cp = Checkpoint(manifest)
+    assert cp.lookup("voice", key) == {"voice": str(out)}
+    owner.script = "Hallo Welt"
+    assert cp.lookup("voice", cp.inputs_key("voice", state, owner)) is None
+
+    out.write_bytes(b"other audio")
+    assert cp.lookup("voice", key) is None
+    out.unlink()
+    assert cp.lookup("voice", key) is None
+
+
+def test_input_file_contents_change_the_key(tmp_path):
+    src = tmp_path / "music.mp3"
+    src.write_bytes(b"a")
+    state = StageState(input_files=("music",), settings=("numpy",))
+    owner = SimpleNamespace(music=str(src))
+    cp = Checkpoint(str(tmp_path / "manifest.json"))
+    first = cp.inputs_key("mix", state, owner)
+    assert cp.inputs_key("mix", StageState(input_files=("music",), settings=("pydub",)), owner) != first
+    src.write_bytes(b"bb")
+    assert cp.inputs_key("mix", state, owner) != first
+    assert cp.digest(str(src)) == file_digest(str(src))
+    assert cp.digest(str(tmp_path / "missing")) is None
+
+
+def test_record_skips_incomplete_stage_and_reset_clears(tmp_path):
+    cp = Checkpoint(str(tmp_path / "manifest.json"))
+    assert not cp.record("video", "k", {}, [str(tmp_path / "missing.mp4")])
+    assert cp.record("script", "k", {"script": "x"}, [])
+    assert cp.stages() == ["script"]
+    cp.reset()
+    assert Checkpoint(str(tmp_path / "manifest.json")).stages() == []
+
+
+def test_resume_skips_finished_stages_of_previous_run(pg):
+    calls = []
+
+    def stages(bot, script):
+        def generate_script():
+            calls.append("generate_script")
+            bot.script_content, bot.sources = script, ["https://example.org"]
+
+        def generate_voice():
+            calls.append("generate_voice")
+            bot.audio_voice_path = os.path.join(bot.temp_dir, "voice_raw.wav")
+            with open(bot.audio_voice_path, "wb") as f:
+                f.write(bot.script_content.encode())
+
+        bot.checkpointed("generate_script", generate_script)()
+        bot.checkpointed("generate_voice", generate_voice)()
+
+    stages(pg.PodcastGenerator("Fortsetzen"), "Hallo")
+    assert calls == ["generate_script", "generate_voice"]
+
+    # Neustart mit --resume: beide Stufen kommen aus dem Manifest, die Ergebnisse sind wieder gesetzt
+    calls.clear()
+    bot = pg.PodcastGenerator("Fortsetzen", resume=True)
+    stages(bot, "anderes Skript")
+    assert calls == []
+    assert (bot.script_content, bot.sources) == ("Hallo", ["https://example.org"])
+    assert bot.audio_voice_path.endswith("voice_raw.wav")
+
+    # Geänderte Ausgabedatei: nur die Stimme läuft erneut
+    with open(bot.audio_voice_path, "wb") as f:
+        f.write(b"kaputt")
+    stages(pg.PodcastGenerator("Fortsetzen", resume=True), "anderes Skript")
+    assert calls == ["generate_voice"]
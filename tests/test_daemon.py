@@ -0,0 +1,34 @@
+import sqlite3
+
+from jobs import JobQueue
+
+
+def test_serve_always_finishes_jobs(pg, tmp_path, monkeypatch):
+    def fake_episode(topic, resume=False):
+        if topic == "Venus":
+            raise RuntimeError("Venus kaputt")
+        # Nicht als JSON speicherbar: der volle Bericht scheitert, der schlanke geht durch
+        files = {"audio": object()} if topic == "Saturn" else {}
+        return {"topic": topic, "status": "ok", "error": None, "duration_s": 0.1, "files": files}
+
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    finish = queue.finish
+    locked = []
+
+    def flaky_finish(job_id, report):
+        # Erster Abschluss trifft auf eine gesperrte Datenbank
+        if not locked:
+            locked.append(job_id)
+            raise sqlite3.OperationalError("database is locked")
+        finish(job_id, report)
+
+    monkeypatch.setattr(queue, "finish", flaky_finish)
+    monkeypatch.setattr(pg, "run_episode", fake_episode)
+    ids = {topic: queue.submit(topic) for topic in ("Mars", "Venus", "Saturn")}
+    pg.serve(queue, workers=1, llm_slots=1, tts_slots=1, ffmpeg_slots=1, poll=0.05, drain=True)
+
+    assert locked == [ids["Mars"]]
+    assert queue.counts() == {"queued": 0, "running": 0, "ok": 2, "error": 1}
+    assert queue.get(ids["Venus"]).error == "RuntimeError: Venus kaputt"
+    assert queue.get(ids["Saturn"]).report == {"topic": "Saturn", "status": "ok", "error": None, "duration_s": 0.1}
+    assert queue.get(ids["Mars"]).status == "ok"
@@ -0,0 +1,48 @@
+import os
+
+from freesound import FreesoundClient
+
+
+def _client(server, tmp_path, **kwargs):
+    kwargs.setdefault("backoff", 0)
+    return FreesoundClient("token", base_url=server.base_url, cache_dir=str(tmp_path / "details"), **kwargs)
+
+
+def test_search_and_streaming_download(freesound_server, tmp_path):
+    client = _client(freesound_server, tmp_path)
+    results = client.search("calm", filter="duration:[60 TO 300]")
+    assert results[0]["id"] == 42
+    details = client.sound(42)
+    target = tmp_path / "track.mp3"
+    written = client.download(details["previews"]["preview-hq-mp3"], str(target), chunk_size=4096)
+    assert written == len(freesound_server.preview)
+    assert target.read_bytes() == freesound_server.preview
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_sound_details_are_requested_conditionally(freesound_server, tmp_path):
+    first = _client(freesound_server, tmp_path).sound(42)
+    # Neuer Client (z.B. nächster Lauf) mit demselben Cache-Ordner
+    second = _client(freesound_server, tmp_path).sound(42)
+    assert second == first
+    _, headers = freesound_server.requests[-1]
+    assert headers.get("If-None-Match") == '"sound-42"'
+
+
+def test_transient_errors_are_retried(freesound_server, tmp_path):
+    freesound_server.fail_next = 2
+    client = _client(freesound_server, tmp_path, retries=3)
+    assert client.search("calm")
+    assert freesound_server.count("/apiv2/search/text/") == 3
+
+
+def test_session_is_reused_across_requests(freesound_server, tmp_path):
+    client = _client(freesound_server, tmp_path)
+    session = client.session
+    client.search("calm")
+    client.sound(42)
+    client.search("loop")
+    assert client.session is session
+    assert len(freesound_server.connections) == 1  # Keep-Alive statt neuer Verbindung je Anfrage
+    client.close()
+    assert client.session is not session
@@ -0,0 +1,63 @@
+import threading
+
+from jobs import JobQueue
+
+
+def test_jobs_are_claimed_in_order_and_finished_with_report(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    first = queue.submit("Mond")
+    second = queue.submit("Mars", resume=True)
+
+    job = queue.claim()
+    assert (job.id, job.topic, job.status, job.resume) == (first, "Mond", "running", False)
+    queue.finish(job.id, {"status": "ok", "error": None, "duration_s": 1.5})
+
+    job = queue.claim()
+    assert (job.id, job.resume) == (second, True)
+    queue.finish(job.id, {"status": "error", "error": "RuntimeError: kaputt"})
+    assert queue.claim() is None
+
+    assert queue.get(first).report["duration_s"] == 1.5
+    assert queue.get(second).error == "RuntimeError: kaputt"
+    assert queue.counts() == {"queued": 0, "running": 0, "ok": 1, "error": 1}
+    assert [j.id for j in queue.jobs(status="ok")] == [first]
+
+
+def test_same_topic_is_not_claimed_twice_concurrently(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.submit("Mond")
+    queue.submit("Mond")
+    queue.submit("Mars")
+    assert queue.claim().topic == "Mond"
+    assert queue.claim().topic == "Mars"
+    assert queue.claim() is None
+
+
+def test_requeue_running_after_crash(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    JobQueue(path).submit("Mond")
+    assert JobQueue(path).claim().topic == "Mond"
+
+    restarted = JobQueue(path)
+    assert restarted.requeue_running() == 1
+    job = restarted.claim()
+    assert job.topic == "Mond"
+    assert job.status == "running"
+
+
+def test_parallel_claims_hand_out_each_job_once(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    ids = {queue.submit(f"Thema {i}") for i in range(20)}
+    claimed, lock = [], threading.Lock()
+
+    def worker():
+        while (job := queue.claim()) is not None:
+            with lock:
+                claimed.append(job.id)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == sorted(ids)
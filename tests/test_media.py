@@ -0,0 +1,71 @@
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from media import build_pcm_encode_cmd, build_video_cmd, encode_pcm, find_cover, prepare_cover
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg nicht installiert")
+
+
+def test_find_cover_prefers_png(tmp_path):
+    assert find_cover(str(tmp_path)) is None
+    (tmp_path / "cover.jpg").write_bytes(b"jpg")
+    assert find_cover(str(tmp_path)).endswith("cover.jpg")
+    (tmp_path / "cover.png").write_bytes(b"png")
+    assert find_cover(str(tmp_path)).endswith("cover.png")
+
+
+def test_pcm_encode_cmd_reads_stdin_once_and_writes_all_outputs():
+    cmd = build_pcm_encode_cmd(44100, 2, "out.mp3", video_path="out.mp4", cover_image="cover.png")
+    assert cmd.count("-i") == 2
+    assert cmd[cmd.index("-f") + 1] == "s16le"
+    assert "pipe:0" in cmd
+    assert cmd.index("out.mp3") < cmd.index("out.mp4")
+    assert "libmp3lame" in cmd and "aac" in cmd
+
+
+def test_video_cmd_can_copy_existing_aac():
+    cmd = build_video_cmd("cover.png", "audio.m4a", "out.mp4", copy_audio=True)
+    assert cmd[cmd.index("-c:a") + 1] == "copy"
+    assert "-b:a" not in cmd
+
+
+def test_fast_video_cmd_uses_low_framerate_and_fast_preset():
+    cmd = build_video_cmd("cover.png", "audio.m4a", "out.mp4", fast=True)
+    assert cmd[cmd.index("-framerate") + 1] == "1"
+    assert cmd.index("-framerate") < cmd.index("cover.png")
+    assert cmd[cmd.index("-preset") + 1] == "ultrafast"
+    assert "-preset" not in build_video_cmd("cover.png", "audio.m4a", "out.mp4")
+
+
+@needs_ffmpeg
+def test_prepare_cover_scales_once_and_caches(tmp_path):
+    cover = tmp_path / "cover.ppm"
+    cover.write_bytes(b"P6 64 33 255\n" + bytes(64 * 33 * 3))
+    scaled = prepare_cover(str(cover), str(tmp_path / "cache"), width=32)
+    assert scaled != str(cover)
+    assert open(scaled, "rb").read(4) == b"\x89PNG"
+    assert prepare_cover(str(cover), str(tmp_path / "cache"), width=32) == scaled
+
+
+@needs_ffmpeg
+def test_encode_pcm_produces_mp3_and_video(tmp_path):
+    t = np.arange(24000) / 24000
+    block = (np.sin(2 * np.pi * 220 * t) * 5000).astype(np.int16).reshape(-1, 1)
+    cover = tmp_path / "cover.ppm"
+    cover.write_bytes(b"P6 16 16 255\n" + bytes(16 * 16 * 3))  # kleines Testbild statt 2048px-Cover
+    mp3, mp4 = str(tmp_path / "a.mp3"), str(tmp_path / "v.mp4")
+    cmd = build_pcm_encode_cmd(24000, 1, mp3, video_path=mp4, cover_image=str(cover))
+    encode_pcm([block, block], cmd)
+    assert os.path.getsize(mp3) > 0
+    assert os.path.getsize(mp4) > 0
+
+
+@needs_ffmpeg
+def test_encode_pcm_raises_on_ffmpeg_error(tmp_path):
+    cmd = build_pcm_encode_cmd(24000, 1, str(tmp_path / "missing" / "a.mp3"))
+    with pytest.raises(subprocess.CalledProcessError):
+        encode_pcm([np.zeros((100, 1), dtype=np.int16)], cmd)
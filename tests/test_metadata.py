@@ -0,0 +1,84 @@
+import json
+import re
+
+from metadata import (
+    CONDENSED_MAX_CHARS, TITLE_MAX_CHARS, build_batch_prompt, condense_transcript, parse_batch_response,
+    validate_metadata,
+)
+
+
+def test_condense_transcript_keeps_first_sentence_per_paragraph():
+    text = "Willkommen zur Folge. Heute geht es um den Mond.\n\nDer Mond ist alt. Sehr alt.\n\n\nTschüss! Bis bald."
+    assert condense_transcript(text) == "Willkommen zur Folge. Der Mond ist alt. Tschüss!"
+
+
+def test_condense_transcript_respects_limit():
+    text = "\n\n".join(f"Absatz {i} erzählt sehr ausführlich von vielen spannenden Dingen. Rest." for i in range(100))
+    assert len(condense_transcript(text)) <= CONDENSED_MAX_CHARS + 2
+
+
+def test_batch_prompt_lists_every_episode():
+    prompt = build_batch_prompt("Pod", "Slogan", [(1, "Mond", "Kurz."), (3, "Mars", "Rot.")])
+    assert "JSON" in prompt
+    assert "Episode 1: Mond\nTranskript (gekürzt): Kurz." in prompt
+    assert "Episode 3: Mars" in prompt
+    assert "Episode 2" not in prompt
+
+
+def test_validate_metadata():
+    assert validate_metadata({"title": " „Mond“ ", "description": " Text. "}) == ("Mond", "Text.")
+    assert validate_metadata({"title": "#Mond", "description": "Text."}) is None
+    assert validate_metadata({"title": "Mond", "description": ""}) is None
+    assert validate_metadata({"title": "Mond"}) is None
+    assert validate_metadata("Mond") is None
+    assert len(validate_metadata({"title": "x" * 500, "description": "Text."})[0]) == TITLE_MAX_CHARS
+
+
+def test_parse_batch_response_returns_only_failed_ids():
+    raw = json.dumps([
+        {"id": 1, "title": "Mond", "description": "Über den Mond."},
+        {"id": 2, "title": "", "description": "Leer."},
+        {"id": 9, "title": "Fremd", "description": "Nicht angefragt."},
+        {"id": "4", "title": "Venus", "description": "Heiß."},
+    ])
+    valid, failed = parse_batch_response(raw, [1, 2, 3, 4])
+    assert valid == {1: ("Mond", "Über den Mond."), 4: ("Venus", "Heiß.")}
+    assert failed == [2, 3]
+
+
+def test_parse_batch_response_tolerates_wrappers_and_junk():
+    item = {"id": 1, "title": "Mond", "description": "Text."}
+    assert parse_batch_response(json.dumps({"episodes": [item]}), [1]) == ({1: ("Mond", "Text.")}, [])
+    assert parse_batch_response("Hier ist das JSON:\n" + json.dumps([item]) + "\nViel Spaß", [1])[1] == []
+    assert parse_batch_response("kein JSON", [1, 2]) == ({}, [1, 2])
+    assert parse_batch_response("", [1]) == ({}, [1])
+
+
+def test_generate_metadata_batch_retries_only_invalid_items(pg, monkeypatch):
+    prompts = []
+    # Erste Runde: 2 ohne Titel, 3 fehlt, 5 mit Beschreibung als Zahl; zweite Runde: 2 und 3 gültig, 5 wieder kaputt
+    answers = {
+        1: {"title": "Titel 1", "description": "Text 1."},
+        2: {"title": "", "description": "Text 2."},
+        4: {"title": "Titel 4", "description": "Text 4."},
+        5: {"title": "Titel 5", "description": 5},
+    }
+
+    def fake_generate_text(model, contents, config=None, validate=None):
+        ids = [int(n) for n in re.findall(r"^Episode (\d+):", contents, re.MULTILINE)]
+        prompts.append(ids)
+        items = [{"id": i, **answers[i]} for i in ids if i in answers]
+        if len(prompts) == 2:
+            answers.update({2: {"title": "Titel 2", "description": "Text 2."},
+                            3: {"title": "Titel 3", "description": "Text 3."}})
+        return json.dumps(items)
+
+    monkeypatch.setattr(pg, "generate_text", fake_generate_text)
+    monkeypatch.setattr(pg, "pick_available_model", lambda models: models[0])
+    episodes = [(f"Thema {i}", f"Skript {i}. Mehr Text.") for i in range(1, 6)]
+    result = pg.generate_metadata_batch(episodes, batch_size=3, attempts=2)
+
+    assert prompts == [[1, 2, 3], [4, 5], [2, 3, 5]]
+    assert result[:4] == [("Titel 1", "Text 1."), ("Titel 2", "Text 2."), ("Titel 3", "Text 3."),
+                          ("Titel 4", "Text 4.")]
+    assert result[4] == pg._fallback_metadata(*episodes[4])
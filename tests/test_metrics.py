@@ -0,0 +1,117 @@
+import json
+import multiprocessing
+
+import pytest
+
+from metrics import Metrics, read_events, summarize, write_prometheus
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_span_records_duration_bytes_and_errors(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "metrics.jsonl"
+    metrics = Metrics(str(path), clock=clock)
+
+    with metrics.span("ffmpeg", "encode_pcm", episode="x") as span:
+        clock.now += 1.5
+        span["bytes"] = 1000
+    with pytest.raises(RuntimeError):
+        with metrics.span("ffmpeg", "encode_pcm"):
+            clock.now += 0.5
+            raise RuntimeError("kaputt")
+
+    events = read_events(str(path))
+    assert [e["ok"] for e in events] == [True, False]
+    assert events[0]["episode"] == "x" and events[0]["bytes"] == 1000 and events[0]["seconds"] == 1.5
+    assert events[0]["peak_rss_bytes"] >= 0
+    totals = metrics.totals()[("ffmpeg", "encode_pcm")]
+    assert (totals.count, totals.errors, totals.seconds, totals.max_seconds) == (2, 1, 2.0, 1.5)
+    assert summarize(events) == metrics.totals()
+
+
+def test_timed_wraps_function_and_read_events_filters_by_time(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    metrics = Metrics(str(path))
+    assert metrics.timed("stage", "mix", lambda x: x * 2)(21) == 42
+    assert read_events(str(path), since=0)[0]["name"] == "mix"
+    assert read_events(str(path), since=4102444800) == []  # Jahr 2100
+    assert read_events(str(tmp_path / "missing.jsonl")) == []
+
+
+def test_jsonl_sink_rotates_and_read_events_includes_previous_file(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    metrics = Metrics(str(path), max_bytes=1000)
+    for i in range(20):
+        metrics.record("stage", f"s{i}", 0.1)
+    assert path.stat().st_size <= 1000
+    assert (tmp_path / "metrics.jsonl.1").stat().st_size <= 1000 + 400
+    names = [e["name"] for e in read_events(str(path))]
+    assert names == sorted(names, key=lambda n: int(n[1:])) and names[-1] == "s19"
+    assert metrics.totals()[("stage", "s0")].count == 1
+
+
+def test_rotation_happens_once_when_workers_cross_the_limit_together(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    writer = Metrics(str(path))
+    for i in range(10):
+        writer.record("stage", f"s{i}", 0.1)
+    first, second = Metrics(str(path), max_bytes=1000), Metrics(str(path), max_bytes=1000)
+    first._rotate()
+    # Der zweite Worker hat die alte Größe gesehen und rotiert danach: die Historie bleibt in .1
+    second._rotate()
+    assert len(read_events(str(path))) == 10
+
+
+def _record_many(path: str, max_bytes: int, worker: int) -> None:
+    metrics = Metrics(path, max_bytes=max_bytes)
+    for i in range(25):
+        metrics.record("stage", f"w{worker}-{i}", 0.1)
+
+
+def test_parallel_workers_keep_all_events_across_one_rotation(tmp_path):
+    path = str(tmp_path / "metrics.jsonl")
+    line = len(json.dumps(Metrics().record("stage", "w0-00", 0.1), ensure_ascii=False)) + 1
+    # 100 Zeilen, Grenze bei ~60: genau eine Rotation, es darf kein Ereignis verloren gehen
+    procs = [multiprocessing.get_context("fork").Process(target=_record_many, args=(path, 60 * line, w))
+             for w in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert len(read_events(path)) == 100
+
+
+def test_prometheus_text_format(tmp_path):
+    metrics = Metrics()
+    metrics.record("gemini", 'model "x"', 0.25, bytes=10, retries=2)
+    out = write_prometheus(metrics.totals(), str(tmp_path / "podcast.prom"), peak_rss=123)
+    text = open(out, encoding="utf-8").read()
+    assert '# TYPE podcast_calls_total counter' in text
+    assert 'podcast_call_retries_total{kind="gemini",name="model \\"x\\""} 2' in text
+    assert 'podcast_call_bytes_total{kind="gemini",name="model \\"x\\""} 10' in text
+    assert text.rstrip().endswith("podcast_peak_rss_bytes 123")
+    assert '# TYPE podcast_call_latency_seconds histogram' in text
+    assert 'podcast_call_latency_seconds_bucket{kind="gemini",name="model \\"x\\"",le="0.1"} 0' in text
+    assert 'podcast_call_latency_seconds_bucket{kind="gemini",name="model \\"x\\"",le="0.25"} 1' in text
+    assert 'podcast_call_latency_seconds_bucket{kind="gemini",name="model \\"x\\"",le="+Inf"} 1' in text
+    assert 'podcast_call_latency_seconds_count{kind="gemini",name="model \\"x\\""} 1' in text
+
+
+def test_latency_histogram_quantiles():
+    metrics = Metrics()
+    assert metrics.quantile("tts", "gemini", 0.5) == (None, 0)
+    for seconds in [0.8] * 90 + [3.0] * 9 + [20.0]:
+        metrics.record("tts", "gemini", seconds)
+    median, count = metrics.quantile("tts", "gemini", 0.5)
+    assert count == 100 and 0.5 < median <= 0.8
+    p95, _ = metrics.quantile("tts", "gemini", 0.95)
+    assert 2.0 < p95 <= 4.0  # Auflösung = Bucket-Grenzen
+    assert metrics.quantile("tts", "gemini", 1.0)[0] == 20.0
+    assert metrics.totals()[("tts", "gemini")].buckets[4] == 90  # 0.5 < 0.8 <= 1.0
@@ -0,0 +1,71 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from cache import DiskCache
+
+
+class FakeModels:
+    def __init__(self, names):
+        self.names = names
+        self.calls = 0
+
+    def list(self):
+        self.calls += 1
+        return [SimpleNamespace(name=f"models/{name}") for name in self.names]
+
+
+@pytest.fixture
+def models(pg, tmp_path, monkeypatch):
+    """Leere Modell-Caches, Fake-Client und eine verstellbare Uhr für den Speicher-Cache."""
+    fake = FakeModels(["gemini-2.5-flash", "gemini-2.5-pro-preview-tts", "text-embedding-004"])
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(pg, "_model_cache", DiskCache(str(tmp_path / "models"), ttl=pg.MODEL_CACHE_TTL, suffix=".json"))
+    monkeypatch.setattr(pg, "_model_memo", None)
+    monkeypatch.setattr(pg, "_model_clock", lambda: clock.now)
+    monkeypatch.setattr(pg.client, "client", SimpleNamespace(models=fake))
+    return SimpleNamespace(fake=fake, clock=clock)
+
+
+def _backdate(pg, seconds):
+    path = pg._model_cache._path(pg._MODEL_CACHE_KEY)
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_model_list_is_filtered_and_reused_within_ttl(pg, models):
+    assert pg.get_candidate_models() == [("gemini-2.5-flash", "models/gemini-2.5-flash")]
+    models.clock.now += pg.MODEL_CACHE_TTL - 1
+    assert pg.get_candidate_models() == [("gemini-2.5-flash", "models/gemini-2.5-flash")]
+    assert models.fake.calls == 1
+    assert pg.model_cache_age() == pg.MODEL_CACHE_TTL - 1
+
+
+def test_model_list_is_fetched_again_after_ttl(pg, models):
+    pg.get_candidate_models()
+    models.fake.names = ["gemini-3-pro-preview"]
+    models.clock.now += pg.MODEL_CACHE_TTL + 1
+    _backdate(pg, pg.MODEL_CACHE_TTL + 1)
+    assert pg.get_candidate_models() == [("gemini-3-pro-preview", "models/gemini-3-pro-preview")]
+    assert models.fake.calls == 2
+
+
+def test_cold_start_reads_disk_cache(pg, models, monkeypatch):
+    pg.get_candidate_models()
+    _backdate(pg, 60)
+    # Neuer Prozess: Speicher leer, Plattencache noch frisch
+    monkeypatch.setattr(pg, "_model_memo", None)
+    assert pg.get_candidate_models() == [("gemini-2.5-flash", "models/gemini-2.5-flash")]
+    assert models.fake.calls == 1
+    assert 59 <= pg.model_cache_age() <= 62
+
+
+def test_forced_refresh_bypasses_both_caches(pg, models):
+    pg.get_candidate_models()
+    models.fake.names = ["gemini-2.0-flash"]
+    assert pg.refresh_model_cache() == [("gemini-2.0-flash", "models/gemini-2.0-flash")]
+    assert models.fake.calls == 2
+    assert pg.get_candidate_models() == [("gemini-2.0-flash", "models/gemini-2.0-flash")]
+    assert pg.model_cache_age() == 0
@@ -0,0 +1,99 @@
+import threading
+
+import numpy as np
+
+from audio_engine import normalize_loudness, read_wav_pcm
+from music_library import MusicLibrary
+
+
+def _add(library, tmp_path, track_id, **kwargs):
+    src = tmp_path / f"download_{track_id}.mp3"
+    src.write_bytes(b"mp3")
+    return library.add(track_id, str(src), **kwargs)
+
+
+def test_find_matches_tags_and_previous_queries(tmp_path):
+    library = MusicLibrary(str(tmp_path / "lib"))
+    _add(library, tmp_path, 1, name="Calm Piano", tags=["piano", "calm", "ambient"], query="background space")
+    _add(library, tmp_path, 2, name="Lofi Beat", tags=["lofi", "study", "chill"], query="lofi study loop")
+
+    assert library.find("background space")["id"] == 1
+    assert library.find("background calm piano")["id"] == 1
+    assert library.find("lofi study loop")["id"] == 2
+    assert library.find("background football stadium") is None
+
+
+def test_index_persists_and_records_queries(tmp_path):
+    library = MusicLibrary(str(tmp_path / "lib"))
+    _add(library, tmp_path, 7, name="Drums", tags=["drums"], duration=90.0, query="background drums")
+    library.record_query(7, "background percussion")
+
+    reopened = MusicLibrary(str(tmp_path / "lib"))
+    entry = reopened.find("background percussion")
+    assert entry["id"] == 7
+    assert entry["duration"] == 90.0
+    assert entry["queries"] == ["background drums", "background percussion"]
+
+
+def test_concurrent_instances_do_not_lose_index_updates(tmp_path):
+    # Wie im Daemon: jede Episode (Thread) hat ihre eigene Bibliothek auf denselben Ordner
+    def worker(n):
+        library = MusicLibrary(str(tmp_path / "lib"))
+        for i in range(10):
+            _add(library, tmp_path, n * 100 + i, tags=["ambient"], query=f"query {n} {i}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(MusicLibrary(str(tmp_path / "lib")).entries()) == 40
+    assert not list((tmp_path / "lib").glob("*.tmp"))
+
+
+def test_entries_without_file_are_ignored(tmp_path):
+    library = MusicLibrary(str(tmp_path / "lib"))
+    _add(library, tmp_path, 3, tags=["jazz"], query="background jazz")
+    (tmp_path / "lib" / "3.mp3").unlink()
+    assert library.find("background jazz") is None
+
+
+def test_ensure_pcm_decodes_once_and_normalizes(tmp_path):
+    library = MusicLibrary(str(tmp_path / "lib"))
+    entry = _add(library, tmp_path, 5, tags=["ambient"])
+    calls = []
+
+    def decode(path):
+        calls.append(path)
+        return (np.full((1000, 2), 100, dtype=np.int16), 44100)
+
+    path = library.ensure_pcm(entry, decode, normalize_loudness)
+    assert library.ensure_pcm(entry, decode, normalize_loudness) == path
+    assert len(calls) == 1
+    pcm, rate = read_wav_pcm(path)
+    assert rate == 44100
+    assert pcm.shape == (1000, 2)
+    rms_dbfs = 20 * np.log10(np.sqrt(np.mean(pcm.astype(np.float64) ** 2)) / 32768)
+    assert abs(rms_dbfs - (-14.0)) < 0.1
+
+
+def test_normalize_loudness_respects_peak_limit():
+    pcm = np.zeros((1000, 1), dtype=np.int16)
+    pcm[0] = 1000  # ein einzelner Ausreißer begrenzt die Verstärkung
+    out = normalize_loudness(pcm)
+    assert np.max(np.abs(out)) <= int(32768 * 10 ** (-1 / 20)) + 1
+
+
+def test_local_fallback_loop_is_normalized_like_library_tracks(pg, tmp_path, monkeypatch):
+    local = tmp_path / "background_loop.mp3"
+    local.write_bytes(b"mp3")
+    quiet = np.full((1000, 2), 100, dtype=np.int16)
+    monkeypatch.setattr(pg, "_decode_music", lambda path: (quiet, 44100))
+    bot = pg.PodcastGenerator("Lokaler Loop")
+    bot.music_path = str(local)
+
+    pcm, rate = bot._music_pcm()
+    assert rate == 44100
+    assert np.array_equal(pcm, normalize_loudness(quiet))
+    bot.music_path = None
+    assert bot._music_pcm() == (None, None)
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import Feed, Pipeline, Stage
+
+
+def test_pipeline_respects_dependencies_and_overlaps_independent_stages():
+    order = []
+    lock = threading.Lock()
+
+    def stage(name, delay=0.05):
+        def fn():
+            with lock:
+                order.append(f"start:{name}")
+            time.sleep(delay)
+            with lock:
+                order.append(f"end:{name}")
+        return fn
+
+    stages = [
+        Stage("script", stage("script")),
+        Stage("music", stage("music", 0.2)),
+        Stage("voice", stage("voice"), deps=("script",)),
+        Stage("mix", stage("mix"), deps=("voice", "music")),
+    ]
+    start = time.perf_counter()
+    timings = Pipeline(stages, log=lambda msg: None).run()
+    elapsed = time.perf_counter() - start
+
+    assert set(timings) == {"script", "music", "voice", "mix"}
+    assert order.index("start:voice") > order.index("end:script")
+    assert order.index("start:mix") > max(order.index("end:voice"), order.index("end:music"))
+    # music (0.2s) läuft parallel zu script+voice (0.1s): deutlich unter der Summe von 0.35s
+    assert elapsed < 0.33
+
+
+def test_pipeline_stops_scheduling_after_failure():
+    ran = []
+
+    def boom():
+        raise RuntimeError("kaputt")
+
+    stages = [
+        Stage("a", boom),
+        Stage("b", lambda: ran.append("b"), deps=("a",)),
+    ]
+    pipeline = Pipeline(stages, log=lambda msg: None)
+    with pytest.raises(RuntimeError, match="kaputt"):
+        pipeline.run()
+    assert ran == []
+    assert pipeline.timings == {}
+
+
+def test_pipeline_uses_slot_guard():
+    entered = []
+
+    class Guard:
+        def __init__(self, name):
+            self.name = name
+
+        def __enter__(self):
+            entered.append(self.name)
+
+        def __exit__(self, *exc):
+            return False
+
+    Pipeline([Stage("a", lambda: None, slot="llm"), Stage("b", lambda: None)], slot_guard=Guard,
+             log=lambda msg: None).run()
+    assert entered == ["llm"]
+
+
+def test_pipeline_rejects_cycles_and_unknown_deps():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", lambda: None, deps=("b",)), Stage("b", lambda: None, deps=("a",))])
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", lambda: None, deps=("x",))])
+
+
+def test_feed_hands_items_to_consumer_while_producer_runs():
+    feed = Feed()
+    received = []
+
+    def consume():
+        for item in feed:
+            received.append(item)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    feed.put("a")
+    deadline = time.monotonic() + 1
+    while not received and time.monotonic() < deadline:
+        time.sleep(0.005)
+    # "a" kommt an, während der Produzent noch läuft
+    assert received == ["a"]
+    feed.put("b")
+    feed.close()
+    consumer.join(timeout=1)
+    assert received == ["a", "b"]
+    assert list(feed) == []
+    with pytest.raises(RuntimeError):
+        feed.put("c")
+
+
+def test_feed_reraises_producer_error():
+    feed = Feed()
+    feed.put(1)
+    feed.close(ValueError("kaputt"))
+    items = []
+    with pytest.raises(RuntimeError) as exc:
+        for item in feed:
+            items.append(item)
+    assert items == [1]
+    assert isinstance(exc.value.__cause__, ValueError)
@@ -0,0 +1,210 @@
+import random
+import time
+
+import pytest
+
+from metrics import Metrics
+from rate_limit import (
+    Cooldown, RateLimitedClient, TokenBucket, backoff_delay, is_quota_exhausted, is_rate_limit_error,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeModels:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def generate_content_stream(self, model, contents, config=None):
+        # Wie das SDK: ein Generator, der Fehler erst beim ersten next() wirft
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        yield from outcome
+
+    def list(self):
+        return iter(["models/gemini-2.0-flash"])
+
+
+class FakeClient:
+    def __init__(self, outcomes=()):
+        self.models = FakeModels(outcomes)
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_token_bucket_default_burst_is_rpm():
+    clock = FakeClock()
+    bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(4)] == [0, 0, 0, 0]
+    assert clock.sleeps == []
+
+
+def test_is_rate_limit_error_ignores_words_containing_rate():
+    assert is_rate_limit_error(Exception("429 RESOURCE_EXHAUSTED"))
+    assert is_rate_limit_error(Exception("Rate limit exceeded"))
+    assert is_rate_limit_error(Exception("Too Many Requests"))
+    assert not is_rate_limit_error(Exception("Could not generate content"))
+    assert not is_rate_limit_error(Exception("separate accurate error"))
+    assert not is_rate_limit_error(Exception("took 14290 ms"))
+
+
+def test_is_quota_exhausted_only_for_daily_quota():
+    assert is_quota_exhausted(Exception(
+        "429 RESOURCE_EXHAUSTED. Quota exceeded, quotaId: GenerateRequestsPerDayPerProjectPerModel"))
+    assert not is_quota_exhausted(Exception(
+        "429 RESOURCE_EXHAUSTED. Quota exceeded, quotaId: GenerateRequestsPerMinutePerProjectPerModel"))
+    assert not is_quota_exhausted(Exception("daily report failed"))
+
+
+def test_token_bucket_pause_blocks_next_acquire():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=5, clock=clock, sleep=clock.sleep)
+    bucket.pause(10)
+    assert bucket.acquire() == pytest.approx(10.0)
+
+
+def test_cooldown_blocks_until_expiry_and_honours_server_hint():
+    clock = FakeClock()
+    cooldown = Cooldown(60, clock=clock)
+    assert not cooldown.active
+    assert cooldown.trip() == 60
+    clock.now = 59
+    assert cooldown.active
+    clock.now = 61
+    assert not cooldown.active
+    assert cooldown.trip(Exception("429 RESOURCE_EXHAUSTED. Please retry in 300s.")) == 300
+    cooldown.trip()  # kürzere Sperre verkürzt nicht
+    assert cooldown.remaining() == 300
+
+
+def test_retry_after_seconds_reads_server_hint():
+    assert retry_after_seconds(Exception("429 RESOURCE_EXHAUSTED. Please retry in 17.5s.")) == 17.5
+    assert retry_after_seconds(Exception("{'retryDelay': '23s'}")) == 23.0
+    assert retry_after_seconds(Exception("boom")) is None
+
+
+def test_backoff_delay_respects_hint_and_cap():
+    rng = random.Random(0)
+    assert 30 <= backoff_delay(1, hint=30, rng=rng) <= 31
+    assert backoff_delay(10, base=2, cap=8, rng=rng) <= 8
+
+
+def test_client_retries_rate_limit_and_records_stats():
+    clock = FakeClock()
+    fake = FakeClient([Exception("429 RESOURCE_EXHAUSTED, retry in 5s"), "ok"])
+    client = RateLimitedClient(fake, default_rpm=600, sleep=clock.sleep, clock=clock, rng=random.Random(0))
+    assert client.models.generate_content(model="gemini-2.0-flash", contents="hi") == "ok"
+    assert fake.models.calls == 2
+    stats = client.stats()["gemini-2.0-flash"]
+    assert stats.retries == 1
+    assert stats.rate_limit_errors == 1
+    assert stats.throttled_seconds >= 5
+
+
+def test_stream_retries_rate_limit_on_first_chunk():
+    clock = FakeClock()
+    metrics = Metrics()
+    fake = FakeClient([Exception("429 RESOURCE_EXHAUSTED"), ["Hallo ", "Welt"]])
+    client = RateLimitedClient(fake, default_rpm=600, sleep=clock.sleep, clock=clock, rng=random.Random(0),
+                               metrics=metrics)
+    stream = client.models.generate_content_stream(model="gemini-2.0-flash", contents="hi")
+    assert list(stream) == ["Hallo ", "Welt"]
+    assert fake.models.calls == 2
+    assert client.stats()["gemini-2.0-flash"].retries == 1
+    totals = metrics.totals()[("gemini", "gemini-2.0-flash")]
+    assert (totals.count, totals.errors, totals.retries) == (1, 0, 1)
+
+
+def test_latency_excludes_bucket_wait_and_on_request_fires_after_it():
+    metrics = Metrics()
+    client = RateLimitedClient(FakeClient(["a", "b"]), default_rpm=300, burst=1, metrics=metrics)
+    sent = []
+    with client.on_request(lambda: sent.append(time.perf_counter())):
+        start = time.perf_counter()
+        client.models.generate_content(model="tts-model", contents="1")
+        client.models.generate_content(model="tts-model", contents="2")
+    assert sent[1] - start >= 0.19  # zweites Token erst nach 60/300 s
+    totals = metrics.totals()[("gemini", "tts-model")]
+    assert totals.max_seconds < 0.05
+
+
+def test_client_does_not_retry_non_transient_errors():
+    clock = FakeClock()
+    fake = FakeClient([ValueError("bad request")])
+    client = RateLimitedClient(fake, sleep=clock.sleep, clock=clock)
+    with pytest.raises(ValueError):
+        client.models.generate_content(model="gemini-2.0-flash", contents="hi")
+    assert fake.models.calls == 1
+
+
+def test_client_gives_up_after_max_attempts():
+    clock = FakeClock()
+    fake = FakeClient([Exception("429")] * 3)
+    client = RateLimitedClient(fake, max_attempts=3, sleep=clock.sleep, clock=clock, rng=random.Random(0))
+    with pytest.raises(Exception) as excinfo:
+        client.models.generate_content(model="tts-model", contents="hi")
+    assert is_rate_limit_error(excinfo.value)
+    assert fake.models.calls == 3
+
+
+def test_client_list_and_per_model_limits():
+    client = RateLimitedClient(FakeClient(), limits={"tts": 3}, default_rpm=60)
+    assert client.models.list() == ["models/gemini-2.0-flash"]
+    assert client._rpm_for("gemini-2.5-pro-preview-tts") == 3
+    assert client._rpm_for("gemini-2.5-pro") == 60
+
+
+def test_client_reports_calls_to_metrics():
+    clock = FakeClock()
+    metrics = Metrics()
+    fake = FakeClient([Exception("503 UNAVAILABLE"), "ok"])
+    client = RateLimitedClient(fake, max_attempts=3, sleep=clock.sleep, clock=clock, rng=random.Random(0),
+                               metrics=metrics)
+    client.models.generate_content(model="gemini-2.5-flash", contents="x")
+    totals = metrics.totals()[("gemini", "gemini-2.5-flash")]
+    assert (totals.count, totals.errors, totals.retries) == (1, 0, 1)
+
+
+def test_client_factory_runs_on_first_use_only():
+    built = []
+
+    def factory():
+        built.append(True)
+        return FakeClient(["ok", "ok"])
+
+    client = RateLimitedClient(factory=factory)
+    assert built == []
+    for _ in range(2):
+        assert client.models.generate_content(model="gemini-2.0-flash", contents="hi") == "ok"
+    assert built == [True]
+    with pytest.raises(ValueError):
+        RateLimitedClient()
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_PROBE = """
+import sys
+import podcast_generator as pg
+heavy = [m for m in ("google.genai", "google.cloud.texttospeech", "pytrends", "pandas", "requests") if m in sys.modules]
+print(",".join(heavy) or "-")
+try:
+    pg.require_config()
+except RuntimeError as exc:
+    print(exc)
+"""
+
+
+def test_import_is_lazy_and_needs_no_credentials(tmp_path):
+    env = {"PATH": os.environ.get("PATH", ""), "HOME": str(tmp_path), "PYTHONPATH": str(ROOT)}
+    proc = subprocess.run([sys.executable, "-c", _PROBE], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, check=True)
+    heavy, error = proc.stdout.strip().splitlines()
+    assert heavy == "-"
+    assert "GEMINI_API_KEY" in error
+    assert os.listdir(tmp_path) == []  # keine Ordner beim Import angelegt
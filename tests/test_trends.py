@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+from cache import make_key
+from trends import TrendsService
+
+
+class FakeTrends:
+    """Zählt Aufrufe; ``lists`` liefert je (Land, Endpunkt) Titel, eine Exception oder nichts.
+
+    ``_service`` legt pro Test eine frische Unterklasse an, damit Proben, die ein
+    vorheriger Test im Hintergrund noch beendet, nicht mitzählen.
+    """
+
+    calls: list = []
+    lists: dict = {}
+    delays: dict = {}
+    lock = threading.Lock()
+
+    def _answer(self, country, endpoint):
+        with self.lock:
+            self.calls.append((country, endpoint))
+        time.sleep(self.delays.get((country, endpoint), 0))
+        value = self.lists.get((country, endpoint), [])
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def today_searches(self, pn):
+        return pd.Series(self._answer(pn, "today"), dtype=object)
+
+    def realtime_trending_searches(self, pn, count):
+        return pd.DataFrame({"title": self._answer(pn, "realtime")})
+
+    def trending_searches(self, pn):
+        country = {"germany": "DE", "austria": "AT", "switzerland": "CH"}[pn]
+        return pd.DataFrame(self._answer(country, "legacy"))
+
+    def build_payload(self, kw_list, cat, timeframe, geo):
+        self.keyword = kw_list[0]
+
+    def related_queries(self):
+        top = self._answer(self.keyword, "related")
+        return {self.keyword: {"top": pd.DataFrame({"query": top, "value": range(len(top))}), "rising": None}}
+
+
+def _service(tmp_path, lists, delays=None, **kwargs):
+    fake = type("Fake", (FakeTrends,), {"calls": [], "lists": lists, "delays": delays or {}})
+    return TrendsService(fake, cache_dir=str(tmp_path), **kwargs), fake
+
+
+def test_top_trend_prefers_earlier_probe_even_if_later_one_is_faster(tmp_path):
+    service, fake = _service(
+        tmp_path,
+        {("DE", "today"): [], ("DE", "realtime"): ["Echtzeit DE"], ("AT", "today"): ["Wien"]},
+        delays={("DE", "realtime"): 0.1},
+        max_workers=9,
+    )
+    assert service.top_trend() == "Echtzeit DE"
+
+
+def test_top_trend_probes_concurrently(tmp_path):
+    delays = {(c, e): 0.1 for c in ("DE", "AT", "CH") for e in ("today", "realtime", "legacy")}
+    service, fake = _service(tmp_path, {("CH", "legacy"): ["Bern"]}, delays=delays, max_workers=9)
+    start = time.perf_counter()
+    assert service.top_trend() == "Bern"
+    assert time.perf_counter() - start < 0.5
+    assert len(fake.calls) == 9
+
+
+def test_top_trend_records_errors_and_returns_none(tmp_path):
+    service, fake = _service(tmp_path, {("DE", "today"): RuntimeError("429")})
+    assert service.top_trend(("DE",)) is None
+    assert "429" in service.debug["DE-today"]
+
+
+def test_trend_lists_are_shared_between_instances_until_ttl(tmp_path):
+    first, fake = _service(tmp_path, {("DE", "today"): ["KI"]})
+    assert first.trending("DE", "today") == ["KI"]
+    assert fake.calls == [("DE", "today")]
+
+    # Zweite Episode bzw. zweiter Batch-Prozess: nur Cache, kein Aufruf
+    second, fake = _service(tmp_path, {("DE", "today"): ["Anderes"]}, ttl=3600)
+    assert second.top_trend(("DE",)) == "KI"
+    assert fake.calls == []
+
+    path = os.path.join(str(tmp_path), make_key("trends", "DE", "today") + ".json")
+    past = time.time() - 7200
+    os.utime(path, (past, past))
+    assert second.top_trend(("DE",)) == "Anderes"
+
+
+def test_related_top_is_cached_and_empty_results_are_not(tmp_path):
+    service, fake = _service(tmp_path, {("Mond", "related"): ["Mondfinsternis", "Mondphase"]})
+    assert service.related_top("Mond") == ["Mondfinsternis", "Mondphase"]
+    assert service.related_top("Mond") == ["Mondfinsternis", "Mondphase"]
+    assert service.related_top("Leer") == []
+    assert service.related_top("Leer") == []
+    assert fake.calls == [("Mond", "related"), ("Leer", "related"), ("Leer", "related")]
+
+
+def test_concurrent_misses_fetch_once(tmp_path):
+    service, fake = _service(tmp_path, {("Mond", "related"): ["Mondfinsternis"]}, delays={("Mond", "related"): 0.1})
+    threads = [threading.Thread(target=service.related_top, args=("Mond",)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert fake.calls == [("Mond", "related")]
@@ -1,6 +1,19 @@
+import math
+import random
+
 import pytest
 
-from utils import _chunk_text, _spell_out_abbreviations, _strip_formatting
+import utils
+from utils import (
+    CLOUD_TTS_MAX_SSML_BYTES,
+    TextNormalizer,
+    _chunk_text,
+    _iter_paragraphs,
+    _spell_out_abbreviations,
+    _strip_formatting,
+    _to_ssml,
+    load_lexicon,
+)
 
 
 def test_strip_formatting_removes_markdown_and_asterisks():
@@ -18,6 +31,74 @@ def test_spell_out_abbreviations_respects_stoplist():
     assert _spell_out_abbreviations(text) == "DER K I Test"
 
 
+def test_spell_out_abbreviations_skips_hashtags():
+    assert _spell_out_abbreviations("#KI und KI") == "#KI und K I"
+
+
+def test_to_ssml_builds_paragraphs_sentences_and_escapes():
+    text = "Erster Satz. Zweiter & *dritter*!  \n\n  Neuer Absatz"
+    assert _to_ssml(text) == (
+        '<speak><p><s>Erster Satz.</s><s>Zweiter &amp; <emphasis level="moderate">dritter</emphasis>!</s></p>'
+        "<p><s>Neuer Absatz</s></p></speak>"
+    )
+    assert _to_ssml("  ") == "<speak></speak>"
+
+
+def test_normalizer_clean_matches_separate_passes():
+    text = "Laut [NASA](https://nasa.gov) ist *KI* (und DER Rest) [wichtig]. #KI bleibt."
+    assert TextNormalizer().clean(text) == _spell_out_abbreviations(_strip_formatting(text))
+    assert TextNormalizer().clean(text) == "Laut NASA ist K I und DER Rest wichtig. #KI bleibt."
+
+
+def test_normalizer_lexicon_replaces_whole_words_before_spelling_out():
+    normalizer = TextNormalizer({"Gemini": "Dschemini", "GPU": "Grafikkarte"})
+    assert normalizer.clean("Gemini, Geminis und GPU") == "Dschemini, Geminis und Grafikkarte"
+
+
+def test_normalizer_lexicon_output_is_not_normalized_again():
+    normalizer = TextNormalizer({"UNO": "UNO", "Bahn": "Deutsche Bahn", "AT&T": "A T & T"})
+    assert normalizer.clean("Die UNO und die Bahn") == "Die UNO und die Deutsche Bahn"
+    assert normalizer.to_ssml("UNO, Bahn und AT&T.") == (
+        "<speak><p><s>UNO, Deutsche Bahn und A T &amp; T.</s></p></speak>"
+    )
+
+
+def test_normalizer_to_ssml_in_one_pass():
+    normalizer = TextNormalizer({"Gemini": "Dschemini"})
+    ssml = normalizer.to_ssml("Hier ist [Gemini](https://x) mit *KI*. Und <mehr>.")
+    assert ssml == (
+        '<speak><p><s>Hier ist Dschemini mit <emphasis level="moderate">K I</emphasis>.</s>'
+        "<s>Und &lt;mehr&gt;.</s></p></speak>"
+    )
+
+
+def test_load_lexicon(tmp_path):
+    path = tmp_path / "lexicon.json"
+    assert load_lexicon(str(path)) == {}
+    path.write_text('{"Gemini": "Dschemini"}', encoding="utf-8")
+    assert load_lexicon(str(path)) == {"Gemini": "Dschemini"}
+    path.write_text('["Gemini"]', encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_lexicon(str(path))
+
+
+def test_iter_paragraphs_yields_paragraphs_as_soon_as_complete():
+    pieces = iter(["Erster Ab", "satz.\n", "\nZweiter", " Absatz.\n\n\n", "Rest\nQUELLEN: a; b"])
+    paragraphs = _iter_paragraphs(pieces)
+    assert next(paragraphs) == "Erster Absatz."
+    assert next(paragraphs) == "Zweiter Absatz."
+    assert list(paragraphs) == ["Rest\nQUELLEN: a; b"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_iter_paragraphs_matches_split_for_random_pieces(seed):
+    rng = random.Random(seed)
+    text = _random_text(rng, 500)
+    cuts = sorted(rng.sample(range(len(text)), 40))
+    pieces = [text[a:b] for a, b in zip([0, *cuts], [*cuts, len(text)])]
+    assert list(_iter_paragraphs(pieces)) == [p.strip() for p in text.split("\n\n") if p.strip()]
+
+
 def test_chunk_text_splits_long_paragraph():
     para = "a" * 1600
     chunks = _chunk_text(para, max_chars=1500)
@@ -30,3 +111,92 @@ def test_chunk_text_keeps_paragraphs_together_when_small():
     text = "absatz1\n\nabsatz2"
     chunks = _chunk_text(text, max_chars=50)
     assert chunks == [text]
+
+
+def _random_text(rng: random.Random, words: int) -> str:
+    vocab = ["Wort", "Straße", "KI", "&", "<Tag>", "Grüße", "x" * 40, "Forschung", "ist", "*betont*"]
+    paragraphs, sentences, sentence = [], [], []
+    for _ in range(words):
+        sentence.append(rng.choice(vocab))
+        if rng.random() < 0.08:
+            sentences.append(" ".join(sentence) + rng.choice(".?!"))
+            sentence = []
+            if rng.random() < 0.2:
+                paragraphs.append(" ".join(sentences))
+                sentences = []
+    if rng.random() < 0.3:
+        # Satz ohne Punkt, länger als jedes Limit
+        sentences.append(" ".join(rng.choice(vocab) for _ in range(400)))
+    paragraphs.append(" ".join(sentences + [" ".join(sentence)]))
+    return "\n\n".join(p for p in paragraphs if p.strip())
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_chunk_text_properties_on_random_text(seed):
+    rng = random.Random(seed)
+    text = _random_text(rng, rng.randint(200, 3000))
+    max_chars = rng.choice([200, 500, 1500])
+    max_bytes = rng.choice([None, 600, CLOUD_TTS_MAX_SSML_BYTES])
+    chunks = _chunk_text(text, max_chars=max_chars, max_ssml_bytes=max_bytes)
+
+    # Limits je Backend
+    assert all(0 < len(c) <= max_chars for c in chunks)
+    if max_bytes:
+        assert all(len(_to_ssml(c).encode("utf-8")) <= max_bytes for c in chunks)
+    # Kein Wort geht verloren oder wird zerteilt
+    assert " ".join(chunks).split() == text.split()
+    # Kleinstmögliche Anzahl: keine zwei Nachbarn ließen sich zusammenlegen
+    for a, b in zip(chunks, chunks[1:]):
+        merged = a + ("\n\n" if a + "\n\n" + b in text else " ") + b
+        assert len(merged) > max_chars or (max_bytes and len(_to_ssml(merged).encode("utf-8")) > max_bytes)
+
+
+def test_chunk_text_prefers_sentence_boundaries():
+    sentence = "Das ist ein ganz normaler Satz mit einigen Wörtern."
+    text = " ".join([sentence] * 100)
+    chunks = _chunk_text(text, max_chars=500)
+    assert all(c.endswith(".") for c in chunks)
+    assert len(chunks) == 12
+    sizes = [len(c) for c in chunks[:-1]]
+    assert max(sizes) - min(sizes) <= len(sentence) + 1
+
+
+def test_chunk_text_balances_instead_of_filling_greedily():
+    text = " ".join(["Satz mit genau zwanzig."] * 70)  # ~1680 Zeichen
+    chunks = _chunk_text(text, max_chars=1500)
+    assert len(chunks) == 2
+    assert abs(len(chunks[0]) - len(chunks[1])) <= 24
+
+
+def test_chunk_text_respects_ssml_byte_limit():
+    # Escaping bläht & auf &amp; auf: Zeichenlimit allein reicht nicht
+    text = " ".join(["& & & & & & & & & &."] * 200)
+    chunks = _chunk_text(text, max_chars=1500, max_ssml_bytes=1000)
+    assert all(len(_to_ssml(c).encode("utf-8")) <= 1000 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_chunk_text_runs_in_linear_time(monkeypatch):
+    text = _random_text(random.Random(0), 20000)
+    small, large = text[: len(text) // 8], text
+    passes, units = [], []
+    pack = utils._pack
+
+    def counting_pack(items, max_chars, max_bytes):
+        passes.append(len(items))
+        return pack(items, max_chars, max_bytes)
+
+    monkeypatch.setattr(utils, "_pack", counting_pack)
+
+    def _ops(t):
+        passes.clear()
+        _chunk_text(t, max_chars=1500, max_ssml_bytes=CLOUD_TTS_MAX_SSML_BYTES)
+        # Jeder Durchlauf fasst jede Einheit genau einmal an
+        units.append(passes[0])
+        return sum(passes)
+
+    small_ops, large_ops = _ops(small), _ops(large)
+    # Binärsuche über die Zeichengrenze: höchstens ~log2(max_chars) Durchläufe, unabhängig von der Länge
+    assert len(passes) <= math.ceil(math.log2(1500)) + 2
+    # 8-fache Länge: linear ~8x so viele Schritte, quadratisch ~64x
+    assert large_ops <= small_ops * units[1] / units[0] * 1.5
@@ -0,0 +1,220 @@
+import io
+import itertools
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from google.genai import types
+from pydub import AudioSegment
+
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fakes import FakeGenaiClient  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from rate_limit import Cooldown  # noqa: E402
+
+PER_MINUTE_429 = "429 RESOURCE_EXHAUSTED. Quota exceeded, quotaId: GenerateRequestsPerMinutePerProjectPerModel"
+PER_DAY_429 = "429 RESOURCE_EXHAUSTED. Quota exceeded, quotaId: GenerateRequestsPerDayPerProjectPerModel"
+# Konstante Samples je Backend plus Abschnittsnummer: am Segment lässt sich ablesen, welche Stimme
+# und welcher Abschnitt es ist
+MARKERS = {"gemini": 1000, "gcloud": 2000}
+
+
+def _pcm(backend: str, idx: int) -> bytes:
+    return np.full(2400, MARKERS[backend] + idx, dtype="<i2").tobytes()
+
+
+def _chunk_number(text: str) -> int:
+    return int(re.search(r"Abschnitt (\d+)", text).group(1))
+
+
+class VoiceFakes:
+    """Gemini- und Cloud-TTS-Fakes.
+
+    ``slow`` bildet Abschnittsnummern auf Gemini-Latenz in Sekunden ab, ``fail`` sind
+    Abschnitte, bei denen Gemini mit einem nicht wiederholbaren Fehler abbricht.
+    ``peak`` ist die größte Zahl gleichzeitig laufender Gemini-Anfragen.
+    """
+
+    def __init__(self, gemini_error: str | None = None, slow: dict[int, float] | None = None,
+                 fail: set[int] | None = None):
+        self.gemini_error = gemini_error
+        self.slow = slow or {}
+        self.fail = fail or set()
+        self.gemini_calls = 0
+        self.gcloud_calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.assembled: list[int] = []
+        self._lock = threading.Lock()
+        self.genai = FakeGenaiClient()
+        self.genai.audio_response = self._gemini
+        self.gcloud = SimpleNamespace(synthesize_speech=self._gcloud)
+
+    def _gemini(self, contents):
+        idx = _chunk_number(" ".join(part.text or "" for content in contents for part in content.parts))
+        with self._lock:
+            self.gemini_calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.gemini_error:
+                raise Exception(self.gemini_error)
+            time.sleep(self.slow.get(idx, 0.01))
+            if idx in self.fail:
+                raise ValueError(f"Abschnitt {idx} kaputt")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        blob = types.Blob(data=_pcm("gemini", idx), mime_type="audio/L16;rate=24000")
+        part = types.Part(inline_data=blob)
+        return SimpleNamespace(candidates=[types.Candidate(content=types.Content(parts=[part]))], text=None)
+
+    def _gcloud(self, input=None, **kwargs):
+        with self._lock:
+            self.gcloud_calls += 1
+        buf = io.BytesIO()
+        pcm = _pcm("gcloud", _chunk_number(input.ssml))
+        AudioSegment(data=pcm, sample_width=2, frame_rate=24000, channels=1).export(buf, format="wav")
+        return SimpleNamespace(audio_content=buf.getvalue())
+
+
+def _script(chunks: int) -> str:
+    # Ein langer Satz je Abschnitt (TTS_CHUNK_CHARS=400), erkennbar an "Abschnitt <n>"
+    return "\n\n".join(f"Abschnitt {i} " + "ruhiger Satz über die Welt und " * 11 + "Ende." for i in range(chunks))
+
+
+@pytest.fixture
+def voice(pg, monkeypatch):
+    """Liefert ``run(fakes, chunks)``: Sprachspur über ``generate_voice``; Ergebnis = Backend je Abschnitt."""
+    monkeypatch.setattr(pg.client, "max_attempts", 1)
+    monkeypatch.setattr(pg.client, "_buckets", {})
+    monkeypatch.setattr(pg, "TTS_CHUNK_CHARS", 400)
+    monkeypatch.setattr(pg, "gemini_tts_cooldown", Cooldown(900))
+    fresh = Metrics()
+    monkeypatch.setattr(pg, "metrics", fresh)
+    monkeypatch.setattr(pg.client, "metrics", fresh)
+
+    class RecordingAssembler(pg.PcmAssembler):
+        def add_segment(self, seg):
+            first = int(np.frombuffer(seg.raw_data[:2], dtype="<i2")[0])
+            backend = next(name for name, marker in MARKERS.items() if 0 <= first - marker < 1000)
+            used.append(backend)
+            assembled.append(first - MARKERS[backend])
+            return super().add_segment(seg)
+
+    monkeypatch.setattr(pg, "PcmAssembler", RecordingAssembler)
+    used: list[str] = []
+    assembled: list[int] = []
+    # Eigenes Thema je Lauf: ohne globalen Cache liegen die Abschnitte im Episodenordner
+    runs = itertools.count()
+
+    def run(fakes: VoiceFakes, chunks: int = 4, workers: int = 3) -> list[str]:
+        monkeypatch.setattr(pg.client, "client", fakes.genai)
+        monkeypatch.setattr(pg, "_gcloud_tts_client", lambda: fakes.gcloud)
+        used.clear()
+        assembled.clear()
+        bot = pg.PodcastGenerator(f"Stimme {next(runs)} {time.time()}")
+        bot.script_content = _script(chunks)
+        try:
+            bot.generate_voice(max_workers=workers)
+        finally:
+            fakes.assembled = list(assembled)
+        return list(used)
+
+    return run
+
+
+@pytest.fixture
+def hedging(pg, monkeypatch):
+    monkeypatch.setattr(pg, "TTS_HEDGE", True)
+    monkeypatch.setattr(pg, "TTS_HEDGE_AFTER", 0.3)
+    monkeypatch.setattr(pg, "TTS_HEDGE_POLICY", "episode")
+    monkeypatch.setattr(pg, "_HEDGE_MIN_SAMPLES", 10**6)
+
+
+def _switches(voices: list[str]) -> int:
+    return sum(a != b for a, b in zip(voices, voices[1:]))
+
+
+def test_chunks_are_assembled_in_order_with_bounded_concurrency(voice):
+    # Frühe Abschnitte sind am langsamsten, spätere werden also zuerst fertig
+    fakes = VoiceFakes(slow={0: 0.3, 1: 0.2, 2: 0.1, 4: 0.15})
+    assert voice(fakes, chunks=8, workers=3) == ["gemini"] * 8
+    assert fakes.assembled == list(range(8))
+    assert fakes.peak == 3
+
+
+def test_failed_chunk_cancels_waiting_chunks(voice):
+    fakes = VoiceFakes(fail={0}, slow={1: 0.3, 2: 0.3})
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match="Abschnitt 0"):
+        voice(fakes, chunks=10, workers=3)
+    assert time.perf_counter() - start < 1.0
+    assert fakes.gemini_calls < 10
+    assert fakes.assembled == []
+    # Laufende Anfragen enden im Hintergrund; abwarten, damit sie nicht in den nächsten Test messen
+    while fakes.in_flight:
+        time.sleep(0.05)
+    time.sleep(0.05)
+
+
+def test_per_minute_rate_limit_falls_back_without_cooldown(pg, voice):
+    fakes = VoiceFakes(gemini_error=PER_MINUTE_429)
+    assert voice(fakes) == ["gcloud"] * 4
+    assert fakes.gcloud_calls == fakes.gemini_calls == 4
+    assert not pg.gemini_tts_cooldown.active
+
+
+def test_daily_quota_trips_cooldown_for_following_episodes(pg, voice):
+    fakes = VoiceFakes(gemini_error=PER_DAY_429)
+    voice(fakes)
+    assert pg.gemini_tts_cooldown.active
+    first_gemini = fakes.gemini_calls
+    voice(fakes)
+    assert fakes.gemini_calls == first_gemini
+
+
+def test_cooldown_expiring_mid_episode_keeps_cloud_tts_for_large_chunks(pg, voice, monkeypatch):
+    now = [0.0]
+    cooldown = Cooldown(60, clock=lambda: now[0])
+    cooldown.trip()
+    monkeypatch.setattr(pg, "gemini_tts_cooldown", cooldown)
+    # Bei gesperrtem Gemini entstehen Abschnitte nach dem SSML-Limit (hier zwei Absätze je Abschnitt)
+    monkeypatch.setattr(pg, "CLOUD_TTS_MAX_SSML_BYTES", 800)
+    fakes = VoiceFakes()
+    synthesize = fakes.gcloud.synthesize_speech
+
+    def expire_after_first(**kwargs):
+        now[0] = 61.0
+        return synthesize(**kwargs)
+
+    fakes.gcloud.synthesize_speech = expire_after_first
+    assert voice(fakes, chunks=6, workers=1) == ["gcloud"] * 3
+    assert not cooldown.active
+    assert fakes.gemini_calls == 0
+
+
+def test_hedge_ignores_wait_for_own_rate_limit(pg, voice, hedging, monkeypatch):
+    # 120 RPM ohne Burst: jeder Abschnitt wartet 0,5s auf sein Token, Gemini selbst antwortet in 10ms
+    monkeypatch.setattr(pg.client, "limits", {"tts": 120})
+    monkeypatch.setattr(pg.client, "burst", 1)
+    fakes = VoiceFakes()
+    assert voice(fakes) == ["gemini"] * 4
+    assert fakes.gcloud_calls == 0
+    totals = pg.metrics.totals()[("gemini", "gemini-2.5-pro-preview-tts")]
+    assert totals.max_seconds < 0.3
+
+
+def test_episode_policy_switches_voice_at_most_once(pg, voice, hedging):
+    # Abschnitt 1 ist langsam und wird von Cloud TTS überholt; 2 und 3 sind mit Gemini längst fertig
+    fakes = VoiceFakes(slow={1: 1.0})
+    voices = voice(fakes, chunks=5)
+    assert voices == ["gemini", "gcloud", "gcloud", "gcloud", "gcloud"]
+    assert _switches(voices) == 1
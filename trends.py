@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+
+from cache import DiskCache, make_key
+
+try:
+    import fcntl
+except ImportError:  # Windows: keine Dateisperren, parallele Prozesse fragen dann ggf. doppelt
+    fcntl = None
+
+DEFAULT_COUNTRIES = ("DE", "AT", "CH")
+# Reihenfolge = Präferenz je Land: dailytrends, realtime, legacy trending_searches
+ENDPOINTS = ("today", "realtime", "legacy")
+_LEGACY_NAMES = {"DE": "germany", "AT": "austria", "CH": "switzerland"}
+
+
+def _first_column(df) -> list[str]:
+    if df is None or df.empty:
+        return []
+    column = df if getattr(df, "ndim", 2) == 1 else df.iloc[:, 0]
+    return [str(v).strip() for v in column.tolist() if str(v).strip()]
+
+
+def _realtime_titles(df) -> list[str]:
+    if df is None or df.empty:
+        return []
+    titles = []
+    for _, row in df.iterrows():
+        title = row.get("title") if "title" in df.columns else None
+        if isinstance(title, list):
+            title = title[0] if title else None
+        if not (isinstance(title, str) and title.strip()) and "entityNames" in df.columns:
+            names = row.get("entityNames")
+            title = names[0] if isinstance(names, list) and names else None
+        if isinstance(title, str) and title.strip():
+            titles.append(title.strip())
+    return titles
+
+
+class TrendsService:
+    """Google-Trends-Abfragen mit Plattencache und parallelen Proben über Länder und Endpunkte.
+
+    Trendlisten und ``related_queries`` landen als JSON mit TTL im ``cache_dir``;
+    eine Dateisperre je Schlüssel sorgt dafür, dass parallele Batch-Prozesse
+    dieselbe Liste nur einmal bei Google abfragen. Jeder Thread nutzt eine eigene
+    Sitzung aus ``client_factory`` (z.B. ``TrendReq``), da diese nicht
+    thread-sicher ist. ``debug`` enthält je Probe den Anfang der Antwort bzw. den Fehler.
+    """
+
+    def __init__(self, client_factory, cache_dir: str | None = None, ttl: float = 3600, max_workers: int = 3,
+                 metrics=None):
+        self._factory = client_factory
+        self._cache = DiskCache(cache_dir, ttl=ttl, suffix=".json") if cache_dir else None
+        self.max_workers = max(1, max_workers)
+        self.metrics = metrics
+        self.debug: dict[str, str] = {}
+        self._local = threading.local()
+
+    def _client(self):
+        if getattr(self._local, "client", None) is None:
+            self._local.client = self._factory()
+        return self._local.client
+
+    def _span(self, name: str):
+        return self.metrics.span("trends", name) if self.metrics is not None else nullcontext({})
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        if fcntl is None or self._cache is None:
+            yield
+            return
+        lock_dir = os.path.join(self._cache.directory, "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        with open(os.path.join(lock_dir, f"{key}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self, key: str) -> list[str] | None:
+        raw = self._cache.get(key) if self._cache is not None else None
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            self._cache.delete(key)
+            return None
+
+    def _cached(self, key: str, fetch) -> list[str]:
+        """Liefert die Liste aus dem Cache oder holt sie (leere Ergebnisse werden nicht gespeichert)."""
+        value = self._load(key)
+        if value is not None:
+            return value
+        with self._key_lock(key):
+            # Ein anderer Prozess kann die Liste geholt haben, während wir auf die Sperre gewartet haben
+            value = self._load(key)
+            if value is not None:
+                return value
+            value = fetch()
+            if value and self._cache is not None:
+                self._cache.set(key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+            return value
+
+    def trending(self, country: str, endpoint: str) -> list[str]:
+        """Aktuelle Trend-Titel eines Landes über einen Endpunkt (aus dem Cache, falls frisch)."""
+        def fetch() -> list[str]:
+            client = self._client()
+            with self._span(endpoint):
+                if endpoint == "today":
+                    df = client.today_searches(pn=country)
+                    titles = _first_column(df)
+                elif endpoint == "realtime":
+                    df = client.realtime_trending_searches(pn=country, count=50)
+                    titles = _realtime_titles(df)
+                else:
+                    df = client.trending_searches(pn=_LEGACY_NAMES.get(country, "germany"))
+                    titles = _first_column(df)
+            if df is not None:
+                self.debug[f"{country}-{endpoint}"] = df.head().to_string(index=False)
+            return titles
+
+        return self._cached(make_key("trends", country, endpoint), fetch)
+
+    def _probe(self, country: str, endpoint: str) -> list[str]:
+        try:
+            return self.trending(country, endpoint)
+        except Exception as err:
+            self.debug[f"{country}-{endpoint}"] = f"{endpoint} Fehler: {err}"
+            return []
+
+    def top_trend(self, countries=DEFAULT_COUNTRIES) -> str | None:
+        """Top-Trend in Präferenzreihenfolge (Land, dann Endpunkt); alle Proben laufen parallel.
+
+        Das Ergebnis steht fest, sobald die beste erfolgreiche Probe und alle davor
+        beendet sind; später eingereihte Proben werden dann nicht mehr gestartet.
+        """
+        self.debug = {}
+        probes = [(country, endpoint) for country in countries for endpoint in ENDPOINTS]
+        # Liegt die bevorzugte Liste frisch im Cache, braucht es keine einzige Probe
+        cached = self._load(make_key("trends", *probes[0])) if probes else None
+        if cached:
+            return cached[0]
+        results: list[list[str] | None] = [None] * len(probes)
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(probes)), thread_name_prefix="trends")
+        try:
+            futures = {pool.submit(self._probe, *probe): i for i, probe in enumerate(probes)}
+            pending = set(futures)
+            best = 0
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future]] = future.result()
+                while best < len(probes) and results[best] is not None:
+                    if results[best]:
+                        return results[best][0]
+                    best += 1
+            return None
+        finally:
+            # Laufende Proben enden im Hintergrund (und füllen noch den Cache), wartende entfallen
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def related_top(self, keyword: str, geo: str = "DE", timeframe: str = "today 1-m") -> list[str]:
+        """Top-Suchanfragen zu ``keyword`` (``related_queries``), gecacht wie die Trendlisten."""
+        def fetch() -> list[str]:
+            client = self._client()
+            with self._span("related_queries"):
+                client.build_payload([keyword], cat=0, timeframe=timeframe, geo=geo)
+                related = client.related_queries()
+            top = (related.get(keyword) or {}).get("top")
+            if top is None or top.empty:
+                return []
+            return [str(q) for q in top["query"].tolist()]
+
+        return self._cached(make_key("trends-related", keyword, geo, timeframe), fetch)
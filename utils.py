@@ -1,67 +1,333 @@
+import json
+import math
+import os
 import re
-from typing import List
+from typing import Iterable, Iterator, List, NamedTuple
 
 
-def _spell_out_abbreviations(text: str) -> str:
-    """Expand 2-3 letter uppercase abbreviations (e.g., KI -> K I) for TTS clarity."""
-    pattern = re.compile(r"(?<!#)\b([A-ZÄÖÜ]{2,3})\b")  # Hashtags ausnehmen
-    stoplist = {
-        "DER", "DIE", "DAS", "UND", "DEN", "DEM", "DES", "EIN", "EINE",
-        "VON", "MIT", "AUS", "IM", "IN", "AM", "BEI", "AUF", "FÜR", "AN",
-        "IST", "SIND", "ICH", "DU", "ER", "SIE", "ES", "WIR", "IHR",
-    }
+# Eingabelimits je TTS-Backend: Gemini TTS zählt Zeichen, Cloud TTS Bytes des fertigen SSML
+GEMINI_TTS_MAX_CHARS = 1500
+CLOUD_TTS_MAX_SSML_BYTES = 5000
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[\.\?!])\s+")
+_EMPHASIS_OPEN = '<emphasis level="moderate">'
+_EMPHASIS_CLOSE = "</emphasis>"
+_SSML_FRAME = len("<speak></speak>")
+_SSML_PARAGRAPH = len("<p></p>")
+_SSML_SENTENCE = len("<s></s>")
+# Mehrbytes je Sternchen: ein Paar wird zu <emphasis ...>…</emphasis>, ein einzelnes bleibt stehen
+_SSML_STAR = (len(_EMPHASIS_OPEN) + len(_EMPHASIS_CLOSE)) // 2 - 1
+
+
+DEFAULT_STOPLIST = frozenset({
+    "DER", "DIE", "DAS", "UND", "DEN", "DEM", "DES", "EIN", "EINE",
+    "VON", "MIT", "AUS", "IM", "IN", "AM", "BEI", "AUF", "FÜR", "AN",
+    "IST", "SIND", "ICH", "DU", "ER", "SIE", "ES", "WIR", "IHR",
+})
+
+# Bausteine des kombinierten Tokenizers. Jede Alternative beginnt mit einem festen Zeichen,
+# damit die Regex-Engine Text ohne Kandidaten per Zeichensatz-Vorfilter überspringt.
+_MARKUP_TOKENS = (
+    r"\[(?P<link_text>[^\]]+)\]\([^\)]+\)",  # Markdown-Link -> Text
+    r"\[\s*(?P<bracket_text>[^\]]+)\]",
+    r"\(\s*(?P<paren_text>[^\)]+)\)",
+    r"\*(?P<emph_text>[^\*\n]*)\*",
+)
+_ABBREVIATION_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÜ"
+# 2-3 Großbuchstaben als ganzes Wort; (?<![\w#].) prüft das Zeichen vor dem ersten Buchstaben (Hashtags ausnehmen)
+_ABBREVIATION_TOKENS = tuple(rf"{c}(?<![\w#].)[A-ZÄÖÜ]{{1,2}}\b" for c in _ABBREVIATION_LETTERS)
+_SENTENCE_TOKENS = (r"\.\s+", r"\?\s+", r"!\s+")
+_PARAGRAPH_TOKEN = r"\n\n\s*"
+_SSML_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+_ESCAPE_TOKENS = ("&", "<", ">")
+_ESCAPE = re.compile("|".join(_ESCAPE_TOKENS))
+
+
+def _escape_ssml(text: str) -> str:
+    return _ESCAPE.sub(lambda m: _SSML_ESCAPES[m.group()], text)
+
+
+def load_lexicon(path: str | None) -> dict[str, str]:
+    """Liest ein Aussprache-Lexikon (JSON-Objekt ``{"Wort": "Aussprache"}``); fehlt die Datei, ist es leer."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        lexicon = json.load(f)
+    if not isinstance(lexicon, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in lexicon.items()):
+        raise ValueError(f"Lexikon {path} muss ein JSON-Objekt aus Zeichenketten sein")
+    return {k: v for k, v in lexicon.items() if k}
+
+
+def _lexicon_token(word: str) -> str:
+    # Ganzes Wort: kein Wortzeichen direkt davor oder dahinter
+    return rf"{re.escape(word[0])}(?<!\w.){re.escape(word[1:])}(?!\w)"
+
 
-    def repl(match: re.Match) -> str:  # type: ignore[type-arg]
-        word = match.group(1)
-        if word in stoplist:
-            return word
-        return " ".join(list(word))
+class TextNormalizer:
+    """Bereitet Skripttext für die TTS in einem einzigen Durchlauf auf.
 
-    return pattern.sub(repl, text)
+    Ein vorkompiliertes Muster erkennt Markdown-Links, Klammern, *Betonung*,
+    Lexikon-Einträge und Abkürzungen gemeinsam. ``clean`` liefert Klartext
+    (Markup entfernt, KI -> K I, Lexikon angewandt), ``to_ssml`` erzeugt im
+    selben Durchlauf direkt SSML mit Absätzen, Sätzen, Escaping und <emphasis>.
+    Das Lexikon ersetzt ganze Wörter durch ihre Aussprache, z.B.
+    ``{"Gemini": "Dschemini"}``; es hat Vorrang vor dem Buchstabieren.
+    """
+
+    def __init__(self, lexicon: dict[str, str] | None = None, stoplist=DEFAULT_STOPLIST,
+                 markup: bool = True, spell_out: bool = True):
+        self.lexicon = dict(lexicon or {})
+        self.stoplist = frozenset(stoplist)
+        self._markup = markup
+        self._spell_out = spell_out
+        # Längste Einträge zuerst, damit "Gemini Pro" vor "Gemini" greift
+        inline = [_lexicon_token(w) for w in sorted(self.lexicon, key=len, reverse=True)]
+        inline += _MARKUP_TOKENS if markup else _MARKUP_TOKENS[-1:]
+        if spell_out:
+            inline += _ABBREVIATION_TOKENS
+        self._clean = re.compile("|".join(inline))
+        self._ssml_inline = re.compile("|".join([*inline, *_ESCAPE_TOKENS]))
+        self._ssml = re.compile("|".join([*inline, *_ESCAPE_TOKENS, *_SENTENCE_TOKENS, _PARAGRAPH_TOKEN]))
+
+    def _inline(self, match: re.Match, render, literal) -> str:  # type: ignore[type-arg]
+        """Gemeinsame Behandlung von Lexikon, Abkürzung und Markup; ``None`` für Struktur-Token.
+
+        ``render`` normalisiert Markup-Inhalt weiter, ``literal`` gibt Text unverändert
+        (nur passend escaped) aus.
+        """
+        token = match.group()
+        if token in self.lexicon:
+            # Aussprache nicht erneut normalisieren: {"UNO": "UNO"} oder {"Bahn": "Deutsche Bahn"}
+            # würden sonst endlos rekursiv ersetzt
+            return literal(self.lexicon[token])
+        first = token[0]
+        if first == "[":
+            inner = match.group("link_text") or match.group("bracket_text")
+        elif first == "(":
+            inner = match.group("paren_text")
+        elif first == "*":
+            return None
+        elif first in _ABBREVIATION_LETTERS:
+            return token if token in self.stoplist else " ".join(token)
+        else:
+            return None
+        return render(inner)
+
+    def _clean_token(self, match: re.Match) -> str:  # type: ignore[type-arg]
+        result = self._inline(match, self.clean, str)
+        if result is not None:
+            return result
+        # Betonung: Sternchen entfernen; ohne Markup-Bereinigung bleiben sie stehen
+        inner = self.clean(match.group("emph_text"))
+        return inner if self._markup else f"*{inner}*"
+
+    def _render_inline_ssml(self, text: str) -> str:
+        return self._ssml_inline.sub(self._ssml_token, text)
+
+    def _ssml_token(self, match: re.Match) -> str:  # type: ignore[type-arg]
+        result = self._inline(match, self._render_inline_ssml, _escape_ssml)
+        if result is not None:
+            return result
+        token = match.group()
+        if token[0] == "*":
+            inner = match.group("emph_text")
+            if not inner.strip():
+                return ""
+            # Innerhalb der Betonung keine Satztrennung, damit die Tags sauber verschachtelt bleiben
+            return f"{_EMPHASIS_OPEN}{self._render_inline_ssml(inner)}{_EMPHASIS_CLOSE}"
+        return _SSML_ESCAPES[token]
+
+    def clean(self, text: str) -> str:
+        """Klartext für Gemini TTS und Transkript."""
+        return self._clean.sub(self._clean_token, text)
+
+    def to_ssml(self, text: str) -> str:
+        """SSML für Cloud TTS: <p> je Absatz, <s> je Satz, *Wort* als <emphasis>."""
+        text = text.strip()
+        if not text:
+            return "<speak></speak>"
+        # Wir verpacken Paragraphen in <p> (natürliche Pausen), Sätze in <s> (Intonation)
+        parts = ["<speak><p><s>"]
+        pos = 0
+        for match in self._ssml.finditer(text):
+            token = match.group()
+            first = token[0]
+            if first == "\n" or (first in ".?!" and token[1:].isspace()):
+                plain = text[pos:match.start()]
+                if first == "\n":
+                    parts.append(plain.rstrip())
+                    parts.append("</s></p><p><s>")
+                else:
+                    parts.append(plain + first)
+                    parts.append("</s></p><p><s>" if "\n\n" in token else "</s><s>")
+            else:
+                parts.append(text[pos:match.start()])
+                parts.append(self._ssml_token(match))
+            pos = match.end()
+        parts.append(text[pos:])
+        parts.append("</s></p></speak>")
+        return "".join(parts)
+
+
+_STRIP_MARKUP = TextNormalizer(spell_out=False)
+_SPELL_OUT = TextNormalizer(markup=False)
+_SSML_ONLY = TextNormalizer(markup=False, spell_out=False)
+
+
+def _spell_out_abbreviations(text: str) -> str:
+    """Expand 2-3 letter uppercase abbreviations (e.g., KI -> K I) for TTS clarity."""
+    return _SPELL_OUT.clean(text)
 
 
 def _strip_formatting(text: str) -> str:
     """Entfernt Markdown-Formatierungen und Sternchen-Betonung."""
-    text = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", text)  # Markdown-Link -> Text
-    text = re.sub(r"\[\s*([^\]]+)\s*\]", r"\1", text)
-    text = re.sub(r"\(\s*([^\)]+)\s*\)", r"\1", text)
-    text = re.sub(r"\*(.*?)\*", r"\1", text)
-    return text
-
-
-def _chunk_text(text: str, max_chars: int = 1500) -> List[str]:
-    """Zerteilt Text nach Absätzen, damit TTS-Limits eingehalten werden."""
-    paragraphs = [p for p in text.split("\n\n") if p.strip()]
-    chunks = []
-    current: List[str] = []
-    current_len = 0
-
-    for para in paragraphs:
-        para_len = len(para)
-        # Wenn ein einzelner Paragraph zu lang ist, teilen wir ihn in Stücke
-        if para_len > max_chars:
-            if current:
-                chunks.append("\n\n".join(current))
-                current = []
-                current_len = 0
-
-            start = 0
-            while start < para_len:
-                end = start + max_chars
-                chunks.append(para[start:end])
-                start = end
+    return _STRIP_MARKUP.clean(text)
+
+
+def _to_ssml(text: str) -> str:
+    """Baut SSML aus Klarschrift und wandelt *Wort* in <emphasis> um."""
+    return _SSML_ONLY.to_ssml(text)
+
+
+def _iter_paragraphs(pieces: Iterable[str]) -> Iterator[str]:
+    """Setzt gestreamte Textstücke zu Absätzen zusammen und liefert jeden, sobald er komplett ist.
+
+    Ein Absatz gilt als komplett, wenn nach ihm eine Leerzeile ("\n\n") ankommt;
+    der Rest folgt am Ende des Streams. Leere Absätze entfallen.
+    """
+    buffer = ""
+    for piece in pieces:
+        if not piece:
             continue
+        # Nur ab dem Ende des alten Puffers suchen ("\n" + "\n" kann über die Stückgrenze reichen)
+        start = max(0, len(buffer) - 1)
+        buffer += piece
+        cut = buffer.find("\n\n", start)
+        if cut < 0:
+            continue
+        *complete, buffer = buffer.split("\n\n")
+        for para in complete:
+            if para.strip():
+                yield para.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _ssml_text_bytes(text: str) -> int:
+    """Obergrenze der SSML-Bytes von ``text`` ohne Tags (Escaping und Betonung eingerechnet)."""
+    return (len(text.encode("utf-8")) + 4 * text.count("&") + 3 * (text.count("<") + text.count(">"))
+            + _SSML_STAR * text.count("*"))
+
+
+class _Unit(NamedTuple):
+    sep: str            # Trenner zum Vorgänger: "\n\n" (Absatz), " " oder "" (Teil eines zerlegten Worts)
+    text: str
+    opens_sentence: bool
+    ssml_bytes: int
+
+    def chars(self, first: bool) -> int:
+        return len(self.text) if first else len(self.sep) + len(self.text)
 
-        if current_len + para_len + 2 <= max_chars:
-            current.append(para)
-            current_len += para_len + 2
+    def bytes(self, first: bool) -> int:
+        cost = self.ssml_bytes
+        if first or self.opens_sentence:
+            cost += _SSML_SENTENCE
         else:
-            if current:
-                chunks.append("\n\n".join(current))
-            current = [para]
-            current_len = para_len
+            cost += len(self.sep)
+        if first or self.sep == "\n\n":
+            cost += _SSML_PARAGRAPH
+        return cost
 
-    if current:
-        chunks.append("\n\n".join(current))
 
-    return chunks
\ No newline at end of file
+def _slice_word(word: str, max_chars: int, max_bytes: float) -> List[str]:
+    """Zerlegt ein einzelnes überlanges Wort in gleich große Stücke (letzter Ausweg)."""
+    pieces = max(math.ceil(len(word) / max_chars), math.ceil(_ssml_text_bytes(word) / max_bytes))
+    size = math.ceil(len(word) / pieces)
+    result, start = [], 0
+    while start < len(word):
+        end = min(start + size, len(word))
+        while end - start > 1 and _ssml_text_bytes(word[start:end]) > max_bytes:
+            end = start + max(1, (end - start) * int(max_bytes) // _ssml_text_bytes(word[start:end]))
+        result.append(word[start:end])
+        start = end
+    return result
+
+
+def _split_units(text: str, max_chars: int, max_bytes: float) -> List[_Unit]:
+    """Zerlegt Text in Sätze; nur Sätze über dem Limit werden in Wörter aufgelöst."""
+    single_chars = max_chars
+    single_bytes = max_bytes - _SSML_FRAME - _SSML_PARAGRAPH - _SSML_SENTENCE
+    units: List[_Unit] = []
+    for para in text.split("\n\n"):
+        sep = "\n\n"
+        for sent in _SENTENCE_SPLIT.split(para.strip()):
+            if not sent:
+                continue
+            sent_bytes = _ssml_text_bytes(sent)
+            if len(sent) <= single_chars and sent_bytes <= single_bytes:
+                units.append(_Unit(sep, sent, True, sent_bytes))
+                sep = " "
+                continue
+            # Überlanger Satz: an Wortgrenzen trennen, nur notfalls mitten im Wort
+            opens = True
+            for word in sent.split():
+                word_bytes = _ssml_text_bytes(word)
+                if len(word) <= single_chars and word_bytes <= single_bytes:
+                    units.append(_Unit(sep, word, opens, word_bytes))
+                else:
+                    for i, piece in enumerate(_slice_word(word, single_chars, single_bytes)):
+                        units.append(_Unit(sep if i == 0 else "", piece, opens and i == 0, _ssml_text_bytes(piece)))
+                sep, opens = " ", False
+            sep = " "
+    return units
+
+
+def _pack(units: List[_Unit], max_chars: float, max_bytes: float) -> List[int]:
+    """Startindizes der Abschnitte beim gierigen Auffüllen bis an die Limits (ein Durchlauf)."""
+    starts = [0]
+    chars, nbytes = units[0].chars(True), _SSML_FRAME + units[0].bytes(True)
+    for i in range(1, len(units)):
+        unit = units[i]
+        add_chars, add_bytes = unit.chars(False), unit.bytes(False)
+        if chars + add_chars <= max_chars and nbytes + add_bytes <= max_bytes:
+            chars += add_chars
+            nbytes += add_bytes
+        else:
+            starts.append(i)
+            chars, nbytes = unit.chars(True), _SSML_FRAME + unit.bytes(True)
+    return starts
+
+
+def _chunk_text(text: str, max_chars: int = GEMINI_TTS_MAX_CHARS, max_ssml_bytes: int | None = None) -> List[str]:
+    """Zerteilt Text an Satzgrenzen in möglichst gleich große Abschnitte für die TTS.
+
+    Jeder Abschnitt hat höchstens ``max_chars`` Zeichen und ergibt mit
+    ``max_ssml_bytes`` gesetzt höchstens so viele Bytes SSML (nach ``_to_ssml``).
+    Die Anzahl der Abschnitte ist die kleinstmögliche; innerhalb davon wird der
+    längste Abschnitt so kurz wie möglich gehalten, damit parallele Synthese
+    gleichmäßig ausgelastet ist. Nur Sätze über dem Limit werden an Wortgrenzen
+    getrennt, einzelne überlange Wörter notfalls hart.
+
+    Laufzeit: linear in der Textlänge; die Suche nach der kleinsten Abschnittslänge
+    braucht ~log2(max_chars) Durchläufe über die Sätze.
+    """
+    max_bytes = max_ssml_bytes if max_ssml_bytes is not None else math.inf
+    units = _split_units(text, max_chars, max_bytes)
+    if not units:
+        return []
+
+    count = len(_pack(units, max_chars, max_bytes))
+    # Kleinste Zeichengrenze, bei der die Anzahl der Abschnitte gleich bleibt
+    lo, hi = max(u.chars(True) for u in units), max_chars
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if len(_pack(units, mid, max_bytes)) <= count:
+            hi = mid
+        else:
+            lo = mid + 1
+
+    starts = _pack(units, lo, max_bytes) + [len(units)]
+    return [
+        units[a].text + "".join(u.sep + u.text for u in units[a + 1:b])
+        for a, b in zip(starts, starts[1:])
+    ]